@@ -0,0 +1,111 @@
+"""Compare LLM_Decoder CPU inference modes: load time, TTFT, tokens/sec, RSS.
+
+Usage:
+    python -m benchmarks.bench_llm_decoder
+    python -m benchmarks.bench_llm_decoder --modes fp32,int8 --threads 4 --tokens 64 # NOQA E501
+
+Each precision runs in a fresh subprocess so peak RSS is per mode.
+Generation is greedy with a fixed token count, so modes do equal work.
+Time-to-first-token is measured with and without the cached
+system-prompt prefix.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import torch
+
+from src.core.config import LLM_MODEL
+from src.core.llm_decoder import LLM_Decoder
+
+
+def sample_prompt(decoder):
+    from src.core.fort_store import get_store
+
+    record = get_store().frame.iloc[0].to_dict()
+    return decoder.build_prompt([record])
+
+
+def timed_generate(decoder, prompt, n_tokens, reuse_prefix=True):
+    inputs = decoder._tokenize(prompt, n_tokens)
+    prefix = decoder._prefix_kwargs(inputs) if reuse_prefix else {}
+    t0 = time.perf_counter()
+    with torch.no_grad():
+        decoder.model.generate(
+            **inputs,
+            **prefix,
+            max_new_tokens=n_tokens,
+            min_new_tokens=n_tokens,
+            do_sample=False,
+            pad_token_id=decoder.tokenizer.eos_token_id,
+        )
+    return time.perf_counter() - t0
+
+
+def run_mode(args) -> dict:
+    t0 = time.perf_counter()
+    decoder = LLM_Decoder(
+        model_name=args.model,
+        device="cpu",
+        precision=args.single,
+        num_threads=args.threads,
+    )
+    load_s = time.perf_counter() - t0
+    prompt = sample_prompt(decoder)
+
+    timed_generate(decoder, prompt, 2)  # warm-up
+    ttft = min(timed_generate(decoder, prompt, 1) for _ in range(3))
+    ttft_cold = min(
+        timed_generate(decoder, prompt, 1, reuse_prefix=False)
+        for _ in range(3))
+    total = timed_generate(decoder, prompt, args.tokens)
+
+    return {
+        "mode": args.single,
+        "threads": torch.get_num_threads(),
+        "load_s": round(load_s, 2),
+        "ttft_ms": round(ttft * 1000, 1),
+        "ttft_no_prefix_ms": round(ttft_cold * 1000, 1),
+        "tok_s": round(args.tokens / total, 2),
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--model", default=LLM_MODEL)
+    ap.add_argument("--modes", default="fp32,bf16,int8")
+    ap.add_argument("--threads", type=int, default=None)
+    ap.add_argument("--tokens", type=int, default=64)
+    ap.add_argument("--single", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.single:
+        print(json.dumps(run_mode(args)))
+        return
+
+    print(f"model={args.model} tokens={args.tokens} threads={args.threads}")
+    print(f"{'mode':<6}{'threads':>8}{'load s':>8}{'TTFT ms':>9}"
+          f"{'no-prefix':>11}{'tok/s':>8}{'peak RSS MB':>13}")
+    for mode in args.modes.split(","):
+        cmd = [sys.executable, "-m", "benchmarks.bench_llm_decoder",
+               "--model", args.model, "--tokens", str(args.tokens),
+               "--single", mode]
+        if args.threads:
+            cmd += ["--threads", str(args.threads)]
+        out = subprocess.run(cmd, capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"{mode:<6} failed: {out.stderr.strip().splitlines()[-1]}")
+            continue
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{r['mode']:<6}{r['threads']:>8}{r['load_s']:>8.2f}"
+              f"{r['ttft_ms']:>9.1f}{r['ttft_no_prefix_ms']:>11.1f}"
+              f"{r['tok_s']:>8.2f}{r['peak_rss_mb']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Compare RAG vector indexes: build time, query latency and recall@k.
+
+Usage:
+    python -m benchmarks.bench_vector_index --n 200000 --dim 384
+    python -m benchmarks.bench_vector_index --embeddings rag_cache/<model>/embeddings-<hash>.npy # NOQA E501
+
+Without --embeddings a synthetic clustered corpus of unit vectors is
+generated (MiniLM-sized by default). Recall is measured against the
+exact index.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.core.vector_index import make_index
+
+CONFIGS = [
+    ("exact", {}, {}),
+    ("ivf", {}, {"n_probe": 4}),
+    ("ivf", {}, {"n_probe": 16}),
+    ("ivf", {}, {"n_probe": 64}),
+    ("ivfpq", {"pq_m": 16}, {"n_probe": 16}),
+    ("ivfpq", {"pq_m": 16}, {"n_probe": 64}),
+]
+
+
+def synthetic(n, dim, n_topics=256, seed=0):
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    X = topics[rng.integers(0, n_topics, n)]
+    X += 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    X /= np.linalg.norm(X, axis=1, keepdims=True)
+    return X
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--embeddings", help=".npy matrix of unit vectors")
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=10)
+    args = ap.parse_args()
+
+    if args.embeddings:
+        X = np.load(args.embeddings, mmap_mode="r")
+    else:
+        X = synthetic(args.n, args.dim)
+
+    rng = np.random.default_rng(1)
+    Q = np.asarray(X[rng.integers(0, len(X), args.queries)], np.float32)
+    Q += 0.1 * rng.standard_normal(Q.shape).astype(np.float32)
+    Q /= np.linalg.norm(Q, axis=1, keepdims=True)
+
+    print(f"corpus={X.shape} queries={len(Q)} k={args.k}")
+    print(f"{'index':<8}{'build':>24}{'query':>18}{'build s':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'recall':>8}")
+
+    truth = None
+    for kind, build_params, query_params in CONFIGS:
+        index = make_index(kind, **build_params)
+        t0 = time.perf_counter()
+        index.build(X)
+        build_s = time.perf_counter() - t0
+
+        lat, found = [], []
+        for q in Q:
+            t0 = time.perf_counter()
+            idx, _ = index.search(q, args.k, **query_params)
+            lat.append((time.perf_counter() - t0) * 1000)
+            found.append(set(idx.tolist()))
+
+        if truth is None:
+            truth = found
+        recall = np.mean([
+            len(f & t) / max(len(t), 1) for f, t in zip(found, truth)])
+        print(f"{kind:<8}{str(build_params):>24}{str(query_params):>18}"
+              f"{build_s:>10.2f}{np.percentile(lat, 50):>9.3f}"
+              f"{np.percentile(lat, 95):>9.3f}{recall:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Multi-worker serving: preloaded catalogue + one shared inference worker.
+
+Usage:
+    gunicorn -c gunicorn.conf.py src.api.main:app
+
+The master imports the app and builds the dataset and indexes once
+(`preload`), then forks WEB_CONCURRENCY uvicorn workers that share them
+copy-on-write. RAG and the LLM are loaded only in the inference worker
+(src/api/inference_worker.py), which this config starts and stops;
+it is supervised and restarted if it dies. API workers reach it
+through INFERENCE_SOCKET and answer 503 while it is unreachable.
+"""
+import gc
+import os
+import secrets
+import shutil
+import subprocess
+import sys
+import tempfile
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+# Tells the app it runs in several processes (e.g. POST /clusters/rebuild
+# is single-worker only)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "180"))
+
+# Read by src/api/routers/search.py when the app is (pre)loaded. The
+# socket lives in a fresh private (0700) directory, and every
+# connection authenticates with a per-run key that only this process
+# tree sees (through its environment).
+_runtime = None
+if not os.environ.get("INFERENCE_SOCKET"):
+    _runtime = tempfile.mkdtemp(
+        prefix="forts-inference-", dir=os.environ.get("XDG_RUNTIME_DIR"))
+    os.environ["INFERENCE_SOCKET"] = os.path.join(_runtime, "inference.sock")
+INFERENCE_SOCKET = os.environ["INFERENCE_SOCKET"]
+os.environ.setdefault("INFERENCE_AUTHKEY", secrets.token_hex(32))
+
+_inference = None
+
+
+def on_starting(server):
+    global _inference
+    _inference = subprocess.Popen([
+        sys.executable, "-m", "src.api.inference_worker",
+        "--socket", INFERENCE_SOCKET, "--supervise",
+    ])
+
+
+def when_ready(server):
+    from src.api.main import preload
+
+    preload()
+    # Keep the garbage collector from touching (and so copying) the
+    # preloaded objects' pages in every worker
+    gc.freeze()
+
+
+def on_exit(server):
+    if _inference is not None:
+        _inference.terminate()
+        _inference.wait(timeout=10)
+    if _runtime is not None:
+        shutil.rmtree(_runtime, ignore_errors=True)
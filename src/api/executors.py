@@ -0,0 +1,90 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from fastapi import HTTPException
+
+
+class BoundedExecutor:
+    """Thread pool with its own concurrency and backlog limits.
+
+    Handlers are `async def` and hand blocking work to the pool that
+    matches it, so a burst of one kind of work (model inference) cannot
+    take the threads that another kind (catalogue pandas work) needs.
+    At most `max_workers` calls run at once; once `max_pending` are
+    running or waiting, further calls get a 503 instead of queueing
+    without bound.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self.completed = 0
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` on the pool and await its result.
+
+        Raises:
+            HTTPException: 503 when the backlog is full
+        """
+        # Only touched from the event loop thread, so no lock is needed
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail=f"{self.name} executor is busy",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._pool, functools.partial(fn, *args, **kwargs))
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, "") or default)
+
+
+# pandas / NumPy work behind the catalogue, recommend and cluster routes
+DATA = BoundedExecutor(
+    "data",
+    max_workers=_env_int("API_DATA_WORKERS", min(8, os.cpu_count() or 1)),
+    max_pending=_env_int("API_DATA_BACKLOG", 256),
+)
+
+# Model inference on the request path (query encoding, retrieval).
+# LLM generation has its own thread and queue in GenerationScheduler.
+INFERENCE = BoundedExecutor(
+    "inference",
+    max_workers=_env_int("API_INFERENCE_WORKERS", 2),
+    max_pending=_env_int("API_INFERENCE_BACKLOG", 64),
+)
+
+EXECUTORS: Dict[str, BoundedExecutor] = {"data": DATA, "inference": INFERENCE}
+
+
+def stats() -> Dict[str, dict]:
+    return {name: e.stats() for name, e in EXECUTORS.items()}
@@ -0,0 +1,94 @@
+"""Shared inference worker for multi-worker deployments.
+
+Usage:
+    INFERENCE_AUTHKEY=<hex> python -m src.api.inference_worker \
+        --socket /run/user/1000/forts/inference.sock [--supervise]
+
+Loads the RAG engine and the LLM generation scheduler once and serves
+them to every API worker over a Unix socket. gunicorn.conf.py starts
+it automatically (supervised); API workers find it through
+INFERENCE_SOCKET and authenticate with INFERENCE_AUTHKEY. The socket's
+directory must be private (0700).
+
+With --supervise the worker runs as a child process that is restarted
+whenever it exits, with exponential backoff; API workers answer 503
+while it is down.
+"""
+import argparse
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from src.core.inference_service import InferenceServer
+
+# Restart backoff (s); it resets once a worker has stayed up STABLE s
+MIN_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+STABLE = 60.0
+
+
+def serve(address: str):
+    # This process hosts the engines, so the router must build them
+    # locally rather than proxy to INFERENCE_SOCKET
+    os.environ.pop("INFERENCE_SOCKET", None)
+    from src.api.routers import search
+
+    engines = {"rag": search.RAG, "llm": search.ANALYZER}
+    for engine in engines.values():
+        engine.start()
+    logging.info("inference worker listening on %s", address)
+    InferenceServer(address, engines).serve_forever()
+
+
+def supervise(address: str):
+    """Run the worker in a child process; restart it until SIGTERM."""
+    stopping = threading.Event()
+    child = None
+
+    def stop(signum, frame):
+        stopping.set()
+        if child is not None:
+            child.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    backoff = MIN_BACKOFF
+    while not stopping.is_set():
+        started = time.monotonic()
+        child = subprocess.Popen([
+            sys.executable, "-m", "src.api.inference_worker",
+            "--socket", address,
+        ])
+        code = child.wait()
+        if stopping.is_set():
+            break
+        if time.monotonic() - started >= STABLE:
+            backoff = MIN_BACKOFF
+        logging.warning(
+            "inference worker exited (%s); restarting in %.0fs", code, backoff)
+        stopping.wait(backoff)
+        backoff = min(backoff * 2, MAX_BACKOFF)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--socket", default=os.environ.get("INFERENCE_SOCKET"))
+    ap.add_argument("--supervise", action="store_true",
+                    help="restart the worker whenever it exits")
+    args = ap.parse_args()
+    if not args.socket:
+        ap.error("--socket (or INFERENCE_SOCKET) is required")
+    logging.basicConfig(level=logging.INFO)
+
+    if args.supervise:
+        supervise(args.socket)
+    else:
+        serve(args.socket)
+
+
+if __name__ == "__main__":
+    main()
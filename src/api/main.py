@@ -2,7 +2,8 @@ from fastapi import FastAPI
 import sys
 sys.path.append("/home/vasant/projects/Pride-of-Sahyadri")
 
-from src.api.routers import forts, search, clustering, recommend  # NOQA E402
+from src.api.routers import forts, search, clustering, recommend, health  # NOQA E402
+from src.core import lazy_engine  # NOQA E402
 
 app = FastAPI(title="Maharashtra Forts API")
 
@@ -14,11 +15,37 @@ def init_routes(app: FastAPI):
                        prefix="/clusters", tags=["clustering"])
     app.include_router(
         recommend.router, prefix="/recommend", tags=["recommend"])
+    app.include_router(health.router, prefix="/health", tags=["health"])
 
 
 init_routes(app)
 
 
+def preload():
+    """Build the catalogue dataset and indexes now.
+
+    gunicorn.conf.py calls this in the master before forking, so API
+    workers share one copy-on-write copy instead of each building
+    their own. Models are not loaded here: they live in the shared
+    inference worker.
+    """
+    forts.STORE.warm()
+    forts.TEXT_INDEX.warm()
+    forts.FACETS.warm()
+    recommend.PROXIMITY.warm()
+    recommend.SIMILARITY.warm()
+    # Bundled labels only: fitting KMeans here would leave its OpenMP
+    # pool unusable in the forked workers (they fit on startup instead)
+    clustering.cluster_engine.load_bundled()
+
+
+@app.on_event("startup")
+def warm_engines():
+    """Load heavy models in the background; core endpoints serve now."""
+    lazy_engine.start_all()
+    clustering.cluster_engine.get_clustered_data()
+
+
 @app.get("/")
-def root():
+async def root():
     return {"msg": "Maharashtra Forts API — up and running"}
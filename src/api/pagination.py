@@ -0,0 +1,101 @@
+import base64
+import json
+from typing import Optional, Sequence
+
+import pandas as pd
+from fastapi import HTTPException, Response
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(offset: int, generation=None) -> str:
+    """Opaque cursor for the page starting at `offset`."""
+    raw = json.dumps({"o": int(offset), "g": generation}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, generation=None) -> int:
+    """Return the offset stored in a cursor.
+
+    Raises:
+        HTTPException: 400 for malformed cursors, 410 when the cursor was
+            issued for an older version of the data.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset = int(data["o"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if data.get("g") != generation:
+        raise HTTPException(
+            status_code=410, detail="Cursor expired: the data has changed")
+    return offset
+
+
+def parse_fields(fields: Optional[str], columns: Sequence[str]) -> Optional[list]: # NOQA E501
+    """Parse a comma-separated `fields=` projection.
+
+    Raises:
+        HTTPException: 422 listing any unknown field names.
+    """
+    if not fields:
+        return None
+    wanted = list(dict.fromkeys(
+        f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in wanted if f not in columns]
+    if unknown:
+        raise HTTPException(
+            status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+    return wanted
+
+
+def paginate(
+    df: pd.DataFrame,
+    response: Response,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    positions=None,
+    generation=None,
+) -> list:
+    """Slice, project and serialize one page of a list endpoint.
+
+    Sets `X-Total-Count` (rows before paging) and, when more rows
+    remain, `X-Next-Cursor`.
+
+    Args:
+        df: frame to page through
+        response: FastAPI response to attach headers to
+        limit: page size (None = everything from the start row)
+        offset: start row, ignored when `cursor` is given
+        cursor: opaque cursor from a previous `X-Next-Cursor`
+        fields: comma-separated column projection
+        positions: optional row positions into `df` (already filtered
+            and ordered); avoids materializing the full selection
+        generation: data version embedded in cursors
+
+    Returns:
+        list of record dicts
+    """
+    total = len(df) if positions is None else len(positions)
+    start = decode_cursor(cursor, generation) if cursor else offset
+    stop = total if limit is None else min(total, start + limit)
+    start = min(start, stop)
+
+    columns = parse_fields(fields, df.columns)
+    if positions is None:
+        page = df.iloc[start:stop]
+    else:
+        page = df.iloc[positions[start:stop]]
+    if columns is not None:
+        page = page[columns]
+
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+    if stop < total:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(stop, generation)
+    return page.to_dict(orient="records")
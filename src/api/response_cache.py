@@ -0,0 +1,131 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Tuple
+
+from fastapi import Request, Response
+
+from src.core.fort_store import dumps
+
+# Headers set by list handlers that must be replayed from the cache
+CACHED_HEADERS = ("X-Total-Count", "X-Next-Cursor")
+
+
+class CachedResponse:
+    __slots__ = ("version", "body", "etag", "headers")
+
+    def __init__(self, version, body: bytes, etag: str, headers: Dict[str, str]): # NOQA E501
+        self.version = version
+        self.body = body
+        self.etag = etag
+        self.headers = headers
+
+
+class ResponseCache:
+    """LRU cache of already-encoded JSON responses.
+
+    Entries are keyed by path plus normalized query params and tagged
+    with a data version (e.g. the FortStore generation). A version
+    mismatch is a miss, so entries go stale automatically when the
+    dataset or clustering changes. Every response carries a strong
+    `ETag`; a matching `If-None-Match` gets an empty 304.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(request: Request) -> Tuple:
+        params = tuple(sorted(request.query_params.multi_items()))
+        return request.url.path.rstrip("/"), params
+
+    @staticmethod
+    def etag_for(body: bytes) -> str:
+        return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+    @staticmethod
+    def not_modified(request: Request, etag: str) -> bool:
+        """True if the request's If-None-Match matches `etag`."""
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        tags = {t.strip() for t in header.split(",")}
+        return etag in tags or "*" in tags
+
+    def _get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def _put(self, key, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, prefix: str = "") -> int:
+        """Drop entries whose path starts with `prefix` (all by default)."""
+        with self._lock:
+            keys = [k for k in self._entries if k[0].startswith(prefix)]
+            for k in keys:
+                del self._entries[k]
+        return len(keys)
+
+    def _encode(self, response: Response, version: Hashable, build: Callable[[], object]) -> CachedResponse: # NOQA E501
+        body = dumps(build())
+        headers = {
+            h: response.headers[h]
+            for h in CACHED_HEADERS if h in response.headers
+        }
+        return CachedResponse(version, body, self.etag_for(body), headers)
+
+    def _reply(self, request: Request, entry: CachedResponse) -> Response:
+        headers = {"ETag": entry.etag, **entry.headers}
+        if self.not_modified(request, entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=entry.body, media_type="application/json",
+            headers=headers)
+
+    def respond(self, request: Request, response: Response, version: Hashable, build: Callable[[], object]) -> Response: # NOQA E501
+        """Serve a cached body or build, encode and cache a new one.
+
+        Args:
+            request: incoming request (key + If-None-Match)
+            response: the handler's injected response; headers listed
+                in CACHED_HEADERS that `build` sets on it are cached too
+            version: data version the body depends on
+            build: returns the JSON-able payload on a miss
+        """
+        key = self.key(request)
+        entry = self._get(key, version)
+        if entry is None:
+            entry = self._encode(response, version, build)
+            self._put(key, entry)
+        return self._reply(request, entry)
+
+    async def arespond(self, request: Request, response: Response, version: Hashable, build: Callable[[], object], run: Callable[..., Awaitable]) -> Response: # NOQA E501
+        """Async `respond`: hits are served on the event loop, while
+        building and encoding a miss is handed to `run` (e.g.
+        `executors.DATA.run`).
+        """
+        key = self.key(request)
+        entry = self._get(key, version)
+        if entry is None:
+            entry = await run(self._encode, response, version, build)
+            self._put(key, entry)
+        return self._reply(request, entry)
+
+
+# Shared by every router in the process
+RESPONSE_CACHE = ResponseCache()
@@ -1,35 +1,78 @@
-from fastapi import APIRouter
+import os
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from src.api.executors import DATA
+from src.api.pagination import paginate
+from src.api.response_cache import RESPONSE_CACHE
 from src.core.cluster_engine import ClusterEngine
 
 router = APIRouter()
 
-# Build clusters at startup
+# Built at startup in each worker (see src/api/main.py)
 cluster_engine = ClusterEngine()
-cluster_engine.build_clusters()
+
+# Every worker process holds its own clusters (and response cache),
+# so a rebuild in one would leave the others serving the old result
+MULTI_WORKER = int(os.environ.get("WEB_CONCURRENCY", "1") or 1) > 1
 
 
 @router.get("/")
-def get_cluster_counts():
+async def get_cluster_counts(request: Request, response: Response):
     """
     Return {cluster_id: count}
     """
-    return cluster_engine.get_cluster_counts()
+    # Re-clusters first if the dataset changed
+    counts = await DATA.run(cluster_engine.get_cluster_counts)
+    return await RESPONSE_CACHE.arespond(
+        request, response, version=cluster_engine.builds,
+        build=lambda: counts, run=DATA.run)
 
 
 @router.get("/data")
-def get_clustered_forts():
+async def get_clustered_forts(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(None, ge=0),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = None,
+    fields: str | None = None,
+):
     """
-    Returns list of forts with `cluster` label added
+    Returns list of forts with `cluster` label added.
+
+    Supports `limit`/`offset` or `cursor` paging and a `fields=`
+    projection, e.g. `fields=latitude,longitude,elevation_m,cluster`.
     """
-    df = cluster_engine.get_clustered_data()
-    return df.to_dict(orient="records")
+    df = await DATA.run(cluster_engine.get_clustered_data)
+    version = cluster_engine.builds
+
+    def build():
+        return paginate(
+            df, response, limit=limit, offset=offset, cursor=cursor,
+            fields=fields, generation=version,
+        )
+
+    return await RESPONSE_CACHE.arespond(
+        request, response, version=version, build=build, run=DATA.run)
 
 
 @router.post("/rebuild/{n_clusters}")
-def rebuild_clusters(n_clusters: int):
+async def rebuild_clusters(n_clusters: int):
     """
     Recompute clusters with a new number of clusters.
+
+    Single-worker only: answers 409 when the API runs several worker
+    processes (WEB_CONCURRENCY > 1).
     """
-    cluster_engine.n_clusters = n_clusters
-    df, counts = cluster_engine.build_clusters()
+    if MULTI_WORKER:
+        raise HTTPException(
+            status_code=409,
+            detail="cluster rebuild is only available with a single worker", # NOQA E501
+        )
+
+    def rebuild():
+        cluster_engine.n_clusters = n_clusters
+        return cluster_engine.build_clusters()
+
+    df, counts = await DATA.run(rebuild)
+    RESPONSE_CACHE.invalidate("/clusters")
     return {"clusters": counts, "n_clusters": n_clusters}
@@ -1,44 +1,143 @@
-from fastapi import APIRouter, HTTPException
-from src.core.data_loader import load_forts
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from src.api.executors import DATA
+from src.api.pagination import paginate
+from src.api.response_cache import RESPONSE_CACHE
+from src.core.facets import FacetIndex
+from src.core.fort_store import get_store
+from src.core.text_index import TextIndex
 
 router = APIRouter()
 
-# Load once at startup
-DF = load_forts()
+# Shared, process-wide dataset
+STORE = get_store()
+
+# Keyword index, rebuilt when the dataset generation changes
+TEXT_INDEX = TextIndex(STORE)
+
+# Facet bitmaps for district / type / difficulty / season
+FACETS = FacetIndex(STORE)
+
+
+def select_positions(q, filters) -> np.ndarray:
+    """Row positions matching the keyword query and facet filters.
+
+    Keyword hits keep their relevance order; otherwise dataset order.
+    """
+    mask = FACETS.mask(filters)
+    if q:
+        hits = TEXT_INDEX.search(q)
+        return hits[mask[hits]]
+    return np.flatnonzero(mask)
 
 
 @router.get("/")
-def list_forts(q: str | None = None, district: str | None = None, limit: int = 10):  # NOQA
-    """List forts with optional search and district filters.
+async def list_forts(
+    request: Request,
+    response: Response,
+    q: str | None = None,
+    district: list[str] | None = Query(None),
+    fort_type: list[str] | None = Query(None, alias="type"),
+    difficulty: list[str] | None = Query(None),
+    season: list[str] | None = Query(None),
+    limit: int = Query(10, ge=0),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = None,
+    fields: str | None = None,
+):
+    """List forts with optional search and facet filters.
+
+    Facet params may be repeated (OR within a facet, AND across facets)
+    and match case-insensitively. The total match count is returned in
+    `X-Total-Count`, and `X-Next-Cursor` is set while more pages remain.
 
     Args:
-        q: optional text search query (name, notes, key_events)
+        q: optional keyword query over name, alternate_names, district,
+           taluka, notes and key_events; every word must match (as a
+           word, prefix or substring) and results are ranked by relevance
         district: optional district filter
+        type: optional fort type filter
+        difficulty: optional trek difficulty filter
+        season: optional best season filter
         limit: number of results to return
+        offset: number of matches to skip
+        cursor: opaque cursor from a previous `X-Next-Cursor` header
+        fields: comma-separated columns to return (default: all)
     """
-    df = DF.copy()
+    filters = {"district": district, "type": fort_type,
+               "difficulty": difficulty, "season": season}
 
-    if q:
-        ql = q.lower()
-        mask = (
-            df["name"].str.lower().str.contains(ql, na=False)
-            | df["notes"].str.lower().str.contains(ql, na=False)
-            | df["key_events"].str.lower().str.contains(ql, na=False)
+    def build():
+        pos = select_positions(q, filters)
+        return paginate(
+            STORE.frame, response, limit=limit, offset=offset,
+            cursor=cursor, fields=fields, positions=pos,
+            generation=STORE.generation,
         )
-        df = df[mask]
 
-    if district:
-        df = df[df["district"].str.lower() == district.lower()]
+    return await RESPONSE_CACHE.arespond(
+        request, response, version=STORE.generation, build=build,
+        run=DATA.run)
+
 
-    response = df.head(limit).to_dict(orient="records")
-    return response
+@router.get("/facets")
+async def facet_counts(
+    request: Request,
+    response: Response,
+    q: str | None = None,
+    district: list[str] | None = Query(None),
+    fort_type: list[str] | None = Query(None, alias="type"),
+    difficulty: list[str] | None = Query(None),
+    season: list[str] | None = Query(None),
+):
+    """Facet value counts for the current search and filters.
+
+    Each facet is counted with every other filter applied, so the
+    response can populate all filter dropdowns at once.
+
+    Returns:
+        {"total": int, "facets": {facet: {value: count}}}
+    """
+    filters = {"district": district, "type": fort_type,
+               "difficulty": difficulty, "season": season}
+
+    def build():
+        base = None
+        if q:
+            base = np.zeros(len(STORE), dtype=bool)
+            base[TEXT_INDEX.search(q)] = True
+        return {
+            "total": int(len(select_positions(q, filters))),
+            "facets": FACETS.counts(filters, base=base),
+        }
+
+    return await RESPONSE_CACHE.arespond(
+        request, response, version=STORE.generation, build=build,
+        run=DATA.run)
 
 
 @router.get("/{fort_id}")
-def get_fort(fort_id: int):
+async def get_fort(request: Request, fort_id: int):
     """Retrieve a single fort record by its fort_id."""
-    row = DF[DF["fort_id"] == fort_id]
-    if row.empty:
+    # Encoded once per generation; that first build is pandas work
+    body = await DATA.run(STORE.record_json, fort_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Fort not found")
+    etag = RESPONSE_CACHE.etag_for(body)
+    if RESPONSE_CACHE.not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(
+        content=body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/by-name/{name}")
+async def get_forts_by_name(name: str):
+    """Retrieve forts whose name or alternate name matches exactly."""
+    def lookup():
+        records = STORE.records()
+        return [records[i] for i in STORE.positions_by_name(name)]
+
+    matches = await DATA.run(lookup)
+    if not matches:
         raise HTTPException(status_code=404, detail="Fort not found")
-    response = row.iloc[0].to_dict()
-    return response
+    return matches
@@ -0,0 +1,52 @@
+import asyncio
+from fastapi import APIRouter, Query, Response
+from src.api import executors
+from src.api.routers import search
+from src.core import lazy_engine
+from src.core.fort_store import get_store
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def live():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready(response: Response, require: str | None = Query(None)):
+    """Readiness with per-engine state.
+
+    Core (catalogue) endpoints are ready as soon as the dataset is
+    loaded. Heavy engines load in the background; list them in
+    `require` (e.g. `require=rag,llm`) to gate on them too; with a
+    shared inference worker their state is the worker's, and
+    "unreachable" while it is down or restarting.
+    Failed engines are retried here (with backoff) as well as on use.
+    Responds 503 when anything required is not ready. `executors`
+    reports the load on the data and inference thread pools.
+    """
+    store = get_store()
+    lazy_engine.retry_failed()
+    engines = lazy_engine.status()
+    engines.update(await asyncio.to_thread(search.remote_status))
+    required = [r.strip() for r in (require or "").split(",") if r.strip()]
+
+    ok = store.generation > 0 and all(
+        engines.get(name, {}).get("state") == lazy_engine.READY
+        for name in required
+    )
+    if not ok:
+        response.status_code = 503
+
+    return {
+        "ready": ok,
+        "dataset": {
+            "generation": store.generation,
+            "rows": len(store),
+            "bundle": store.bundle.id if store.bundle else None,
+        },
+        "engines": engines,
+        "executors": executors.stats(),
+    }
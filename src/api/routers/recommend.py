@@ -1,45 +1,182 @@
-from fastapi import APIRouter, HTTPException
-from src.core.data_loader import load_forts
-from src.core.recommender import recommend_by_proximity, recommend_similar
+from typing import List
+from fastapi import APIRouter, HTTPException, Query, Response
+from pydantic import BaseModel, Field
+from src.api.executors import DATA
+from src.api.pagination import paginate
+from src.core.fort_store import get_store
+from src.core.recommender import ProximityEngine, SimilarityEngine
 
 router = APIRouter()
 
-# Load dataset once
-DF = load_forts()
+# Shared, process-wide dataset
+STORE = get_store()
+
+# Spatial index, rebuilt only when the dataset generation changes
+PROXIMITY = ProximityEngine(STORE)
+
+# Feature matrix + top-N neighbour lists, rebuilt per dataset generation
+SIMILARITY = SimilarityEngine(STORE)
+
+# Upper bound on k for the nearby and similar lookups
+MAX_K = 1000
+
+
+def parse_weights(spec: str | None) -> dict | None:
+    """Parse "feature:weight,feature:weight" into a dict."""
+    if not spec:
+        return None
+    weights = {}
+    for part in spec.split(","):
+        name, sep, value = part.partition(":")
+        if not sep:
+            raise ValueError(f"Invalid weight '{part}', expected name:value")
+        weights[name.strip()] = float(value)
+    return weights
 
 
 @router.get("/nearby")
-def nearby(lat: float, lon: float, k: int = 10):
-    """Return the k nearest forts to a given coordinate.
+async def nearby(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int | None = Query(None, ge=1, le=MAX_K),
+    radius_km: float | None = Query(None, ge=0),
+    exact: bool = False,
+):
+    """Return the forts nearest to a given coordinate.
+
+    Without `radius_km` this returns the k nearest forts (default 10).
+    With `radius_km` it returns every fort within that distance,
+    capped at k when k is given.
 
     Args:
         lat (float): latitude
         lon (float): longitude
         k (int): number of results
+        radius_km (float): optional search radius in kilometers
+        exact (bool): re-rank candidates by geodesic distance
 
     Returns:
         list: forts sorted by distance_km ascending
     """
-    results = recommend_by_proximity(DF, lat, lon, k=k)
-    return results.to_dict(orient="records")
+    def run():
+        if radius_km is not None:
+            results = PROXIMITY.recommend_within(
+                lat, lon, radius_km, k=k, exact=exact)
+        else:
+            results = PROXIMITY.recommend(
+                lat, lon, k=10 if k is None else k, exact=exact)
+        return results.to_dict(orient="records")
+
+    try:
+        return await DATA.run(run)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+class Point(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
+
+
+class NearbyBatchRequest(BaseModel):
+    points: List[Point] = Field(..., max_items=10000)
+    k: int = Field(10, ge=1, le=MAX_K)
+    exact: bool = False
+
+
+@router.post("/nearby/batch")
+async def nearby_batch(req: NearbyBatchRequest):
+    """Return the k nearest forts for each of many coordinates.
+
+    All points are answered by a single spatial-index query.
+
+    Returns:
+        list: one {lat, lon, results} entry per input point, in order
+    """
+    lats = [p.lat for p in req.points]
+    lons = [p.lon for p in req.points]
+    try:
+        results = await DATA.run(
+            PROXIMITY.recommend_many, lats, lons, k=req.k, exact=req.exact)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return [
+        {"lat": p.lat, "lon": p.lon, "results": r}
+        for p, r in zip(req.points, results)
+    ]
+
+
+@router.get("/bbox")
+async def in_bbox(
+    response: Response,
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    limit: int | None = Query(None, ge=0),
+    offset: int = Query(0, ge=0),
+    cursor: str | None = None,
+    fields: str | None = None,
+):
+    """Return forts inside a map viewport.
+
+    Paged like `/forts` (`X-Total-Count`, `X-Next-Cursor`).
+
+    Args:
+        min_lat, min_lon (float): south-west corner
+        max_lat, max_lon (float): north-east corner
+        limit (int): optional cap on the number of results
+        offset (int): number of forts to skip
+        cursor (str): opaque cursor from a previous page
+        fields (str): comma-separated columns to return
+
+    Returns:
+        list: forts in dataset order
+    """
+    if min_lat > max_lat:
+        raise HTTPException(
+            status_code=422, detail="min_lat must not exceed max_lat")
+
+    def run():
+        pos = PROXIMITY.within_bbox(min_lat, min_lon, max_lat, max_lon)
+        return paginate(
+            STORE.frame, response, limit=limit, offset=offset,
+            cursor=cursor, fields=fields, positions=pos,
+            generation=STORE.generation,
+        )
+
+    return await DATA.run(run)
 
 
 @router.get("/similar/{fort_id}")
-def similar(fort_id: int, k: int = 5):
+async def similar(
+    fort_id: int,
+    k: int = Query(5, ge=1, le=MAX_K),
+    weights: str | None = None,
+):
     """Return forts similar to the provided fort_id.
 
-    Similarity uses:
-    - Same type (strongly weighted)
-    - Elevation closeness
+    Similarity uses type, district, era, elevation, difficulty,
+    trek time and location. Default-weight results are served from
+    precomputed neighbour lists.
 
     Args:
         fort_id (int)
         k (int): number of results
+        weights (str): optional overrides, e.g. "type:1,location:2"
     """
-    results = recommend_similar(DF, fort_id, k=k)
+    def run(w):
+        results = SIMILARITY.recommend(fort_id, k=k, weights=w)
+        return None if results.empty else results.to_dict(orient="records")
+
+    try:
+        records = await DATA.run(run, parse_weights(weights))
+    except ValueError as e:
+        # Malformed, unknown, negative or non-finite weights
+        raise HTTPException(status_code=400, detail=str(e))
 
-    if results.empty:
+    if records is None:
         raise HTTPException(
             status_code=404, detail="Fort not found or insufficient data for similarity.") # NOQA E501
 
-    return results.to_dict(orient="records")
+    return records
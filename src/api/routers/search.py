@@ -1,47 +1,371 @@
-from fastapi import APIRouter
-from src.core.data_loader import load_forts
-from src.core.rag_engine import RAGEngine
-from src.core.llm_decoder import LLM_Decoder
+import inspect
+import json
+import os
+from typing import Dict, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from src.api.executors import INFERENCE
+from src.core import answer_renderer, lazy_engine
+from src.core.answer_cache import AnswerCache, MISS
+from src.core.config import LLM_MODEL, RAG_INDEX, RAG_MODEL, RAG_RETRIEVAL
+from src.core.fort_store import get_store
+from src.core.generation_scheduler import (
+    GenerationScheduler,
+    GenerationTimeout,
+    SchedulerFull,
+)
+from src.core.lazy_engine import EngineUnavailable
 
 router = APIRouter()
 
-# Load dataset
-DF = load_forts()
+# Shared, process-wide dataset
+STORE = get_store()
 
-# Initialize RAG engine
-try:
-    rag = RAGEngine()
-    rag.load_data(DF)
+# Generation scheduler: queue bound, batch size, token cap, timeout (s)
+LLM_MAX_QUEUE = int(os.environ.get("LLM_MAX_QUEUE", "16"))
+LLM_MAX_BATCH = int(os.environ.get("LLM_MAX_BATCH", "4"))
+LLM_MAX_NEW_TOKENS = int(os.environ.get("LLM_MAX_NEW_TOKENS", "512"))
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "120"))
+# CPU inference: precision "auto" | "fp32" | "bf16" | "int8", torch threads
+LLM_PRECISION = os.environ.get("LLM_PRECISION", "auto")
+LLM_THREADS = int(os.environ.get("LLM_THREADS", "0")) or None
+
+# Multi-worker mode (gunicorn.conf.py): RAG and the LLM live in one
+# shared inference worker (src/api/inference_worker.py) on this socket
+INFERENCE_SOCKET = os.environ.get("INFERENCE_SOCKET") or None
+
+# Cache of generated answers (exact + embedding-similar questions).
+# Set ANSWER_CACHE_PATH to a SQLite file to keep it across restarts.
+ANSWER_CACHE = AnswerCache(
+    max_entries=int(os.environ.get("ANSWER_CACHE_SIZE", "2048")),
+    ttl=float(os.environ.get("ANSWER_CACHE_TTL", str(24 * 3600))),
+    threshold=float(os.environ.get("ANSWER_CACHE_THRESHOLD", "0.92")),
+    path=os.environ.get("ANSWER_CACHE_PATH") or None,
+)
+
+
+def rag_prebuilt_dir():
+    """The artifact bundle's RAG cache (used read-only), if any."""
+    if STORE.bundle is None:
+        return None
+    path = STORE.bundle.path / "rag"
+    return path if path.is_dir() else None
+
+
+# Heavy imports (torch, transformers) happen inside the factories so
+# that importing this router, and serving /forts, stays cheap.
+def build_rag():
+    from src.core.rag_engine import RAGEngine
+
+    rag = RAGEngine(
+        model_name=RAG_MODEL, index=RAG_INDEX, retrieval=RAG_RETRIEVAL,
+        prebuilt_dir=rag_prebuilt_dir())
+    rag.load_data(STORE.frame)
     rag.build_index()
-    analyzer = LLM_Decoder(
-            model_name="Qwen/Qwen2-1.5B-Instruct"
-        )
-except Exception as e:
-    rag = None
-    INIT_ERROR = str(e)
-else:
-    INIT_ERROR = None
+    return rag
+
+
+def build_analyzer():
+    from src.core.llm_decoder import LLM_Decoder
+
+    # All generation goes through one scheduler that owns the model
+    return GenerationScheduler(
+        LLM_Decoder(
+            model_name=LLM_MODEL,
+            precision=LLM_PRECISION,
+            num_threads=LLM_THREADS,
+        ),
+        max_queue=LLM_MAX_QUEUE,
+        max_batch=LLM_MAX_BATCH,
+        max_new_tokens=LLM_MAX_NEW_TOKENS,
+        timeout=LLM_TIMEOUT,
+    )
+
+
+def remote(name: str):
+    """Factory for a proxy to the inference worker's `name` engine.
+
+    Loading finishes when the remote engine is ready, so readiness
+    and 503s behave as with local engines.
+    """
+    def factory():
+        from src.core.inference_service import InferenceClient
+
+        return InferenceClient(INFERENCE_SOCKET).engine(name)
+    return factory
+
+
+# Warmed in the background at app startup (see src/api/main.py)
+RAG = lazy_engine.register(
+    "rag", remote("rag") if INFERENCE_SOCKET else build_rag)
+ANALYZER = lazy_engine.register(
+    "llm", remote("llm") if INFERENCE_SOCKET else build_analyzer)
+
+
+def remote_status() -> Dict[str, dict]:
+    """State of the inference worker's engines ({} when run locally).
+
+    Both engines report "unreachable" while the worker is down or
+    restarting, so readiness fails until it is back.
+    """
+    if not INFERENCE_SOCKET:
+        return {}
+    from src.core.inference_service import InferenceClient
+
+    try:
+        return InferenceClient(INFERENCE_SOCKET).status()
+    except EngineUnavailable as e:
+        down = {"state": e.state, "error": e.error, "load_seconds": None}
+        return {"rag": down, "llm": dict(down)}
+
+
+def unavailable(e: EngineUnavailable) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail={"engine": e.name, "state": e.state, "error": e.error},
+        headers={"Retry-After": "10"},
+    )
+
+
+def busy(e: SchedulerFull) -> HTTPException:
+    return HTTPException(
+        status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+def timed_out(e: GenerationTimeout) -> HTTPException:
+    return HTTPException(status_code=504, detail=str(e))
+
+
+def answer_scope(max_new_tokens: Optional[int]):
+    """(scope, variant) of a cached LLM answer.
+
+    The scope (models, retrieval, dataset content hash) invalidates the
+    cache when it changes, also across restarts with a persistent
+    cache; the variant (token cap) only keys answers.
+    """
+    cap = min(max_new_tokens or LLM_MAX_NEW_TOKENS, LLM_MAX_NEW_TOKENS)
+    scope = f"{LLM_MODEL}|{RAG_MODEL}|{RAG_RETRIEVAL}|data-{STORE.sha256[:16]}" # NOQA E501
+    return scope, f"tok{cap}"
+
+
+def row_ids(result) -> list:
+    return [row.get("fort_id") for row in result]
+
+
+async def retrieve(rag, q: str, path: str, scope: str, variant: str):
+    """Retrieve the best row, then try the similar-question cache.
+
+    The query is encoded on the event loop: awaiting the micro-batched
+    encoder holds no pool thread, so concurrent requests share encoder
+    batches. Only the index search and fusion use the inference pool.
+
+    Returns:
+        (result, query embedding or None, cached answer or None)
+    """
+    embedding = None
+    if path == answer_renderer.LLM or RAG_RETRIEVAL != "sparse":
+        embedding = await rag.query_encoder.aencode(q)
+    result = await INFERENCE.run(rag.query, q, 1, q_emb=embedding)
+    if path != answer_renderer.LLM:
+        return result, None, None
+    cached = ANSWER_CACHE.get_similar(
+        embedding, row_ids(result), scope, variant)
+    return result, embedding, cached
 
 
 @router.get("/semantic_search")
-def semantic_search(q: str):
+async def semantic_search(
+    request: Request,
+    response: Response,
+    q: str,
+    mode: str = Query(answer_renderer.AUTO, pattern="^(auto|fast|llm)$"),
+    max_new_tokens: Optional[int] = Query(None, ge=1),
+):
     """Semantic search / mini-QA endpoint.
 
+    Lookups ("where is", "best season", "how difficult", ...) are
+    answered from the retrieved record by templates in milliseconds;
+    open-ended questions go to the LLM. `mode` forces either path.
+    The path taken is reported in the `X-Answer-Mode` header.
+
+    LLM answers are cached: a repeated question is answered before
+    retrieval, a re-worded one (same retrieved fort, similar query
+    embedding) before generation. `X-Answer-Cache` reports
+    exact / similar / miss.
+
+    LLM requests are queued and batched by the generation scheduler;
+    a request is withdrawn if the client disconnects while waiting.
+
+    Returns 503 (with the engine state) while a required engine is
+    still loading, failed to load or (with a shared inference worker)
+    is unreachable, 503 when the generation queue is full and 504 when
+    generation exceeds its deadline.
+
     Args:
         q (str): query text
-        top_k (int): number of results
+        mode (str): "auto" (intent router), "fast" or "llm"
+        max_new_tokens (int): generation cap (clipped to the server's)
 
     Returns:
-        list of retrieved notes with similarity score
+        natural-language answer built from the best matching fort
     """
-    if rag is None:
-        return {"error": f"RAG engine unavailable: {INIT_ERROR}"}
+    path, intent = answer_renderer.route(q, mode)
+    response.headers["X-Answer-Mode"] = path
+    scope, variant = answer_scope(max_new_tokens)
+    if path == answer_renderer.LLM:
+        cached = ANSWER_CACHE.get_exact(q, scope, variant)
+        if cached is not None:
+            response.headers["X-Answer-Cache"] = "exact"
+            return cached
 
     try:
-        result = rag.query(q, k=1)
-        response = analyzer.decode_response(result)
+        rag = RAG.get()
+        llm = ANALYZER.get() if path == answer_renderer.LLM else None
+    except EngineUnavailable as e:
+        raise unavailable(e)
+
+    try:
+        result, embedding, cached = await retrieve(
+            rag, q, path, scope, variant)
+        if path == answer_renderer.FAST:
+            if not result:
+                return "No matching fort found."
+            return answer_renderer.render_answer(result[0], intent)
+        if cached is not None:
+            response.headers["X-Answer-Cache"] = "similar"
+            return cached
+        response.headers["X-Answer-Cache"] = MISS
+        answer = await llm.agenerate(
+            llm.decoder.build_prompt(result),
+            max_new_tokens=max_new_tokens,
+            is_disconnected=request.is_disconnected,
+        )
+    except EngineUnavailable as e:
+        raise unavailable(e)
+    except SchedulerFull as e:
+        raise busy(e)
+    except GenerationTimeout as e:
+        raise timed_out(e)
+    except HTTPException:
+        raise
     except Exception as e:
         return {"error": str(e)}
 
+    ANSWER_CACHE.put(q, embedding, row_ids(result), answer, scope, variant)
     # format results
-    return response
+    return answer
+
+
+def sse(event: str, data) -> str:
+    """One Server-Sent Event; data is JSON so newlines survive."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/semantic_search/stream")
+async def semantic_search_stream(
+    q: str,
+    mode: str = Query(answer_renderer.AUTO, pattern="^(auto|fast|llm)$"),
+    max_new_tokens: Optional[int] = Query(None, ge=1),
+):
+    """Streaming variant of /semantic_search (text/event-stream).
+
+    Events, in order:
+
+    - `meta`: {"mode": "fast"|"llm", "intent": ..., "cache": ...}
+    - `token`: a JSON string with the next piece of the answer (one
+      event for template and cached answers, many for LLM generation)
+    - `error`: a JSON string, if answering failed mid-stream
+    - `done`: {}
+
+    Engine availability and queue capacity are checked before
+    streaming starts, so those are still plain HTTP 503s. Generation
+    stops when the client disconnects. An answer cut short by the
+    generation deadline ends with an `error` event; only completed LLM
+    answers are added to the answer cache.
+    """
+    path, intent = answer_renderer.route(q, mode)
+    scope, variant = answer_scope(max_new_tokens)
+    error = answer = pieces = result = embedding = None
+    level = None
+    if path == answer_renderer.LLM:
+        answer = ANSWER_CACHE.get_exact(q, scope, variant)
+        level = "exact" if answer is not None else None
+
+    if answer is None:
+        try:
+            rag = RAG.get()
+            llm = ANALYZER.get() if path == answer_renderer.LLM else None
+        except EngineUnavailable as e:
+            raise unavailable(e)
+
+        try:
+            result, embedding, answer = await retrieve(
+                rag, q, path, scope, variant)
+            if path == answer_renderer.FAST:
+                answer = answer_renderer.render_answer(
+                    result[0], intent) if result else "No matching fort found." # NOQA E501
+            elif answer is not None:
+                level = "similar"
+            else:
+                level = MISS
+                pieces = llm.astream(
+                    llm.decoder.build_prompt(result), max_new_tokens)
+                if inspect.isawaitable(pieces):
+                    # RemoteScheduler connects off the event loop
+                    pieces = await pieces
+        except EngineUnavailable as e:
+            raise unavailable(e)
+        except SchedulerFull as e:
+            raise busy(e)
+        except HTTPException:
+            raise
+        except Exception as e:
+            error = str(e)
+
+    async def events():
+        yield sse("meta", {"mode": path, "intent": intent, "cache": level})
+        try:
+            if error is not None:
+                yield sse("error", error)
+            elif pieces is None:
+                yield sse("token", answer)
+            else:
+                text = []
+                async for piece in pieces:
+                    text.append(piece)
+                    yield sse("token", piece)
+                # The stream only ends normally once generation finished;
+                # timeouts and failures raise and are never cached
+                ANSWER_CACHE.put(
+                    q, embedding, row_ids(result), "".join(text).strip(),
+                    scope, variant)
+        except GenerationTimeout as e:
+            yield sse("error", f"timed out: {e}")
+        except Exception as e:
+            yield sse("error", str(e))
+        yield sse("done", {})
+
+    headers = {
+        "Cache-Control": "no-cache",
+        # Stop reverse proxies (nginx) from buffering the stream
+        "X-Accel-Buffering": "no",
+        "X-Answer-Mode": path,
+    }
+    if level:
+        headers["X-Answer-Cache"] = level
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers=headers)
+
+
+@router.get("/metrics")
+async def generation_metrics():
+    """Answer-cache and generation scheduler metrics.
+
+    Scheduler metrics include queue depth, batch sizes and the
+    rejected / timeout / cancelled counts.
+    """
+    try:
+        generation = ANALYZER.get().metrics()
+    except EngineUnavailable as e:
+        generation = {"engine": e.name, "state": e.state}
+    return {"answer_cache": ANSWER_CACHE.stats(), "generation": generation}
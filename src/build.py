@@ -0,0 +1,119 @@
+"""Build the artifact bundle the API maps in at startup.
+
+Usage:
+    python -m src.build
+    python -m src.build --csv data/maharashtra-forts.csv --out artifacts
+    python -m src.build --no-embeddings
+    python -m src.build --verify
+
+Refreshes the columnar copy of the CSV (data/*.cols), then writes a
+content-hashed bundle: the cleaned dataset, text / facet / spatial /
+similarity index state, cluster labels, centroids and fitted models,
+RAG passage embeddings (plus the ANN index when RAG_INDEX is not
+"exact") and a manifest with the sha256 of every file. The bundle is published by updating
+`<out>/CURRENT`; identical inputs give the same bundle id.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from src.core.artifacts import (
+    Bundle,
+    BundleWriter,
+    artifact_dir,
+    engine_params,
+    engine_state,
+)
+from src.core.cluster_engine import ClusterEngine
+from src.core.config import RAG_INDEX, RAG_MODEL
+from src.core.data_loader import DATA_PATH, save_forts_columnar
+from src.core.facets import FacetIndex
+from src.core.fort_store import FortStore
+from src.core.recommender import ProximityEngine, SimilarityEngine
+from src.core.text_index import TextIndex
+
+
+def build_bundle(csv=None, out=None, embeddings: bool = True) -> Bundle:
+    """Build and publish a bundle from `csv` into the `out` root.
+
+    Engines are built with the same defaults the API routers use, so
+    the API restores every one of them instead of rebuilding.
+    """
+    source = Path(csv) if csv else DATA_PATH
+    try:
+        save_forts_columnar(source)
+    except OSError as e:
+        # Read-only data directory: the bundle carries the data anyway
+        print(f"columnar copy not written: {e}", file=sys.stderr)
+    writer = BundleWriter(out or artifact_dir(), source)
+    try:
+        store = FortStore(source, artifacts=False).load()
+        writer.add_frame(store.frame)
+
+        engines = [
+            TextIndex(store), FacetIndex(store),
+            ProximityEngine(store), SimilarityEngine(store),
+        ]
+        for engine in engines:
+            engine.warm()
+            writer.add_state(
+                engine.ARTIFACT, engine_state(engine), engine_params(engine))
+
+        clusters = ClusterEngine(store=store)
+        clusters.build_clusters()
+        writer.add_state(
+            clusters.ARTIFACT, clusters.state(), engine_params(clusters))
+
+        params = {"rows": len(store)}
+        if embeddings:
+            from src.core.rag_engine import RAGEngine
+
+            rag = RAGEngine(
+                cache_dir=writer.subdir("rag"), model_name=RAG_MODEL,
+                index=RAG_INDEX)
+            rag.load_data(store.frame).build_index()
+            params.update(rag_model=RAG_MODEL, rag_index=RAG_INDEX)
+        return writer.commit(params)
+    except BaseException:
+        writer.abort()
+        raise
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    ap.add_argument("--csv", default=str(DATA_PATH))
+    ap.add_argument("--out", default=str(artifact_dir()))
+    ap.add_argument("--no-embeddings", action="store_true",
+                    help="skip the RAG embeddings (no model download)")
+    ap.add_argument("--verify", action="store_true",
+                    help="check the current bundle's file hashes and exit")
+    args = ap.parse_args()
+
+    if args.verify:
+        bundle = Bundle.open(args.out)
+        if bundle is None:
+            sys.exit(f"no bundle under {args.out}")
+        bad = bundle.verify()
+        for name in bad:
+            print(f"{bundle.id}: {name} is missing or modified")
+        print(f"{bundle.id}: {'FAILED' if bad else 'ok'}")
+        sys.exit(1 if bad else 0)
+
+    # Pickled sets iterate in hash order; fix the seed so the same
+    # inputs always produce byte-identical files (and bundle id)
+    if os.environ.get("PYTHONHASHSEED") != "0":
+        os.environ["PYTHONHASHSEED"] = "0"
+        os.execv(sys.executable, [sys.executable, "-m", "src.build", *sys.argv[1:]]) # NOQA E501
+
+    t0 = time.perf_counter()
+    bundle = build_bundle(args.csv, args.out, not args.no_embeddings)
+    files = bundle.manifest["files"]
+    size = sum(f["bytes"] for f in files.values())
+    print(f"{bundle.path}: {len(files)} files, {size / 1e6:.1f} MB "
+          f"in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
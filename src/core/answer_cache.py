@@ -0,0 +1,214 @@
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.query_encoder import normalize_query
+
+PUNCT_RE = re.compile(r"[^\w\s]+")
+
+EXACT = "exact"
+SIMILAR = "similar"
+MISS = "miss"
+
+
+def answer_key(query: str, variant: str = "") -> str:
+    """Level-one key: normalized question without punctuation."""
+    return f"{variant}|{normalize_query(PUNCT_RE.sub(' ', query))}"
+
+
+class _Entry:
+    __slots__ = ("key", "rows", "embedding", "answer", "created")
+
+    def __init__(self, key, rows, embedding, answer, created):
+        self.key = key
+        self.rows = rows
+        self.embedding = embedding
+        self.answer = answer
+        self.created = created
+
+
+class AnswerCache:
+    """Two-level cache of generated answers.
+
+    Level one maps the normalized question text to its answer. Level
+    two serves a new wording of a cached question: the retrieved fort
+    rows must be identical and the query embeddings must have cosine
+    similarity >= `threshold`.
+
+    Entries belong to a `scope` (model id, dataset generation, ...).
+    The first lookup or insert under a new scope drops every entry of
+    the old one, so answers never outlive the data or model they were
+    generated from. A `variant` (e.g. the token cap) separates answers
+    within a scope without invalidating anything. Entries also expire
+    after `ttl` seconds, and the least recently used are evicted beyond
+    `max_entries`.
+
+    With `path`, entries are written through to SQLite and reloaded
+    on start, so the cache survives restarts.
+
+    Args:
+        max_entries: in-memory (and on-disk) capacity
+        ttl: seconds an answer stays valid
+        threshold: cosine similarity for a level-two hit
+        path: optional SQLite file
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 24 * 3600, threshold: float = 0.92, path: Optional[str] = None): # NOQA E501
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self.path = path
+
+        self.scope: Optional[str] = None
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._by_rows = {}
+        self._lock = threading.Lock()
+        self.hits = {EXACT: 0, SIMILAR: 0, MISS: 0}
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                " key TEXT PRIMARY KEY, scope TEXT, rows TEXT,"
+                " embedding BLOB, answer TEXT, created REAL)")
+            self._db.commit()
+
+    # -----------------------------
+    # Scope / persistence
+    # -----------------------------
+    def _use_scope(self, scope: str):
+        if scope == self.scope:
+            return
+        self.scope = scope
+        self._entries.clear()
+        self._by_rows.clear()
+        if self._db is None:
+            return
+        self._db.execute("DELETE FROM answers WHERE scope != ?", (scope,))
+        self._db.execute(
+            "DELETE FROM answers WHERE created < ?", (time.time() - self.ttl,)) # NOQA E501
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT key, rows, embedding, answer, created FROM answers"
+            " ORDER BY created DESC LIMIT ?", (self.max_entries,)).fetchall()
+        for key, row_ids, emb, answer, created in reversed(rows):
+            self._insert(_Entry(
+                key, tuple(row_ids.split(",")),
+                np.frombuffer(emb, dtype=np.float32) if emb else None,
+                answer, created))
+
+    def _insert(self, entry: _Entry):
+        old = self._entries.pop(entry.key, None)
+        if old is not None:
+            self._by_rows.get(old.rows, {}).pop(old.key, None)
+        self._entries[entry.key] = entry
+        self._by_rows.setdefault(entry.rows, {})[entry.key] = entry
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        bucket = self._by_rows.get(entry.rows, {})
+        bucket.pop(key, None)
+        if not bucket:
+            self._by_rows.pop(entry.rows, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM answers WHERE key = ?", (key,))
+            self._db.commit()
+
+    def _fresh(self, entry: _Entry) -> bool:
+        if time.time() - entry.created <= self.ttl:
+            return True
+        self._remove(entry.key)
+        return False
+
+    # -----------------------------
+    # Lookup / insert
+    # -----------------------------
+    def get_exact(self, query: str, scope: str, variant: str = "") -> Optional[str]: # NOQA E501
+        """Level one: same normalized question under the same scope."""
+        key = answer_key(query, variant)
+        with self._lock:
+            self._use_scope(scope)
+            entry = self._entries.get(key)
+            if entry is None or not self._fresh(entry):
+                return None
+            self._entries.move_to_end(key)
+            self.hits[EXACT] += 1
+            return entry.answer
+
+    def get_similar(self, embedding: np.ndarray, rows: Sequence, scope: str, variant: str = "") -> Optional[str]: # NOQA E501
+        """Level two: same retrieved rows and a close query embedding."""
+        rows = (variant,) + tuple(str(r) for r in rows)
+        q = np.asarray(embedding, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+        with self._lock:
+            self._use_scope(scope)
+            best, best_sim = None, self.threshold
+            for entry in list(self._by_rows.get(rows, {}).values()):
+                if entry.embedding is None or not self._fresh(entry):
+                    continue
+                sim = float(entry.embedding @ q)
+                if sim >= best_sim:
+                    best, best_sim = entry, sim
+            if best is None:
+                self.hits[MISS] += 1
+                return None
+            self._entries.move_to_end(best.key)
+            self.hits[SIMILAR] += 1
+            return best.answer
+
+    def put(self, query: str, embedding: Optional[np.ndarray], rows: Sequence, answer: str, scope: str, variant: str = ""): # NOQA E501
+        key = answer_key(query, variant)
+        rows = (variant,) + tuple(str(r) for r in rows)
+        emb = None
+        if embedding is not None:
+            emb = np.asarray(embedding, dtype=np.float32)
+            emb = emb / (np.linalg.norm(emb) or 1.0)
+        entry = _Entry(key, rows, emb, answer, time.time())
+        with self._lock:
+            self._use_scope(scope)
+            self._insert(entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?)", # NOQA E501
+                    (key, scope, ",".join(rows),
+                     emb.tobytes() if emb is not None else None,
+                     answer, entry.created))
+                self._db.commit()
+
+    def lookup(self, query: str, embedding: Optional[np.ndarray], rows: Sequence, scope: str, variant: str = "") -> Tuple[str, Optional[str]]: # NOQA E501
+        """Both levels in order; returns (level, answer or None)."""
+        answer = self.get_exact(query, scope, variant)
+        if answer is not None:
+            return EXACT, answer
+        if embedding is None:
+            self.hits[MISS] += 1
+            return MISS, None
+        answer = self.get_similar(embedding, rows, scope, variant)
+        return (SIMILAR, answer) if answer is not None else (MISS, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_rows.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM answers")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "scope": self.scope,
+            "persistent": self._db is not None,
+            "hits": dict(self.hits),
+        }
@@ -0,0 +1,229 @@
+import re
+from typing import Optional, Tuple
+
+FAST = "fast"
+LLM = "llm"
+AUTO = "auto"
+MODES = (AUTO, FAST, LLM)
+
+# Values that mean "we don't know" in the dataset
+MISSING = {"", "unknown", "information not available", "nan"}
+
+# Questions the templates cannot answer well: open-ended, comparative
+# or explanatory, and questions about people or events ("who ruled",
+# "what happened"), which the records only list. These are routed to
+# the LLM; "who built" stays with the history template.
+LLM_PATTERNS = re.compile(
+    r"\b(why|how did|how was|explain|compare|comparison|versus|vs|"
+    r"difference|story|significance|important|importance|describe|"
+    r"itinerary|plan|suggest|recommend|should i|"
+    r"who(?! (?:built|made|constructed))|what happened|happened|"
+    r"history|historical)\b")
+
+# intent -> trigger words, checked in order (first match wins). Whole
+# words only; plurals and other forms are listed where wanted.
+INTENTS = [
+    ("trek_time", r"how long|how many hours|trek time|time to (climb|reach)|duration"), # NOQA E501
+    ("difficulty", r"difficult|difficulty|hard|harder|easy|easier|tough|tougher|beginners?"), # NOQA E501
+    ("season", r"seasons?|when (should|to|can)|best time|monsoons?|winters?|summers?"), # NOQA E501
+    ("water", r"water|drink|drinking"),
+    ("stay", r"stay|staying|accommodation|camp|camps|camping|nights?|overnight"), # NOQA E501
+    ("elevation", r"elevation|altitude|height|how high|how tall"),
+    ("history", r"built|builder|who (made|constructed)|history|historic|eras?|dynasty|dynasties|years?|events?|battles?"), # NOQA E501
+    ("location", r"where|location|located|districts?|taluka|villages?|reach|near|nearest"), # NOQA E501
+    ("type", r"what (type|kind)|type of|sea fort|hill fort|land fort"),
+]
+INTENT_RES = [(name, re.compile(rf"\b(?:{pat})\b")) for name, pat in INTENTS] # NOQA E501
+
+
+def _value(row: dict, field: str) -> Optional[str]:
+    val = row.get(field)
+    if val is None:
+        return None
+    text = str(val).strip()
+    if text.lower() in MISSING:
+        return None
+    if isinstance(val, float) and val.is_integer():
+        text = str(int(val))
+    return text
+
+
+def detect_intent(query: str) -> str:
+    """Classify a question into one template intent ("overview" if none)."""
+    q = query.lower()
+    for name, pattern in INTENT_RES:
+        if pattern.search(q):
+            return name
+    return "overview"
+
+
+def route(query: str, mode: str = AUTO) -> Tuple[str, str]:
+    """Pick the answer path for a question.
+
+    Args:
+        query: user question
+        mode: "fast" (always template), "llm" (always LLM) or "auto"
+
+    Returns:
+        (path, intent) where path is "fast" or "llm"
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}'. Valid: {', '.join(MODES)}")
+    intent = detect_intent(query)
+    if mode != AUTO:
+        return mode, intent
+    if LLM_PATTERNS.search(query.lower()):
+        return LLM, intent
+    return FAST, intent
+
+
+# -----------------------------
+# Templates
+# -----------------------------
+def _location(row, name):
+    district, taluka = _value(row, "district"), _value(row, "taluka")
+    village = _value(row, "base_village")
+    if not district:
+        return None
+    where = f"{taluka} taluka, {district} district" if taluka else f"{district} district" # NOQA E501
+    out = f"{name} is in {where} of Maharashtra."
+    if village:
+        out += f" The base village is {village}."
+    return out
+
+
+def _history(row, name):
+    parts = []
+    built_by, year = _value(row, "built_by"), _value(row, "year_of_construction") # NOQA E501
+    era = _value(row, "era")
+    if built_by and year:
+        parts.append(f"{name} was built by {built_by} ({year}).")
+    elif built_by:
+        parts.append(f"{name} was built by {built_by}.")
+    elif year:
+        parts.append(f"{name} dates to {year}.")
+    if era:
+        parts.append(f"It is associated with the {era}.")
+    events = _value(row, "key_events")
+    if events:
+        parts.append(f"Key events: {events.rstrip('.')}.")
+    return " ".join(parts) or None
+
+
+def _difficulty(row, name):
+    level = _value(row, "trek_difficulty")
+    if not level:
+        return None
+    out = f"The trek to {name} is rated {level.lower()}."
+    hours = _value(row, "trek_time_hours")
+    if hours:
+        out += f" It takes about {hours} hour(s)."
+    return out
+
+
+def _trek_time(row, name):
+    hours = _value(row, "trek_time_hours")
+    if not hours:
+        return None
+    out = f"The trek to {name} takes about {hours} hour(s)"
+    level = _value(row, "trek_difficulty")
+    return out + (f" and is rated {level.lower()}." if level else ".")
+
+
+def _season(row, name):
+    season = _value(row, "best_season")
+    if not season:
+        return None
+    seasons = " or ".join(s.strip() for s in season.split(";") if s.strip())
+    return f"The best time to visit {name} is {seasons}."
+
+
+def _water(row, name):
+    water = _value(row, "water_availability")
+    if not water:
+        return None
+    if water.lower() == "none":
+        return f"There is no drinking water on {name}; carry your own."
+    return f"Water availability at {name}: {water}."
+
+
+def _stay(row, name):
+    stay = _value(row, "accommodation")
+    if not stay:
+        return None
+    if stay.lower() == "none":
+        return f"There is no accommodation at {name}."
+    return f"Accommodation at {name}: {stay}."
+
+
+def _elevation(row, name):
+    elevation = _value(row, "elevation_m")
+    if not elevation:
+        return None
+    return f"{name} stands at about {elevation} m above sea level."
+
+
+def _type(row, name):
+    kind = _value(row, "type")
+    if not kind:
+        return None
+    out = f"{name} is a {kind}."
+    condition = _value(row, "current_condition")
+    if condition:
+        out += f" Its current condition: {condition.lower()}."
+    return out
+
+
+def _overview(row, name):
+    parts = [_type(row, name), _location(row, name), _history(row, name)]
+    level = _value(row, "trek_difficulty")
+    if level:
+        parts.append(f"The trek is {level.lower()}.")
+    season = _value(row, "best_season")
+    if season:
+        parts.append(f"Best season: {season}.")
+    notes = _value(row, "notes")
+    if notes:
+        parts.append(notes.rstrip(".") + ".")
+    return " ".join(p for p in parts if p)
+
+
+# How a missing intent field is described in the fallback answer
+LABELS = {
+    "location": "The location",
+    "history": "The history",
+    "difficulty": "The trek difficulty",
+    "trek_time": "The trek time",
+    "season": "The best season",
+    "water": "Water availability",
+    "stay": "Accommodation",
+    "elevation": "The elevation",
+    "type": "The fort type",
+}
+
+TEMPLATES = {
+    "location": _location,
+    "history": _history,
+    "difficulty": _difficulty,
+    "trek_time": _trek_time,
+    "season": _season,
+    "water": _water,
+    "stay": _stay,
+    "elevation": _elevation,
+    "type": _type,
+    "overview": _overview,
+}
+
+
+def render_answer(row: dict, intent: str = "overview") -> str:
+    """Turn one fort record into natural-language sentences.
+
+    Falls back to the overview when the intent's fields are missing.
+    """
+    name = _value(row, "name") or "This fort"
+    text = TEMPLATES.get(intent, _overview)(row, name)
+    if not text:
+        label = LABELS.get(intent)
+        missing = f"{label} of {name} is not recorded. " if label else ""
+        text = missing + _overview(row, name)
+    return " ".join(text.split())
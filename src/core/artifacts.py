@@ -0,0 +1,270 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.core.columnar import file_sha256, load_columnar, save_columnar
+
+# Bump when the bundle layout changes; older bundles are then ignored
+FORMAT = 2
+
+# Default: project_root/artifacts (override with ARTIFACT_DIR)
+ARTIFACT_DIR = Path(__file__).resolve().parents[2] / "artifacts"
+# File in the artifact root naming the bundle to serve
+CURRENT = "CURRENT"
+MANIFEST = "manifest.json"
+
+
+def artifact_dir() -> Path:
+    return Path(os.environ.get("ARTIFACT_DIR") or ARTIFACT_DIR)
+
+
+def _jsonable(obj):
+    """Normalize params (tuples, numpy scalars) for manifest comparison."""
+    return json.loads(json.dumps(obj, default=float))
+
+
+class Bundle:
+    """A built, read-only artifact bundle (see `python -m src.build`).
+
+    Layout of `<root>/<bundle id>/`:
+
+    - manifest.json: format, source CSV hash, build params and the
+      sha256 of every file
+    - dataset.cols/: the cleaned fort frame, typed and columnar
+      (see src/core/columnar.py)
+    - <name>.pkl + <name>.<array>.npy: one engine's state; arrays are
+      memory-mapped read-only on load
+    - rag/: RAGEngine cache (corpus embeddings, vector index), read
+      by the API as `prebuilt_dir` and never written to
+
+    `<root>/CURRENT` names the bundle to serve.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / MANIFEST) as f:
+            self.manifest = json.load(f)
+
+    @property
+    def id(self) -> str:
+        return self.path.name
+
+    @classmethod
+    def open(cls, root=None, source=None) -> Optional["Bundle"]:
+        """The current bundle under `root`, or None if there is none.
+
+        `root` may also be a bundle directory itself. With `source`,
+        a bundle built from a different CSV than the one on disk is
+        stale and ignored, so editing the CSV never serves old data.
+        """
+        root = Path(root) if root else artifact_dir()
+        path = root
+        if not (root / MANIFEST).exists():
+            try:
+                path = root / (root / CURRENT).read_text().strip()
+            except OSError:
+                return None
+        try:
+            bundle = cls(path)
+        except (OSError, ValueError):
+            return None
+        if bundle.manifest.get("format") != FORMAT:
+            return None
+        if source is not None and Path(source).exists():
+            if file_sha256(source) != bundle.manifest["source"]["sha256"]:
+                return None
+        return bundle
+
+    def verify(self) -> List[str]:
+        """Files that are missing or whose content hash changed."""
+        bad = []
+        for name, meta in self.manifest["files"].items():
+            path = self.path / name
+            if not path.exists() or file_sha256(path) != meta["sha256"]:
+                bad.append(name)
+        return bad
+
+    # -----------------------------
+    # Contents
+    # -----------------------------
+    def frame(self) -> pd.DataFrame:
+        return load_columnar(self.path / "dataset.cols")
+
+    def has(self, name: str) -> bool:
+        return name in self.manifest["states"]
+
+    def params(self, name: str) -> dict:
+        return self.manifest["states"][name]["params"]
+
+    def load_state(self, name: str, mmap: bool = True) -> dict:
+        entry = self.manifest["states"][name]
+        with open(self.path / f"{name}.pkl", "rb") as f:
+            state = pickle.load(f)
+        for key in entry["arrays"]:
+            state[key] = np.load(
+                self.path / f"{name}.{key}.npy",
+                mmap_mode="r" if mmap else None)
+        return state
+
+
+class BundleWriter:
+    """Writes a bundle into a temp directory, then publishes it.
+
+    The bundle id is a hash of the file hashes, so identical inputs
+    give the same id. `commit()` renames the finished directory into
+    place and only then updates CURRENT, so readers never see a
+    partial bundle.
+    """
+
+    def __init__(self, root, source):
+        self.root = Path(root)
+        self.source = Path(source)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.tmp = Path(tempfile.mkdtemp(dir=self.root, prefix=".build-"))
+        self.states: Dict[str, dict] = {}
+
+    def add_frame(self, df: pd.DataFrame):
+        save_columnar(df, self.tmp / "dataset.cols")
+
+    def add_state(self, name: str, state: dict, params: Optional[dict] = None): # NOQA E501
+        """Save one engine's state; plain ndarrays go to their own .npy."""
+        arrays = {
+            k: v for k, v in state.items()
+            if isinstance(v, np.ndarray) and v.dtype != object
+        }
+        rest = {k: v for k, v in state.items() if k not in arrays}
+        with open(self.tmp / f"{name}.pkl", "wb") as f:
+            pickle.dump(rest, f, protocol=5)
+        for key, arr in arrays.items():
+            np.save(self.tmp / f"{name}.{key}.npy", arr)
+        self.states[name] = {
+            "params": _jsonable(params or {}), "arrays": sorted(arrays)}
+
+    def subdir(self, name: str) -> Path:
+        path = self.tmp / name
+        path.mkdir(exist_ok=True)
+        return path
+
+    def commit(self, params: Optional[dict] = None) -> Bundle:
+        files = {
+            str(p.relative_to(self.tmp)): {
+                "sha256": file_sha256(p), "bytes": p.stat().st_size}
+            for p in sorted(self.tmp.rglob("*")) if p.is_file()
+        }
+        digest = hashlib.sha256(json.dumps(
+            [FORMAT, files], sort_keys=True).encode()).hexdigest()
+        manifest = {
+            "format": FORMAT,
+            "source": {
+                "path": self.source.name,
+                "sha256": file_sha256(self.source),
+            },
+            "params": _jsonable(params or {}),
+            "states": self.states,
+            "files": files,
+        }
+        with open(self.tmp / MANIFEST, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.chmod(self.tmp, 0o755)
+
+        target = self.root / f"forts-{digest[:16]}"
+        if target.exists():
+            shutil.rmtree(self.tmp)  # same inputs, same bundle
+        else:
+            os.replace(self.tmp, target)
+        pointer = self.root / f".{CURRENT}.tmp"
+        pointer.write_text(target.name + "\n")
+        os.replace(pointer, self.root / CURRENT)
+        return Bundle(target)
+
+    def abort(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+# -----------------------------
+# Engine state
+# -----------------------------
+def engine_state(engine) -> dict:
+    """The attributes listed in `engine.STATE`."""
+    return {name: getattr(engine, name) for name in engine.STATE}
+
+
+def engine_params(engine) -> dict:
+    """The build settings listed in `engine.PARAMS`."""
+    return {name: getattr(engine, name) for name in engine.PARAMS}
+
+
+def bundled_state(engine, store) -> Optional[dict]:
+    """State saved for `engine.ARTIFACT` in the store's bundle, if it
+    was built with the engine's current params."""
+    bundle = getattr(store, "bundle", None)
+    name = engine.ARTIFACT
+    if bundle is None or not bundle.has(name):
+        return None
+    if bundle.params(name) != _jsonable(engine_params(engine)):
+        return None
+    return bundle.load_state(name)
+
+
+def restore(engine, store) -> bool:
+    """Set the engine's STATE attributes from the store's bundle.
+
+    Returns:
+        False if there is no matching state (the caller builds)
+    """
+    state = bundled_state(engine, store)
+    if state is None:
+        return False
+    for name, value in state.items():
+        setattr(engine, name, value)
+    return True
+
+
+class BundledEngine:
+    """Base for indexes derived from a FortStore's frame.
+
+    Subclasses name their bundle entry and implement `_build(df)`:
+
+    - ARTIFACT: entry name in the bundle
+    - PARAMS: build settings; a bundle built with others is not used
+    - STATE: attributes saved by `python -m src.build`
+
+    On first use, and again whenever the store generation changes,
+    the state is restored from the store's bundle when it matches and
+    built otherwise. Engines without a store are built explicitly
+    (`from_frame`).
+    """
+
+    ARTIFACT: str = ""
+    PARAMS: Tuple[str, ...] = ()
+    STATE: Tuple[str, ...] = ()
+
+    store = None
+    generation = None
+
+    def _build(self, df: pd.DataFrame):
+        raise NotImplementedError
+
+    def _restored(self):
+        """Called after the state was restored from the bundle."""
+
+    def _ensure(self):
+        if self.store is not None and self.generation != self.store.generation:
+            if restore(self, self.store):
+                self._restored()
+            else:
+                self._build(self.store.frame)
+            self.generation = self.store.generation
+
+    def warm(self):
+        """Build now rather than on first use (e.g. before forking)."""
+        self._ensure()
+        return self
@@ -0,0 +1,62 @@
+from typing import List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from src.core.text_index import tokenize
+from src.core.vector_index import _top_k
+
+
+class BM25Index:
+    """Okapi BM25 over a list of passages, as one sparse matrix.
+
+    Per-(passage, term) BM25 weights are precomputed into a CSC matrix,
+    so a query is the sum of its term columns; only passages sharing a
+    term with the query are touched.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab = {}
+        self.weights = None
+
+    def build(self, texts: List[str]) -> "BM25Index":
+        rows, cols = [], []
+        for i, text in enumerate(texts):
+            for tok in tokenize(text):
+                rows.append(i)
+                cols.append(self.vocab.setdefault(tok, len(self.vocab)))
+
+        n = len(texts)
+        tf = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(n, len(self.vocab)))
+        tf.sum_duplicates()
+
+        doc_len = np.asarray(tf.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() if n else 0.0
+        df = np.bincount(tf.indices, minlength=len(self.vocab))
+        idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        # tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len)) * idf
+        norm = self.k1 * (1 - self.b + self.b * doc_len / (avg_len or 1))
+        w = tf.tocoo()
+        data = w.data * (self.k1 + 1) / (w.data + norm[w.row]) * idf[w.col]
+        self.weights = sparse.csc_matrix(
+            (data.astype(np.float32), (w.row, w.col)), shape=tf.shape)
+        return self
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every passage (0 where no term matches)."""
+        cols = [self.vocab[t] for t in set(tokenize(query)) if t in self.vocab]
+        if not cols:
+            return np.zeros(self.weights.shape[0], dtype=np.float32)
+        return np.asarray(self.weights[:, cols].sum(axis=1)).ravel()
+
+    def search(self, query: str, k: int = 5) -> Tuple[np.ndarray, np.ndarray]: # NOQA E501
+        """Return (passage indices, scores) of the k best matches > 0."""
+        scores = self.scores(query)
+        top = _top_k(scores, k)
+        top = top[scores[top] > 0]
+        return top, scores[top]
@@ -0,0 +1,100 @@
+from typing import Iterator, List
+
+import pandas as pd
+
+# Placeholder values that carry no information for retrieval
+MISSING = {"", "information not available", "nan", "none available"}
+
+# Short facts merged into one "summary" passage per fort
+SUMMARY_FIELDS = [
+    ("district", "District"),
+    ("taluka", "Taluka"),
+    ("type", "Type"),
+    ("built_by", "Built by"),
+    ("era", "Era"),
+    ("year_of_construction", "Built"),
+    ("trek_difficulty", "Trek difficulty"),
+    ("best_season", "Best season"),
+    ("water_availability", "Water"),
+    ("alternate_names", "Also known as"),
+]
+
+# Free-text fields that get their own (chunked) passages
+LONG_FIELDS = ["key_events", "notes", "description"]
+
+
+def _clean(s: pd.Series) -> pd.Series:
+    s = s.astype(str).str.strip()
+    return s.where(~s.str.lower().isin(MISSING), "")
+
+
+def _windows(words: List[str], max_words: int, overlap: int) -> List[str]:
+    if len(words) <= max_words:
+        return [" ".join(words)]
+    step = max(1, max_words - overlap)
+    return [
+        " ".join(words[i:i + max_words])
+        for i in range(0, len(words) - overlap, step)
+    ]
+
+
+def build_passages(df: pd.DataFrame, max_words: int = 120, overlap: int = 20) -> pd.DataFrame: # NOQA E501
+    """Split fort rows into field-aware passages with provenance.
+
+    Every fort yields one summary passage of its short facts, plus one
+    or more passages per non-empty long text field. Long fields are cut
+    into overlapping word windows that fit MiniLM's 256-token limit.
+    Each passage is prefixed with the fort name so it stands alone.
+    Placeholders such as "Information Not Available" are dropped.
+
+    Returns:
+        pd.DataFrame with columns: row (position in df), field, chunk,
+        text
+    """
+    name = _clean(df["name"])
+    frames = []
+
+    facts = pd.Series("", index=df.index)
+    for col, label in SUMMARY_FIELDS:
+        if col not in df.columns:
+            continue
+        val = _clean(df[col])
+        facts = facts + (label + ": " + val + ". ").where(val != "", "")
+    summary = name.where(name == "", name + ". ") + facts
+    frames.append(pd.DataFrame({
+        "row": range(len(df)), "field": "summary", "chunk": 0,
+        "text": summary.str.strip().tolist(),
+    }))
+
+    for col in LONG_FIELDS:
+        if col not in df.columns:
+            continue
+        val = _clean(df[col])
+        keep = (val != "").to_numpy()
+        if not keep.any():
+            continue
+        chunks = val[keep].str.split().map(
+            lambda w: _windows(w, max_words, overlap))
+        part = pd.DataFrame({
+            "row": pd.Series(range(len(df)))[keep].to_numpy(),
+            "text": chunks.to_numpy(),
+            "prefix": (name[keep] + " — " + col.replace("_", " ") + ": ")
+            .to_numpy(),
+        }).explode("text", ignore_index=True)
+        part["chunk"] = part.groupby("row").cumcount()
+        part["field"] = col
+        part["text"] = part["prefix"] + part["text"]
+        frames.append(part[["row", "field", "chunk", "text"]])
+
+    passages = pd.concat(frames, ignore_index=True)
+    passages = passages[passages["text"].str.strip() != ""]
+    field_order = {f: i for i, f in enumerate(["summary"] + LONG_FIELDS)}
+    passages = passages.assign(_f=passages["field"].map(field_order))
+    return passages.sort_values(["row", "_f", "chunk"], kind="stable") \
+        .drop(columns="_f").reset_index(drop=True)
+
+
+def iter_batches(items: list, batch_size: int) -> Iterator[list]:
+    """Yield consecutive slices of at most batch_size items."""
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
@@ -2,14 +2,20 @@ import pandas as pd
 import numpy as np
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
-from pathlib import Path
-
-CSV_PATH = Path("data/maharashtra-forts.csv")   # your dataset path
+from src.core import artifacts
+from src.core.fort_store import get_store
 
 
 class ClusterEngine:
-    def __init__(self, n_clusters=6):
+    # Bundle entry (see src/core/artifacts.py)
+    ARTIFACT = "clusters"
+    PARAMS = ("n_clusters",)
+
+    def __init__(self, n_clusters=6, store=None):
         self.n_clusters = n_clusters
+        self.store = store or get_store()
+        self.generation = None
+        self.builds = 0
         self.df = None
         self.cluster_counts = None
         self.scaler = None
@@ -19,9 +25,12 @@ class ClusterEngine:
     # Load + Preprocess
     # -----------------------------
     def load_data(self):
-        df = pd.read_csv(CSV_PATH)
-        df = df.copy()
-        df = df.fillna(value='Information Not Available')
+        # Private copy: cluster columns are added to this frame
+        df = self.store.frame.copy()
+        # Categorical columns (columnar loads) have no gaps to fill
+        fill = [c for c in df.columns
+                if not isinstance(df[c].dtype, pd.CategoricalDtype)]
+        df[fill] = df[fill].fillna(value='Information Not Available')
 
         # Standardize latitude/longitude column names
         df["latitude"] = pd.to_numeric(
@@ -48,6 +57,7 @@ class ClusterEngine:
             df["difficulty_num"].median(), inplace=True)
 
         self.df = df
+        self.generation = self.store.generation
         return df
 
     @staticmethod
@@ -70,7 +80,7 @@ class ClusterEngine:
     # Build Clusters
     # -----------------------------
     def build_clusters(self):
-        if self.df is None:
+        if self.df is None or self.generation != self.store.generation:
             self.load_data()
 
         features = self.df[
@@ -78,15 +88,21 @@ class ClusterEngine:
                 "trek_time_hours", "difficulty_num"]
         ]
 
-        # Scale features
-        self.scaler = StandardScaler()
-        X = self.scaler.fit_transform(features)
-
-        # Train KMeans
-        self.kmeans = KMeans(
-            n_clusters=self.n_clusters, random_state=42, n_init=10
-        )
-        labels = self.kmeans.fit_predict(X)
+        # Prebuilt labels from the artifact bundle, when they match
+        state = artifacts.bundled_state(self, self.store)
+        if state is not None:
+            self.scaler, self.kmeans = state["scaler"], state["kmeans"]
+            labels = state["labels"]
+        else:
+            # Scale features
+            self.scaler = StandardScaler()
+            X = self.scaler.fit_transform(features)
+
+            # Train KMeans
+            self.kmeans = KMeans(
+                n_clusters=self.n_clusters, random_state=42, n_init=10
+            )
+            labels = self.kmeans.fit_predict(X)
 
         # Add cluster column
         self.df["cluster"] = labels.astype(int)
@@ -95,18 +111,46 @@ class ClusterEngine:
         self.cluster_counts = (
             self.df["cluster"].value_counts().sort_index().to_dict()
         )
+        self.builds += 1
 
         return self.df, self.cluster_counts
 
+    def load_bundled(self) -> bool:
+        """Adopt the bundle's prebuilt labels; never fits KMeans.
+
+        Safe in a process that forks afterwards (gunicorn preload):
+        fitting starts an OpenMP thread pool that forked children
+        cannot use.
+
+        Returns:
+            False if the bundle has no matching labels
+        """
+        if artifacts.bundled_state(self, self.store) is None:
+            return False
+        self.build_clusters()
+        return True
+
+    def state(self) -> dict:
+        """Fitted scaler / model and labels, for the artifact bundle."""
+        return {
+            "labels": self.df["cluster"].to_numpy(),
+            "centroids": self.kmeans.cluster_centers_,
+            "scaler": self.scaler,
+            "kmeans": self.kmeans,
+        }
+
     # -----------------------------
     # Get Results
     # -----------------------------
+    def is_stale(self):
+        return self.df is None or self.generation != self.store.generation
+
     def get_clustered_data(self):
-        if self.df is None:
+        if self.is_stale():
             self.build_clusters()
         return self.df
 
     def get_cluster_counts(self):
-        if self.cluster_counts is None:
+        if self.cluster_counts is None or self.is_stale():
             self.build_clusters()
         return self.cluster_counts
@@ -0,0 +1,236 @@
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX: writes are not locked
+    fcntl = None
+
+# Bump when the on-disk layout changes; older copies are then rebuilt
+FORMAT = 1
+SUFFIX = ".cols"
+META = "columns.json"
+
+# Low-cardinality text columns kept dictionary-encoded, on disk (int
+# codes + category list) and in memory (pandas Categorical)
+CATEGORICAL = ("district", "type", "era", "best_season")
+
+
+def file_sha256(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def columnar_path(csv_path) -> Path:
+    """Where the columnar copy of a CSV lives (next to it)."""
+    return Path(csv_path).with_suffix(SUFFIX)
+
+
+@contextlib.contextmanager
+def write_lock(path):
+    """Exclusive, cross-process lock for (re)writing the copy at `path`.
+
+    Held by whoever builds the copy (e.g. a preforking master and the
+    inference worker starting together), so only one of them writes it.
+    """
+    path = Path(path)
+    lock_file = path.with_name(f".{path.name}.lock")
+    with open(lock_file, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def as_columnar(df: pd.DataFrame, categorical: Iterable[str] = CATEGORICAL) -> pd.DataFrame: # NOQA E501
+    """`df` with the dtypes load_columnar would give it, in memory.
+
+    Used when the copy cannot be written, so every process sees the
+    same column types either way.
+    """
+    names = [c for c in categorical if c in df.columns and df[c].dtype == object] # NOQA E501
+    return df.astype({c: "category" for c in names})
+
+
+def _is_missing(v) -> bool:
+    return v is None or (isinstance(v, float) and np.isnan(v))
+
+
+def _is_number(v) -> bool:
+    return isinstance(v, (int, float, np.number)) and not isinstance(v, bool)
+
+
+def _kind(series: pd.Series, categorical: Iterable[str]) -> str:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return "category"
+    if series.dtype != object:
+        return "numeric"
+    values = [v for v in series.tolist() if not _is_missing(v)]
+    if all(isinstance(v, str) for v in values):
+        return "category" if series.name in categorical else "string"
+    if all(isinstance(v, str) or _is_number(v) for v in values):
+        return "mixed"
+    raise ValueError(f"Column '{series.name}' holds unsupported values")
+
+
+# -----------------------------
+# Strings: one UTF-8 blob + character offsets
+# -----------------------------
+def _save_strings(values: list, prefix: Path):
+    null = np.array([_is_missing(v) for v in values], dtype=bool)
+    texts = ["" if n else str(v) for v, n in zip(values, null)]
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum([len(t) for t in texts], out=offsets[1:])
+    prefix.with_suffix(".utf8").write_bytes("".join(texts).encode("utf-8"))
+    np.save(prefix.with_suffix(".offsets.npy"), offsets)
+    if null.any():
+        np.save(prefix.with_suffix(".null.npy"), null)
+
+
+def _load_strings(prefix: Path) -> np.ndarray:
+    text = prefix.with_suffix(".utf8").read_bytes().decode("utf-8")
+    bounds = np.load(prefix.with_suffix(".offsets.npy")).tolist()
+    out = np.empty(len(bounds) - 1, dtype=object)
+    out[:] = [text[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+    null_file = prefix.with_suffix(".null.npy")
+    if null_file.exists():
+        out[np.load(null_file)] = None
+    return out
+
+
+# -----------------------------
+# Save / load
+# -----------------------------
+def save_columnar(df: pd.DataFrame, path, source_sha256: Optional[str] = None, categorical: Iterable[str] = CATEGORICAL) -> Path: # NOQA E501
+    """Write `df` as a directory of typed, memory-mappable columns.
+
+    - numeric: one .npy with the column dtype
+    - category: int codes .npy; categories in columns.json
+    - string: UTF-8 blob + offsets (+ null mask)
+    - mixed (text and numbers, e.g. "2.5" hours vs. "Unknown"): the
+      string encoding plus the numbers and an is-number mask
+
+    The directory is written next to `path` and swapped in whole.
+
+    Raises:
+        ValueError: for a non-default index or unsupported values
+    """
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        raise ValueError("Columnar frames need a default RangeIndex")
+    path = Path(path)
+    tmp = Path(tempfile.mkdtemp(dir=path.parent, prefix=path.name + "."))
+    try:
+        columns = []
+        for i, name in enumerate(df.columns):
+            series = df[name]
+            kind = _kind(series, categorical)
+            prefix = tmp / f"{i:03d}"
+            entry = {"name": name, "kind": kind, "file": prefix.name}
+            if kind == "numeric":
+                np.save(prefix.with_suffix(".npy"), series.to_numpy())
+            elif kind == "category":
+                cat = pd.Categorical(series)
+                entry["categories"] = [str(c) for c in cat.categories]
+                np.save(prefix.with_suffix(".codes.npy"), cat.codes)
+            else:
+                values = series.tolist()
+                if kind == "mixed":
+                    isnum = np.array([_is_number(v) for v in values])
+                    nums = [v if n else 0 for v, n in zip(values, isnum)]
+                    as_float = any(isinstance(v, float) for v in nums)
+                    np.save(prefix.with_suffix(".isnum.npy"), isnum)
+                    np.save(prefix.with_suffix(".num.npy"), np.array(
+                        nums, dtype=np.float64 if as_float else np.int64))
+                    values = [None if n else v for v, n in zip(values, isnum)] # NOQA E501
+                _save_strings(values, prefix)
+            columns.append(entry)
+
+        meta = {
+            "format": FORMAT,
+            "rows": len(df),
+            "source_sha256": source_sha256,
+            "columns": columns,
+        }
+        (tmp / META).write_text(json.dumps(meta, indent=2))
+        os.chmod(tmp, 0o755)
+
+        old = None
+        if path.exists():
+            old = path.with_name(f".{path.name}.old-{os.getpid()}")
+            os.replace(path, old)
+        os.replace(tmp, path)
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return path
+
+
+def load_columnar(path, source_sha256: Optional[str] = None, mmap: bool = True) -> Optional[pd.DataFrame]: # NOQA E501
+    """Read a frame written by save_columnar.
+
+    Numeric columns and category codes are memory-mapped read-only
+    (no parsing, no copy); text columns are decoded from their blob.
+
+    Args:
+        source_sha256: if given, a copy made from a different source
+            file is stale and None is returned
+
+    Returns:
+        pd.DataFrame, or None if `path` is missing, stale, from an
+        older format or was replaced while being read
+    """
+    path = Path(path)
+    try:
+        meta = json.loads((path / META).read_text())
+    except (OSError, ValueError):
+        return None
+    if meta.get("format") != FORMAT:
+        return None
+    if source_sha256 is not None and meta["source_sha256"] != source_sha256:
+        return None
+    try:
+        return _read_columns(path, meta, mmap)
+    except (OSError, ValueError):
+        # Swapped out by a concurrent save_columnar: caller re-reads
+        # or falls back to the source
+        return None
+
+
+def _read_columns(path: Path, meta: dict, mmap: bool) -> pd.DataFrame:
+    mode = "r" if mmap else None
+    data = {}
+    for entry in meta["columns"]:
+        prefix = path / entry["file"]
+        kind = entry["kind"]
+        if kind == "numeric":
+            data[entry["name"]] = np.load(
+                prefix.with_suffix(".npy"), mmap_mode=mode)
+        elif kind == "category":
+            data[entry["name"]] = pd.Categorical.from_codes(
+                np.load(prefix.with_suffix(".codes.npy"), mmap_mode=mode),
+                entry["categories"])
+        else:
+            values = _load_strings(prefix)
+            if kind == "mixed":
+                isnum = np.load(prefix.with_suffix(".isnum.npy"))
+                nums = np.load(prefix.with_suffix(".num.npy"))[isnum]
+                values[isnum] = np.array(nums.tolist(), dtype=object)
+            data[entry["name"]] = values
+    return pd.DataFrame(data, columns=[c["name"] for c in meta["columns"]], copy=False) # NOQA E501
@@ -0,0 +1,12 @@
+import os
+
+# Settings shared by the API and the offline build (src/build.py), so
+# the bundle is built with exactly what the API will look for.
+
+LLM_MODEL = "Qwen/Qwen2-1.5B-Instruct"
+RAG_MODEL = "all-MiniLM-L6-v2"
+
+# Vector index behind RAGEngine: "exact" (default), "ivf" or "ivfpq"
+RAG_INDEX = os.environ.get("RAG_INDEX", "exact")
+# Retrieval: "hybrid" (BM25 + dense, default), "dense" or "sparse"
+RAG_RETRIEVAL = os.environ.get("RAG_RETRIEVAL", "hybrid")
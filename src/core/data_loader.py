@@ -1,21 +1,43 @@
 from pathlib import Path
 from typing import Optional
 import pandas as pd
+from src.core.columnar import (
+    SUFFIX,
+    as_columnar,
+    columnar_path,
+    file_sha256,
+    load_columnar,
+    save_columnar,
+    write_lock,
+)
 
 # Default path: project_root/data/maharashtra-forts.csv
 DATA_PATH = Path(__file__).resolve(
 ).parents[2] / "data" / "maharashtra-forts.csv"
 
 
-def load_forts(path: Optional[str] = None) -> pd.DataFrame:
+def load_forts(path: Optional[str] = None, columnar: bool = False) -> pd.DataFrame: # NOQA E501
     """Load forts CSV into a pandas DataFrame.
 
     - Normalizes column names to lowercase
     - Ensures numeric columns are converted
     - Fills NA for certain text columns with empty strings
 
+    By default the CSV is parsed and the frame is an ordinary, writable
+    one. Loading never writes anything; `python -m src.build` (or
+    save_forts_columnar) writes the typed columnar copy.
+
+    With `columnar=True` a fresh columnar copy next to the CSV (see
+    src/core/columnar.py) is memory-mapped instead of parsing, when
+    there is one. The frame then follows the copy's contract whether
+    or not a copy was found: district / type / era / best_season are
+    categoricals, and numeric columns from the copy are read-only
+    (copy the frame before mutating it).
+
     Args:
-        path: optional path to CSV. If None, uses package DATA_PATH.
+        path: optional path to CSV (or to a columnar copy, which
+            implies `columnar`). If None, uses package DATA_PATH.
+        columnar: read the columnar copy when it is up to date
 
     Returns:
         pd.DataFrame: cleaned DataFrame
@@ -24,10 +46,42 @@ def load_forts(path: Optional[str] = None) -> pd.DataFrame:
         FileNotFoundError: if CSV is not found at the resolved path.
     """
     p = Path(path) if path else DATA_PATH
+    if p.suffix == SUFFIX:
+        df = load_columnar(p)
+        if df is None:
+            raise FileNotFoundError(f"Columnar data not found at: {p}")
+        return df
     if not p.exists():
         raise FileNotFoundError(f"CSV not found at: {p}")
+    if not columnar:
+        return parse_forts_csv(p)
+
+    df = load_columnar(columnar_path(p), source_sha256=file_sha256(p))
+    # Same dtypes as the copy, even when there is none
+    return df if df is not None else as_columnar(parse_forts_csv(p))
+
+
+def save_forts_columnar(path: Optional[str] = None) -> Path:
+    """Write (or refresh) the columnar copy of the forts CSV.
+
+    Only one process writes the copy at a time; an up-to-date copy is
+    left alone.
+
+    Returns:
+        Path of the copy
+    """
+    p = Path(path) if path else DATA_PATH
+    target = columnar_path(p)
+    digest = file_sha256(p)
+    with write_lock(target):
+        if load_columnar(target, source_sha256=digest) is None:
+            save_columnar(parse_forts_csv(p), target, source_sha256=digest)
+    return target
+
 
-    df = pd.read_csv(p._str)
+def parse_forts_csv(p: Path) -> pd.DataFrame:
+    """Parse and clean the CSV (see load_forts)."""
+    df = pd.read_csv(str(p))
 
     # normalize columns
     df.columns = [c.strip().lower() for c in df.columns]
@@ -0,0 +1,128 @@
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.core import artifacts
+
+FilterValue = Union[str, Iterable[str], None]
+
+
+class FacetIndex(artifacts.BundledEngine):
+    """Bitmap indexes over the categorical fort columns.
+
+    For every facet value a boolean row bitmap is kept, stacked into a
+    (values x rows) matrix per facet. Filtering is AND across facets and
+    OR within one facet; facet counts are one matrix-vector product.
+    Multi-valued cells (e.g. "Monsoon; Winter") set the bit of each
+    value. Empty cells are reported as "Unknown".
+
+    The bitmaps are rebuilt when the store generation changes.
+    """
+
+    FACETS = {
+        "district": "district",
+        "type": "type",
+        "difficulty": "trek_difficulty",
+        "season": "best_season",
+    }
+    MULTI_VALUED = {"season": ";"}
+    UNKNOWN = "Unknown"
+
+    ARTIFACT = "facets"
+    PARAMS = ()
+    STATE = ("n_rows", "values", "lookup", "bitmaps")
+
+    def __init__(self, store=None):
+        self.store = store
+        self.n_rows = 0
+        self.values: Dict[str, List[str]] = {}
+        self.lookup: Dict[str, Dict[str, int]] = {}
+        self.bitmaps: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "FacetIndex":
+        index = cls()
+        index._build(df)
+        return index
+
+    def _split(self, facet: str, cell) -> List[str]:
+        text = "" if pd.isna(cell) else str(cell)
+        sep = self.MULTI_VALUED.get(facet)
+        parts = text.split(sep) if sep else [text]
+        parts = [p.strip() for p in parts]
+        return [p for p in parts if p] or [self.UNKNOWN]
+
+    def _build(self, df: pd.DataFrame):
+        self.n_rows = len(df)
+        for facet, col in self.FACETS.items():
+            if col not in df.columns:
+                continue
+            cells = [self._split(facet, c) for c in df[col].tolist()]
+            values = sorted({v for vs in cells for v in vs})
+            codes = {v: i for i, v in enumerate(values)}
+
+            bitmap = np.zeros((len(values), self.n_rows), dtype=bool)
+            for pos, vs in enumerate(cells):
+                bitmap[[codes[v] for v in vs], pos] = True
+
+            self.values[facet] = values
+            # Case-insensitive value lookup
+            self.lookup[facet] = {v.lower(): i for v, i in codes.items()}
+            self.bitmaps[facet] = bitmap
+
+    @staticmethod
+    def _as_list(value: FilterValue) -> List[str]:
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [value]
+        return list(value)
+
+    def facet_mask(self, facet: str, value: FilterValue) -> Optional[np.ndarray]: # NOQA E501
+        """Bitmap for one facet filter (OR over values), None if unset."""
+        self._ensure()
+        wanted = self._as_list(value)
+        if not wanted or facet not in self.bitmaps:
+            return None
+        codes = [
+            self.lookup[facet][v.strip().lower()]
+            for v in wanted if v.strip().lower() in self.lookup[facet]
+        ]
+        if not codes:
+            return np.zeros(self.n_rows, dtype=bool)
+        return self.bitmaps[facet][codes].any(axis=0)
+
+    def mask(self, filters: Dict[str, FilterValue], exclude: Optional[str] = None) -> np.ndarray: # NOQA E501
+        """AND of all facet filters (optionally skipping one facet)."""
+        self._ensure()
+        out = np.ones(self.n_rows, dtype=bool)
+        for facet, value in filters.items():
+            if facet == exclude:
+                continue
+            m = self.facet_mask(facet, value)
+            if m is not None:
+                out &= m
+        return out
+
+    def counts(self, filters: Dict[str, FilterValue], base: Optional[np.ndarray] = None) -> Dict[str, Dict[str, int]]: # NOQA E501
+        """Per-facet value counts for the filtered rows.
+
+        Each facet is counted with every *other* filter applied, so a
+        selected district still lists the alternatives.
+
+        Args:
+            filters: {facet: value or list of values}
+            base: optional extra row mask (e.g. keyword search hits)
+        """
+        self._ensure()
+        out = {}
+        for facet, bitmap in self.bitmaps.items():
+            m = self.mask(filters, exclude=facet)
+            if base is not None:
+                m = m & base
+            counts = bitmap.astype(np.int32) @ m.astype(np.int32)
+            out[facet] = {
+                v: int(c) for v, c in zip(self.values[facet], counts)
+            }
+        return out
@@ -0,0 +1,235 @@
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+from src.core.artifacts import Bundle
+from src.core.columnar import file_sha256
+from src.core.data_loader import DATA_PATH, load_forts
+
+# Separators used inside the alternate_names column
+ALT_NAME_SPLIT = re.compile(r"[;,/]")
+
+
+class FortStore:
+    """Process-wide, read-only holder of the fort dataset.
+
+    The CSV is parsed once and the resulting frame is shared by every
+    router and engine. Consumers must treat `frame` as read-only and
+    `.copy()` before mutating it.
+
+    `generation` is bumped on every (re)load so dependent caches
+    (indexes, serialized responses, cluster labels) can tell when they
+    are stale by comparing it against the value they were built from.
+    It restarts at 1 in every process; caches that outlive the process
+    key on `sha256`, the content hash of the source CSV, instead.
+
+    When an artifact bundle built from the same CSV exists (see
+    `python -m src.build`), the frame is read from it instead, and
+    `bundle` lets engines restore their prebuilt state.
+
+    Args:
+        path: CSV path (default: DATA_PATH)
+        artifacts: artifact root or bundle directory (default:
+            ARTIFACT_DIR); False to always parse the CSV
+    """
+
+    def __init__(self, path: Optional[str] = None, artifacts=None):
+        self.path = Path(path) if path else DATA_PATH
+        self.artifacts = artifacts
+        self.bundle: Optional[Bundle] = None
+        self.sha256: Optional[str] = None
+        self.generation = 0
+        self._df: Optional[pd.DataFrame] = None
+        self._columns: Dict[str, np.ndarray] = {}
+        self._id_index: Optional[Dict[int, int]] = None
+        self._name_index: Optional[Dict[str, List[int]]] = None
+        self._records: Optional[List[dict]] = None
+        self._record_json: Optional[List[bytes]] = None
+        self._lock = threading.RLock()
+
+    # -----------------------------
+    # Load / Reload
+    # -----------------------------
+    def load(self, force: bool = False) -> "FortStore":
+        """Load the dataset if not loaded yet (or always when `force`)."""
+        with self._lock:
+            if self._df is not None and not force:
+                return self
+
+            self.bundle = None
+            if self.artifacts is not False:
+                self.bundle = Bundle.open(self.artifacts, source=self.path)
+            if self.bundle is not None:
+                self._df = self.bundle.frame()
+                self.sha256 = self.bundle.manifest["source"]["sha256"]
+                if self._df is None:
+                    # dataset.cols missing or unreadable: parse the CSV
+                    # and let engines build their own state
+                    self.bundle = None
+            if self.bundle is None:
+                self._df = load_forts(str(self.path), columnar=True)
+                self.sha256 = file_sha256(self.path)
+            self._columns = {}
+            self._id_index = None
+            self._name_index = None
+            self._records = None
+            self._record_json = None
+            self.generation += 1
+        return self
+
+    def reload(self) -> "FortStore":
+        """Re-read the dataset and invalidate every dependent cache."""
+        return self.load(force=True)
+
+    # -----------------------------
+    # Accessors
+    # -----------------------------
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Shared cleaned DataFrame (do not mutate)."""
+        if self._df is None:
+            self.load()
+        return self._df
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a read-only NumPy array for a column.
+
+        Arrays are materialized once per generation and shared.
+        """
+        key = f"raw:{name}"
+        with self._lock:
+            arr = self._columns.get(key)
+            if arr is None:
+                arr = self.frame[name].to_numpy(copy=True)
+                arr.flags.writeable = False
+                self._columns[key] = arr
+        return arr
+
+    def numeric(self, name: str) -> np.ndarray:
+        """Return a read-only float64 array for a column.
+
+        Non-numeric values (e.g. 'Information Not Available') become NaN.
+        """
+        key = f"num:{name}"
+        with self._lock:
+            arr = self._columns.get(key)
+            if arr is None:
+                arr = pd.to_numeric(
+                    self.frame[name], errors="coerce"
+                ).to_numpy(dtype=np.float64, copy=True)
+                arr.flags.writeable = False
+                self._columns[key] = arr
+        return arr
+
+    # -----------------------------
+    # Indexes
+    # -----------------------------
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        return " ".join(str(name).lower().split())
+
+    def _build_indexes(self):
+        with self._lock:
+            if self._id_index is not None:
+                return
+            df = self.frame
+
+            name_index: Dict[str, List[int]] = {}
+            names = df["name"].tolist()
+            alternates = (
+                df["alternate_names"].tolist()
+                if "alternate_names" in df.columns else [""] * len(df)
+            )
+            for pos, (name, alt) in enumerate(zip(names, alternates)):
+                keys = [name] + ALT_NAME_SPLIT.split(str(alt or ""))
+                for key in {self.normalize_name(k) for k in keys}:
+                    if key:
+                        name_index.setdefault(key, []).append(pos)
+
+            self._name_index = name_index
+            self._id_index = {
+                int(fid): pos for pos, fid in enumerate(df["fort_id"].tolist())
+            }
+
+    def position(self, fort_id: int) -> Optional[int]:
+        """Row position for a fort_id, or None if unknown."""
+        self._build_indexes()
+        return self._id_index.get(int(fort_id))
+
+    def positions_by_name(self, name: str) -> List[int]:
+        """Row positions whose name or alternate name matches exactly
+        (case and whitespace insensitive)."""
+        self._build_indexes()
+        return list(self._name_index.get(self.normalize_name(name), []))
+
+    # -----------------------------
+    # Pre-serialized records
+    # -----------------------------
+    def records(self) -> List[dict]:
+        """All rows as plain dicts, built once per generation."""
+        with self._lock:
+            if self._records is None:
+                self._records = self.frame.to_dict(orient="records")
+        return self._records
+
+    def record(self, fort_id: int) -> Optional[dict]:
+        pos = self.position(fort_id)
+        return None if pos is None else self.records()[pos]
+
+    def record_json(self, fort_id: int) -> Optional[bytes]:
+        """JSON-encoded record for a fort_id, encoded once per generation."""
+        pos = self.position(fort_id)
+        return None if pos is None else self._encoded_records()[pos]
+
+    def _encoded_records(self) -> List[bytes]:
+        with self._lock:
+            if self._record_json is None:
+                self._record_json = [dumps(r) for r in self.records()]
+        return self._record_json
+
+    def warm(self) -> "FortStore":
+        """Build every lazy index and encoded record now.
+
+        Called in a preforking master so workers share them
+        copy-on-write instead of each building its own.
+        """
+        self._build_indexes()
+        self._encoded_records()
+        return self
+
+
+def dumps(obj) -> bytes:
+    """Encode to compact UTF-8 JSON (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+_STORE: Optional[FortStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> FortStore:
+    """Return the process-wide FortStore, loading it on first use."""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = FortStore().load()
+    return _STORE
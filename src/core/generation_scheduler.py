@@ -0,0 +1,411 @@
+import asyncio
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Awaitable, Callable, Optional
+
+# End-of-stream marker pushed after the last piece
+DONE = object()
+
+
+class SchedulerFull(RuntimeError):
+    """Raised when the generation queue is at capacity."""
+
+
+class GenerationTimeout(TimeoutError):
+    """Raised when a request is not answered before its deadline."""
+
+
+class GenerationRequest:
+    """One prompt waiting for (or undergoing) generation.
+
+    Plain requests resolve `future` with the full text. Streaming
+    requests receive pieces on `pieces` (an asyncio.Queue when created
+    with an event loop, else a queue.Queue), then DONE or an exception.
+    """
+
+    def __init__(self, prompt: str, max_new_tokens: int, timeout: float, stream: bool = False, loop: Optional[asyncio.AbstractEventLoop] = None): # NOQA E501
+        self.prompt = prompt
+        self.max_new_tokens = max_new_tokens
+        self.stream = stream
+        self.enqueued_at = time.monotonic()
+        self.deadline = self.enqueued_at + timeout
+        self.future: Future = Future()
+        self.loop = loop
+        if stream:
+            self.pieces = asyncio.Queue() if loop else queue.Queue()
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() > self.deadline
+
+    @property
+    def active(self) -> bool:
+        return not self.cancelled and not self.expired
+
+    def cancel(self):
+        """Withdraw the request; generation for it stops at the next token."""
+        self._cancelled.set()
+        self.future.cancel()
+
+    # -----------------------------
+    # Delivery (scheduler thread)
+    # -----------------------------
+    def push(self, item):
+        if self.loop is None:
+            self.pieces.put(item)
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.pieces.put_nowait, item)
+        except RuntimeError:
+            # The consumer's event loop is closed; nobody is listening
+            self.cancel()
+
+    def set_result(self, text: str):
+        try:
+            self.future.set_result(text)
+        except InvalidStateError:
+            pass
+        if self.stream:
+            self.push(DONE)
+
+    def set_exception(self, exc: BaseException):
+        try:
+            self.future.set_exception(exc)
+        except InvalidStateError:
+            pass
+        if self.stream:
+            self.push(exc)
+
+
+class GenerationScheduler:
+    """Serializes and batches access to one LLM_Decoder.
+
+    Requests wait in a bounded queue; submitting to a full queue raises
+    SchedulerFull instead of piling up threads. A single worker thread
+    owns the model. It takes the oldest request, waits up to
+    `batch_window_ms` for more, and runs up to `max_batch` plain
+    requests as one left-padded `generate_batch` call. Streaming
+    requests run alone, since their tokens are delivered as they come.
+
+    Every request has a `max_new_tokens` (capped at the scheduler's
+    limit) and a deadline. Cancelled or expired requests are dropped
+    before they run, and a batch stops early once none of its
+    requests are still wanted. A request that expires while running
+    gets GenerationTimeout, never its partial text. Each request is
+    counted once, by the worker, as completed, timed out, cancelled
+    or failed.
+
+    Args:
+        decoder: LLM_Decoder (or anything with generate_batch /
+            stream_response)
+        max_queue: queued requests before SchedulerFull
+        max_batch: largest generate_batch call
+        batch_window_ms: how long to wait to fill a batch
+        max_new_tokens: per-request cap (and default)
+        timeout: default seconds from submit to answer
+    """
+
+    def __init__(self, decoder, max_queue: int = 16, max_batch: int = 4, batch_window_ms: float = 10.0, max_new_tokens: int = 512, timeout: float = 120.0): # NOQA E501
+        self.decoder = decoder
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.window = batch_window_ms / 1000.0
+        self.max_new_tokens = max_new_tokens
+        self.timeout = timeout
+
+        # Bounded by max_queue together with _held (see _submit)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._held: "collections.deque" = collections.deque()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+        self.running = 0
+        self.counts = collections.Counter()
+        self.batch_sizes = collections.Counter()
+        self.wait_seconds = 0.0
+
+    # -----------------------------
+    # Submit
+    # -----------------------------
+    def _submit(self, prompt: str, max_new_tokens: Optional[int], timeout: Optional[float], stream: bool, loop=None) -> GenerationRequest: # NOQA E501
+        cap = min(max_new_tokens or self.max_new_tokens, self.max_new_tokens)
+        req = GenerationRequest(
+            prompt, cap, timeout or self.timeout, stream=stream, loop=loop)
+        with self._lock:
+            # Streams the worker held back are still waiting
+            if self._queue.qsize() + len(self._held) >= self.max_queue:
+                self.counts["rejected"] += 1
+                raise SchedulerFull(
+                    f"generation queue is full ({self.max_queue} waiting)")
+            self._queue.put_nowait(req)
+            self.counts["submitted"] += 1
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="llm-scheduler", daemon=True)
+                self._worker.start()
+        return req
+
+    def submit(self, prompt: str, max_new_tokens: Optional[int] = None, timeout: Optional[float] = None) -> GenerationRequest: # NOQA E501
+        """Queue a plain request; its `future` resolves to the text."""
+        return self._submit(prompt, max_new_tokens, timeout, stream=False)
+
+    def generate(self, prompt: str, max_new_tokens: Optional[int] = None, timeout: Optional[float] = None, should_cancel: Optional[Callable[[], bool]] = None, poll: float = 0.5) -> str: # NOQA E501
+        """Blocking generate through the queue.
+
+        Args:
+            should_cancel: checked every `poll` seconds while waiting;
+                returning True withdraws the request
+
+        Raises:
+            SchedulerFull: the queue is at capacity
+            GenerationTimeout: no answer before the deadline
+            concurrent.futures.CancelledError: `should_cancel` fired
+        """
+        req = self.submit(prompt, max_new_tokens, timeout)
+        try:
+            while True:
+                remaining = max(0.0, req.deadline - time.monotonic())
+                wait = remaining if should_cancel is None else min(poll, remaining) # NOQA E501
+                try:
+                    return req.future.result(wait)
+                except FutureTimeout:
+                    pass
+                if req.expired:
+                    raise GenerationTimeout(f"no answer within {timeout or self.timeout}s") # NOQA E501
+                if should_cancel():
+                    req.cancel()
+                    return req.future.result(0)
+        finally:
+            # An expired request is left for the worker, which drops it
+            # and counts the timeout
+            if not req.future.done() and not req.expired:
+                req.cancel()
+
+    async def agenerate(self, prompt: str, max_new_tokens: Optional[int] = None, timeout: Optional[float] = None, is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None, poll: float = 0.5) -> str: # NOQA E501
+        """Awaitable generate; cancels the request if the client leaves.
+
+        Args:
+            is_disconnected: e.g. starlette's `request.is_disconnected`,
+                checked every `poll` seconds while waiting
+
+        Raises:
+            SchedulerFull, GenerationTimeout, asyncio.CancelledError
+        """
+        req = self.submit(prompt, max_new_tokens, timeout)
+        fut = asyncio.wrap_future(req.future)
+        try:
+            while True:
+                try:
+                    return await asyncio.wait_for(asyncio.shield(fut), poll)
+                except asyncio.TimeoutError:
+                    pass
+                if req.expired:
+                    raise GenerationTimeout(f"no answer within {timeout or self.timeout}s") # NOQA E501
+                if is_disconnected is not None and await is_disconnected():
+                    raise asyncio.CancelledError("client disconnected")
+        finally:
+            # An expired request is left for the worker, which drops it
+            # and counts the timeout
+            if not req.future.done() and not req.expired:
+                req.cancel()
+
+    def astream(self, prompt: str, max_new_tokens: Optional[int] = None, timeout: Optional[float] = None, poll: float = 0.5): # NOQA E501
+        """Queue a streaming request and return an async iterator of pieces.
+
+        Must be called from a running event loop. The request is queued
+        immediately, so SchedulerFull surfaces here, before any piece.
+        Leaving the loop early (or being cancelled, e.g. on client
+        disconnect) withdraws the request.
+
+        Raises:
+            SchedulerFull (on call), GenerationTimeout (while iterating)
+        """
+        req = self._submit(
+            prompt, max_new_tokens, timeout, stream=True,
+            loop=asyncio.get_running_loop())
+        return self._aiter(req, poll)
+
+    async def _aiter(self, req: GenerationRequest, poll: float):
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(req.pieces.get(), poll)
+                except asyncio.TimeoutError:
+                    if req.expired:
+                        raise GenerationTimeout("no answer before the deadline") # NOQA E501
+                    continue
+                if item is DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # An expired request is left for the worker, which drops it
+            # and counts the timeout
+            if not req.future.done() and not req.expired:
+                req.cancel()
+
+    def stream(self, prompt: str, max_new_tokens: Optional[int] = None, timeout: Optional[float] = None, poll: float = 0.5): # NOQA E501
+        """Blocking counterpart of `astream`: an iterator of pieces.
+
+        Closing the iterator early withdraws the request.
+
+        Raises:
+            SchedulerFull (on call), GenerationTimeout (while iterating)
+        """
+        req = self._submit(prompt, max_new_tokens, timeout, stream=True)
+        return self._iter(req, poll)
+
+    def _iter(self, req: GenerationRequest, poll: float):
+        try:
+            while True:
+                try:
+                    item = req.pieces.get(timeout=poll)
+                except queue.Empty:
+                    if req.expired:
+                        raise GenerationTimeout("no answer before the deadline") # NOQA E501
+                    continue
+                if item is DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # An expired request is left for the worker, which drops it
+            # and counts the timeout
+            if not req.future.done() and not req.expired:
+                req.cancel()
+
+    # -----------------------------
+    # Worker
+    # -----------------------------
+    def _next(self, timeout: Optional[float] = None) -> GenerationRequest:
+        if self._held:
+            return self._held.popleft()
+        return self._queue.get(timeout=timeout)
+
+    def _collect(self) -> list:
+        first = self._next()
+        if first.stream:
+            return [first]
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                req = self._next(timeout=remaining)
+            except queue.Empty:
+                break
+            if req.stream:
+                # Streams run alone; keep it for the next round
+                self._held.append(req)
+                break
+            batch.append(req)
+        return batch
+
+    def _admit(self, batch: list) -> list:
+        live = []
+        now = time.monotonic()
+        for req in batch:
+            if req.cancelled:
+                self.counts["cancelled"] += 1
+            elif req.expired:
+                self.counts["timeouts"] += 1
+                req.set_exception(GenerationTimeout("expired in queue"))
+            else:
+                self.wait_seconds += now - req.enqueued_at
+                live.append(req)
+        return live
+
+    def _finish(self, req: GenerationRequest, text: str, complete: bool = True): # NOQA E501
+        """Deliver a finished request's text.
+
+        Only text generated to the end is a result; a request that was
+        cut short (or went past its deadline) never resolves with a
+        partial answer.
+        """
+        if req.cancelled:
+            self.counts["cancelled"] += 1
+        elif req.expired or not complete:
+            self.counts["timeouts"] += 1
+            req.set_exception(GenerationTimeout("deadline passed while generating")) # NOQA E501
+        else:
+            self.counts["completed"] += 1
+            req.set_result(text)
+
+    def _run_batch(self, batch: list):
+        texts = self.decoder.generate_batch(
+            [r.prompt for r in batch],
+            [r.max_new_tokens for r in batch],
+            should_stop=lambda: not any(r.active for r in batch),
+        )
+        for req, text in zip(batch, texts):
+            self._finish(req, text)
+
+    def _run_stream(self, req: GenerationRequest):
+        pieces = self.decoder.stream_response(
+            req.prompt, max_new_tokens=req.max_new_tokens,
+            timeout=max(0.0, req.deadline - time.monotonic()))
+        text = []
+        complete = True
+        try:
+            for piece in pieces:
+                if not req.active:
+                    complete = False
+                    break
+                text.append(piece)
+                req.push(piece)
+        except queue.Empty:
+            complete = False  # no next piece before the deadline
+        finally:
+            pieces.close()
+        self._finish(req, "".join(text), complete)
+
+    def _run(self):
+        while True:
+            batch = self._admit(self._collect())
+            if not batch:
+                continue
+            self.running = len(batch)
+            self.batch_sizes[len(batch)] += 1
+            try:
+                if batch[0].stream:
+                    self._run_stream(batch[0])
+                else:
+                    self._run_batch(batch)
+            except Exception as e:
+                self.counts["failed"] += len(batch)
+                for req in batch:
+                    req.set_exception(e)
+            finally:
+                self.running = 0
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def metrics(self) -> dict:
+        batches = sum(self.batch_sizes.values())
+        served = sum(n * c for n, c in self.batch_sizes.items())
+        return {
+            "queue_depth": self._queue.qsize() + len(self._held),
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "max_batch": self.max_batch,
+            "max_new_tokens": self.max_new_tokens,
+            "batches": batches,
+            "avg_batch_size": round(served / batches, 3) if batches else 0.0, # NOQA E501
+            "batch_sizes": {str(k): v for k, v in sorted(self.batch_sizes.items())}, # NOQA E501
+            "avg_queue_wait_ms": round(1000 * self.wait_seconds / served, 1) if served else 0.0, # NOQA E501
+            **{k: self.counts[k] for k in ("submitted", "completed", "rejected", "timeouts", "cancelled", "failed")}, # NOQA E501
+        }
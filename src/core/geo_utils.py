@@ -1,5 +1,7 @@
 from math import radians, cos, sin, asin, sqrt
 
+EARTH_RADIUS_KM = 6371
+
 
 def haversine_km(lat1, lon1, lat2, lon2):
     """Return distance in kilometers between two lat/lon pairs."""
@@ -11,5 +13,5 @@ def haversine_km(lat1, lon1, lat2, lon2):
     dlat = lat2 - lat1
     a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
     c = 2 * asin(sqrt(a))
-    km = 6371 * c
-    return km
\ No newline at end of file
+    km = EARTH_RADIUS_KM * c
+    return km
@@ -0,0 +1,339 @@
+import asyncio
+import os
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Awaitable, Callable, Dict, Optional
+
+from src.core import lazy_engine
+from src.core.generation_scheduler import GenerationTimeout, SchedulerFull
+from src.core.lazy_engine import EngineUnavailable, LazyEngine
+from src.core.prompts import build_prompt
+
+# Exceptions relayed to the client as-is; anything else becomes a
+# RuntimeError carrying the original type name and message.
+RELAYED = (EngineUnavailable, SchedulerFull, GenerationTimeout, ValueError)
+
+# Hex shared secret; both ends authenticate every connection with it
+AUTHKEY_ENV = "INFERENCE_AUTHKEY"
+
+
+def env_authkey() -> Optional[bytes]:
+    value = os.environ.get(AUTHKEY_ENV)
+    return bytes.fromhex(value) if value else None
+
+
+def unreachable(e: BaseException) -> EngineUnavailable:
+    return EngineUnavailable(
+        "inference", "unreachable", f"{type(e).__name__}: {e}")
+
+
+class InferenceServer:
+    """Serves RAG retrieval and LLM generation over a Unix socket.
+
+    Runs in one dedicated process (see src/api/inference_worker.py) so
+    the models are loaded once, however many API workers there are.
+    Each connection carries one request: `(op, args)`. Replies are
+    `("ok", value)` or `("error", exception)`; streams reply
+    `("ok", None)` once admitted, then `("piece", text)`... and
+    `("done", None)`.
+
+    A client that hangs up withdraws its generation request.
+
+    Messages are pickles, so only trusted peers may connect: the socket
+    must live in a private (0700, owned by this user) directory, and
+    every connection must prove it knows `authkey`.
+
+    Args:
+        address: socket path
+        engines: {"rag": LazyEngine, "llm": LazyEngine}
+        authkey: shared secret (default: INFERENCE_AUTHKEY, hex)
+
+    Raises:
+        ValueError: no authkey
+    """
+
+    def __init__(self, address: str, engines: Dict[str, LazyEngine], authkey: Optional[bytes] = None, poll: float = 0.25): # NOQA E501
+        self.address = address
+        self.engines = engines
+        self.authkey = authkey or env_authkey()
+        if not self.authkey:
+            raise ValueError(f"InferenceServer needs an authkey ({AUTHKEY_ENV})") # NOQA E501
+        self.poll = poll
+        self.ops: Dict[str, Callable] = {
+            "status": self._status,
+            "rag.query": lambda q, k=5, q_emb=None: self._engine("rag").query(q, k, q_emb=q_emb), # NOQA E501
+            "rag.encode": lambda q: self._engine("rag").query_encoder.encode(q), # NOQA E501
+            "llm.metrics": lambda: self._engine("llm").metrics(),
+        }
+
+    def _engine(self, name: str):
+        return self.engines[name].get()
+
+    def _status(self) -> Dict[str, dict]:
+        return {name: e.status() for name, e in self.engines.items()}
+
+    # -----------------------------
+    # Serve
+    # -----------------------------
+    def serve_forever(self):
+        directory = os.path.dirname(os.path.abspath(self.address))
+        st = os.stat(directory)
+        if st.st_uid != os.getuid() or st.st_mode & 0o077:
+            raise PermissionError(
+                f"{directory} must be a private (0700) directory owned by "
+                f"this user to hold the inference socket")
+        if os.path.exists(self.address):
+            os.unlink(self.address)  # stale socket from a previous run
+        old_umask = os.umask(0o177)
+        try:
+            listener = Listener(
+                self.address, family="AF_UNIX", authkey=self.authkey)
+        finally:
+            os.umask(old_umask)
+        with listener:
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, EOFError, OSError):
+                    continue  # peer without the key, or gone mid-handshake
+                threading.Thread(
+                    target=self._handle, args=(conn,), daemon=True).start()
+
+    def start(self) -> threading.Thread:
+        """Serve on a daemon thread; returns once the socket exists."""
+        thread = threading.Thread(
+            target=self.serve_forever, name="inference-server", daemon=True)
+        thread.start()
+        while not os.path.exists(self.address):
+            time.sleep(0.01)
+        return thread
+
+    def _handle(self, conn: Connection):
+        try:
+            op, args = conn.recv()
+            if op == "llm.generate":
+                self._generate(conn, *args)
+            elif op == "llm.stream":
+                self._stream(conn, *args)
+            else:
+                conn.send(("ok", self.ops[op](*args)))
+        except (EOFError, BrokenPipeError, ConnectionResetError):
+            pass  # client went away
+        except Exception as e:
+            self._reply_error(conn, e)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _reply_error(conn: Connection, e: Exception):
+        if not isinstance(e, RELAYED):
+            e = RuntimeError(f"{type(e).__name__}: {e}")
+        try:
+            conn.send(("error", e))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _generate(self, conn: Connection, prompt: str, max_new_tokens=None, timeout=None): # NOQA E501
+        # Any readable event on the socket means the client hung up
+        text = self._engine("llm").generate(
+            prompt, max_new_tokens, timeout,
+            should_cancel=lambda: conn.poll(0), poll=self.poll)
+        conn.send(("ok", text))
+
+    def _stream(self, conn: Connection, prompt: str, max_new_tokens=None, timeout=None): # NOQA E501
+        pieces = self._engine("llm").stream(prompt, max_new_tokens, timeout)
+        conn.send(("ok", None))
+        try:
+            for piece in pieces:
+                conn.send(("piece", piece))
+        except (BrokenPipeError, ConnectionResetError):
+            return
+        except Exception as e:
+            self._reply_error(conn, e)
+            return
+        finally:
+            pieces.close()
+        conn.send(("done", None))
+
+
+class InferenceClient:
+    """Connects to an InferenceServer; one connection per request.
+
+    Connection failures (worker down or restarting) raise
+    EngineUnavailable, so the API answers 503.
+
+    Args:
+        authkey: shared secret (default: INFERENCE_AUTHKEY, hex)
+    """
+
+    def __init__(self, address: str, authkey: Optional[bytes] = None):
+        self.address = address
+        self.authkey = authkey or env_authkey()
+
+    def connect(self) -> Connection:
+        try:
+            return Client(
+                self.address, family="AF_UNIX", authkey=self.authkey)
+        except (OSError, EOFError, AuthenticationError) as e:
+            raise unreachable(e)
+
+    @staticmethod
+    def send(conn: Connection, message):
+        try:
+            conn.send(message)
+        except (OSError, EOFError) as e:
+            raise unreachable(e)
+
+    @staticmethod
+    def recv(conn: Connection):
+        try:
+            return conn.recv()
+        except (OSError, EOFError) as e:
+            raise unreachable(e)
+
+    @staticmethod
+    def unwrap(reply):
+        kind, value = reply
+        if kind == "error":
+            raise value
+        return value
+
+    def call(self, op: str, *args):
+        with self.connect() as conn:
+            self.send(conn, (op, args))
+            return self.unwrap(self.recv(conn))
+
+    def status(self) -> Dict[str, dict]:
+        return self.call("status")
+
+    def wait_ready(self, name: str, poll: float = 1.0, timeout: Optional[float] = None): # NOQA E501
+        """Block until the server's `name` engine is ready.
+
+        Connection errors are retried, since the server may still be
+        starting.
+
+        Raises:
+            RuntimeError: the remote engine failed to load
+            TimeoutError: not ready within `timeout`
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                state = self.status()[name]
+            except EngineUnavailable:
+                state = {"state": lazy_engine.PENDING}
+            if state["state"] == lazy_engine.READY:
+                return
+            if state["state"] == lazy_engine.FAILED:
+                raise RuntimeError(f"remote {name} engine failed: {state['error']}") # NOQA E501
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"remote {name} engine is {state['state']}") # NOQA E501
+            time.sleep(poll)
+
+    def engine(self, name: str):
+        """Wait for the remote engine, then return a local proxy for it."""
+        self.wait_ready(name)
+        return {"rag": RemoteRAG, "llm": RemoteScheduler}[name](self)
+
+
+# -----------------------------
+# Proxies used by the API workers
+# -----------------------------
+class _RemoteEncoder:
+    def __init__(self, client: InferenceClient):
+        self.client = client
+
+    def encode(self, text: str, timeout: Optional[float] = None):
+        return self.client.call("rag.encode", text)
+
+    async def aencode(self, text: str):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.encode, text)
+
+
+class RemoteRAG:
+    """The parts of RAGEngine the search router uses, served remotely."""
+
+    def __init__(self, client: InferenceClient):
+        self.client = client
+        self.query_encoder = _RemoteEncoder(client)
+
+    def query(self, q: str, k: int = 5, q_emb=None) -> list:
+        return self.client.call("rag.query", q, k, q_emb)
+
+
+class _PromptBuilder:
+    # Prompts are plain text; build them locally
+    build_prompt = staticmethod(build_prompt)
+
+
+class RemoteScheduler:
+    """The GenerationScheduler API the search router uses, served remotely.
+
+    Blocking socket reads run on the event loop's default executor.
+    """
+
+    decoder = _PromptBuilder()
+
+    def __init__(self, client: InferenceClient):
+        self.client = client
+
+    def metrics(self) -> dict:
+        return self.client.call("llm.metrics")
+
+    def generate(self, prompt: str, max_new_tokens: Optional[int] = None, timeout: Optional[float] = None) -> str: # NOQA E501
+        return self.client.call(
+            "llm.generate", prompt, max_new_tokens, timeout)
+
+    async def agenerate(self, prompt: str, max_new_tokens: Optional[int] = None, timeout: Optional[float] = None, is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None, poll: float = 0.5) -> str: # NOQA E501
+        loop = asyncio.get_running_loop()
+        conn = await loop.run_in_executor(None, self.client.connect)
+        try:
+            self.client.send(
+                conn, ("llm.generate", (prompt, max_new_tokens, timeout)))
+            while not await loop.run_in_executor(None, conn.poll, poll):
+                if is_disconnected is not None and await is_disconnected():
+                    raise asyncio.CancelledError("client disconnected")
+            return self.client.unwrap(self.client.recv(conn))
+        finally:
+            # Hanging up withdraws the request on the server
+            conn.close()
+
+    async def astream(self, prompt: str, max_new_tokens: Optional[int] = None, timeout: Optional[float] = None): # NOQA E501
+        """Like GenerationScheduler.astream, but awaited: SchedulerFull
+        surfaces on await, pieces while iterating.
+
+        Connecting and the first reply run on the default executor, so
+        a busy inference worker never blocks the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        conn = await loop.run_in_executor(
+            None, self._open_stream, prompt, max_new_tokens, timeout)
+        return self._aiter(conn)
+
+    def _open_stream(self, prompt: str, max_new_tokens: Optional[int], timeout: Optional[float]) -> Connection: # NOQA E501
+        conn = self.client.connect()
+        try:
+            self.client.send(
+                conn, ("llm.stream", (prompt, max_new_tokens, timeout)))
+            self.client.unwrap(self.client.recv(conn))
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    async def _aiter(self, conn: Connection):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                kind, value = await loop.run_in_executor(
+                    None, self.client.recv, conn)
+                if kind == "done":
+                    return
+                if kind == "error":
+                    raise value
+                yield value
+        finally:
+            conn.close()
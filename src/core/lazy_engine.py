@@ -0,0 +1,165 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+# Factories run one at a time: concurrent torch/transformers imports are
+# not thread-safe, and serial loading also caps the peak memory spike.
+_LOAD_LOCK = threading.Lock()
+
+
+class EngineUnavailable(RuntimeError):
+    """Raised when an engine is not (yet) ready to serve."""
+
+    def __init__(self, name: str, state: str, error: Optional[str] = None):
+        self.name = name
+        self.state = state
+        self.error = error
+        msg = f"{name} engine is {state}"
+        if error:
+            msg += f": {error}"
+        super().__init__(msg)
+
+    def __reduce__(self):
+        # Picklable, so it can be relayed from the inference worker
+        return type(self), (self.name, self.state, self.error)
+
+
+class LazyEngine:
+    """Expensive object (model, index) built once, off the request path.
+
+    `start()` warms it on a daemon thread; `get()` never blocks by
+    default and raises EngineUnavailable while loading or after a
+    failure, so callers can answer 503 instead of stalling.
+
+    A failed load is retried by the next `get()` (or readiness check)
+    after a backoff that doubles from RETRY_MIN to RETRY_MAX seconds.
+    """
+
+    RETRY_MIN = 5.0
+    RETRY_MAX = 300.0
+
+    def __init__(self, name: str, factory: Callable[[], object]):
+        self.name = name
+        self.factory = factory
+        self.state = PENDING
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.failures = 0
+        self.retry_at = 0.0
+        self._instance = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "LazyEngine":
+        """Begin loading in the background (no-op if already started)."""
+        with self._lock:
+            if self.state != PENDING or self._thread is not None:
+                return self
+            self._thread = threading.Thread(
+                target=self.load, name=f"warm-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def load(self):
+        """Build the instance on the calling thread (once)."""
+        with self._lock:
+            if self.state in (LOADING, READY):
+                return
+            self.state = LOADING
+            self.error = None
+
+        t0 = time.perf_counter()
+        try:
+            with _LOAD_LOCK:
+                instance = self.factory()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.failures += 1
+            backoff = self.RETRY_MIN * 2 ** (self.failures - 1)
+            self.retry_at = time.monotonic() + min(backoff, self.RETRY_MAX)
+            self.state = FAILED
+        else:
+            self._instance = instance
+            self.failures = 0
+            self.state = READY
+        finally:
+            self.load_seconds = round(time.perf_counter() - t0, 3)
+            self._done.set()
+
+    def get(self, wait: Optional[float] = 0):
+        """Return the instance.
+
+        Args:
+            wait: seconds to wait for a load in progress (None = forever)
+
+        Raises:
+            EngineUnavailable: if not ready within `wait`
+        """
+        if self.state == READY:
+            return self._instance
+        if self.state == PENDING:
+            self.start()
+        elif self.state == FAILED:
+            self.retry(force=False)
+        if wait != 0:
+            self._done.wait(wait)
+        if self.state != READY:
+            raise EngineUnavailable(self.name, self.state, self.error)
+        return self._instance
+
+    def retry(self, force: bool = True) -> "LazyEngine":
+        """Reset a failed engine and warm it again.
+
+        Args:
+            force: retry now; otherwise only once the backoff since
+                the last failure has passed
+        """
+        with self._lock:
+            if self.state != FAILED:
+                return self
+            if not force and time.monotonic() < self.retry_at:
+                return self
+            self.state = PENDING
+            self._thread = None
+            self._done.clear()
+        return self.start()
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "error": self.error,
+            "load_seconds": self.load_seconds,
+        }
+
+
+ENGINES: Dict[str, LazyEngine] = {}
+
+
+def register(name: str, factory: Callable[[], object]) -> LazyEngine:
+    """Register a process-wide lazy engine under `name`."""
+    engine = ENGINES.get(name)
+    if engine is None:
+        engine = ENGINES[name] = LazyEngine(name, factory)
+    return engine
+
+
+def start_all():
+    """Warm every registered engine in the background."""
+    for engine in ENGINES.values():
+        engine.start()
+
+
+def retry_failed():
+    """Retry every failed engine whose backoff has passed."""
+    for engine in ENGINES.values():
+        engine.retry(force=False)
+
+
+def status() -> Dict[str, dict]:
+    return {name: e.status() for name, e in ENGINES.items()}
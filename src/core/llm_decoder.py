@@ -1,6 +1,43 @@
-from transformers import AutoTokenizer, AutoModelForCausalLM
+import copy
+import threading
+from typing import Callable, Iterator, List, Optional, Union
+from transformers import (
+    AutoTokenizer,
+    AutoModelForCausalLM,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextIteratorStreamer,
+)
 import torch
 
+from src.core.prompts import SYSTEM_PREFIX, build_prompt
+
+
+class StopWhen(StoppingCriteria):
+    """Stop generation as soon as `check()` is true (e.g. client left)."""
+
+    def __init__(self, check: Callable[[], bool]):
+        self.check = check
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return self.check()
+
+
+# CPU precision modes: "fp32" (reference), "bf16" (half the memory;
+# fast on CPUs with AVX512-BF16/AMX) and "int8" (dynamic quantization
+# of nn.Linear weights; activations are quantized on the fly).
+PRECISIONS = ("auto", "fp32", "bf16", "int8")
+
+
+def _crop_cache(cache, length: int):
+    """First `length` positions of a KV cache (legacy tuples or Cache)."""
+    legacy = cache.to_legacy_cache() if hasattr(cache, "to_legacy_cache") else cache # NOQA E501
+    cropped = tuple(
+        tuple(t[:, :, :length] for t in layer) for layer in legacy)
+    if hasattr(cache, "from_legacy_cache"):
+        return type(cache).from_legacy_cache(cropped)
+    return cropped
+
 
 class LLM_Decoder:
     """
@@ -14,45 +51,131 @@ class LLM_Decoder:
         model_name: str = "Qwen/Qwen2-1.5B-Instruct",
         max_length: int = 4096,
         device: str = "auto",
+        precision: str = "auto",
+        num_threads: Optional[int] = None,
+        reuse_prefix: bool = True,
     ):
+        """
+        Args:
+            model_name: HuggingFace causal LM id
+            max_length: prompt + generation token budget
+            device: "auto" (CUDA when available) or "cpu"
+            precision: "auto" (fp16 on CUDA, fp32 on CPU), "fp32",
+                "bf16" or "int8" (CPU only)
+            num_threads: torch intra-op threads for this process; set
+                it to cores / workers when running several workers
+            reuse_prefix: cache the KV state of SYSTEM_PREFIX
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(
+                f"Unknown precision '{precision}'. "
+                f"Valid: {', '.join(PRECISIONS)}")
         self.model_name = model_name
         self.max_length = max_length
         self.device = (
             "cuda" if device == "auto" and torch.cuda.is_available() else "cpu"
         )
+        if precision == "int8" and self.device == "cuda":
+            raise ValueError("int8 dynamic quantization is CPU-only")
+        if precision == "auto":
+            precision = "fp16" if self.device == "cuda" else "fp32"
+        self.precision = precision
+        if num_threads:
+            torch.set_num_threads(num_threads)
 
+        dtype = {"fp16": torch.float16, "bf16": torch.bfloat16}.get(
+            precision, torch.float32)
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.model = AutoModelForCausalLM.from_pretrained(
             model_name,
-            torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,  # NOQA E501
+            torch_dtype=dtype,
             device_map=self.device if self.device == "cuda" else None,
             trust_remote_code=True,
         )
-        print(f"Loaded {model_name} on {self.device}...")
+        if precision == "int8":
+            self.model = torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model.eval()
+        print(f"Loaded {model_name} on {self.device} ({precision}, "
+              f"{torch.get_num_threads()} threads)...")
 
         if self.tokenizer.pad_token is None:
             self.tokenizer.pad_token = self.tokenizer.eos_token
+        # Decoder-only models must be left-padded for batched generation
+        self.tokenizer.padding_side = "left"
 
-    def generate_response(self, prompt: str, max_new_tokens: int = 2048) -> str:  # NOQA E501
-        """Generate response using the transformer model."""
+        self.prefix_ids = None
+        self.prefix_cache = None
+        if reuse_prefix:
+            self.cache_prefix(SYSTEM_PREFIX)
+
+    # -----------------------------
+    # Prompt-prefix KV reuse
+    # -----------------------------
+    def cache_prefix(self, prefix: str):
+        """Pre-compute the KV cache of a prompt prefix shared by requests."""
+        ids = self.tokenizer(prefix, return_tensors="pt")["input_ids"]
+        if self.device == "cuda":
+            ids = ids.to("cuda")
+        with torch.no_grad():
+            out = self.model(input_ids=ids, use_cache=True)
+        self.prefix_ids = ids[0]
+        self.prefix_cache = out.past_key_values
+
+    def _prefix_kwargs(self, inputs) -> dict:
+        """`past_key_values` covering the prompt's cached prefix, if any.
+
+        Only single, unpadded prompts qualify. The reusable length is the
+        common token prefix, since BPE may merge across the boundary;
+        at least one prompt token is always left to pre-fill.
+        """
+        ids = inputs["input_ids"]
+        if self.prefix_cache is None or ids.shape[0] != 1:
+            return {}
+        n = min(len(self.prefix_ids), ids.shape[1] - 1)
+        same = (ids[0, :n] == self.prefix_ids[:n]).long()
+        common = int(same.cumprod(0).sum())
+        if common == 0:
+            return {}
+        if common == len(self.prefix_ids) and isinstance(self.prefix_cache, tuple): # NOQA E501
+            # Legacy tuple caches are never mutated by generate
+            return {"past_key_values": self.prefix_cache}
+        cache = _crop_cache(self.prefix_cache, common)
+        if not isinstance(cache, tuple):
+            cache = copy.deepcopy(cache)
+        return {"past_key_values": cache}
+
+    def _tokenize(self, prompt: Union[str, List[str]], max_new_tokens: int):
         inputs = self.tokenizer(
             prompt,
             return_tensors="pt",
+            padding=True,
             truncation=True,
             max_length=self.max_length - max_new_tokens,
         )
 
         if self.device == "cuda":
             inputs = inputs.to("cuda")
+        return inputs
+
+    def _generate_kwargs(self, max_new_tokens: int) -> dict:
+        return dict(
+            max_new_tokens=max_new_tokens,
+            temperature=0.1,
+            do_sample=True,
+            pad_token_id=self.tokenizer.eos_token_id,
+            eos_token_id=self.tokenizer.eos_token_id,
+        )
+
+    def generate_response(self, prompt: str, max_new_tokens: int = 2048) -> str:  # NOQA E501
+        """Generate response using the transformer model."""
+        inputs = self._tokenize(prompt, max_new_tokens)
 
         with torch.no_grad():
             outputs = self.model.generate(
                 **inputs,
-                max_new_tokens=max_new_tokens,
-                temperature=0.1,
-                do_sample=True,
-                pad_token_id=self.tokenizer.eos_token_id,
-                eos_token_id=self.tokenizer.eos_token_id,
+                **self._generate_kwargs(max_new_tokens),
+                **self._prefix_kwargs(inputs),
             )
 
         response = self.tokenizer.decode(
@@ -61,21 +184,111 @@ class LLM_Decoder:
         )
         return response.strip()
 
+    def generate_batch(self, prompts: List[str], max_new_tokens: Union[int, List[int]] = 2048, should_stop: Optional[Callable[[], bool]] = None) -> List[str]:  # NOQA E501
+        """Generate for several prompts in one padded forward pass.
+
+        Args:
+            prompts: chat-formatted prompts
+            max_new_tokens: one cap for all, or a cap per prompt (the
+                batch runs to the largest; outputs are cut to their own)
+            should_stop: polled after each token; True aborts the batch
+
+        Returns:
+            one response per prompt
+        """
+        if isinstance(max_new_tokens, int):
+            caps = [max_new_tokens] * len(prompts)
+        else:
+            caps = list(max_new_tokens)
+        limit = max(caps)
+        inputs = self._tokenize(prompts, limit)
+
+        kwargs = {
+            **self._generate_kwargs(limit), **self._prefix_kwargs(inputs)}
+        if should_stop is not None:
+            kwargs["stopping_criteria"] = StoppingCriteriaList([StopWhen(should_stop)]) # NOQA E501
+        with torch.no_grad():
+            outputs = self.model.generate(**inputs, **kwargs)
+
+        new_tokens = outputs[:, inputs["input_ids"].shape[1]:]
+        return [
+            self.tokenizer.decode(
+                tokens[:cap], skip_special_tokens=True).strip()
+            for tokens, cap in zip(new_tokens, caps)
+        ]
+
+    def stream_response(self, prompt: str, max_new_tokens: int = 2048, timeout: Optional[float] = None) -> Iterator[str]:  # NOQA E501
+        """Yield decoded text pieces as the model generates them.
+
+        `generate` runs on a background thread feeding a
+        TextIteratorStreamer. Closing the generator early (e.g. the
+        client disconnected) stops generation at the next token.
+
+        Args:
+            prompt: full chat-formatted prompt
+            max_new_tokens: generation cap
+            timeout: max seconds to wait for each next piece
+
+        Raises:
+            queue.Empty: no piece within `timeout`
+            Exception: whatever `generate` raised, after the pieces
+                produced before it
+        """
+        inputs = self._tokenize(prompt, max_new_tokens)
+        streamer = TextIteratorStreamer(
+            self.tokenizer,
+            skip_prompt=True,
+            skip_special_tokens=True,
+            timeout=timeout,
+        )
+        stop = threading.Event()
+        failed: List[BaseException] = []
+
+        def run():
+            try:
+                with torch.no_grad():
+                    self.model.generate(
+                        **inputs,
+                        **self._generate_kwargs(max_new_tokens),
+                        **self._prefix_kwargs(inputs),
+                        streamer=streamer,
+                        stopping_criteria=StoppingCriteriaList([StopWhen(stop.is_set)]), # NOQA E501
+                    )
+            except BaseException as e:
+                failed.append(e)
+            finally:
+                # generate() only ends the streamer when it returns;
+                # without this a failure leaves the consumer waiting
+                streamer.end()
+
+        thread = threading.Thread(target=run, name="llm-stream", daemon=True)
+        thread.start()
+        try:
+            for piece in streamer:
+                if piece:
+                    yield piece
+        finally:
+            stop.set()
+        thread.join()
+        if failed:
+            raise failed[0]
+
+    def build_prompt(self, json_data) -> str:
+        """Chat prompt asking the model to verbalize `json_data`."""
+        return build_prompt(json_data)
+
     def decode_response(self, json_data: str) -> str:
         """Analyze MLflow experiments from JSON file."""
         try:
             # Create analysis prompt
-            prompt = f"""<|im_start|>system
-                You are an json to sentence converter.
-                <|im_end|> <|im_start|>user
-                Convert this 
-                {json_data}
-                into conversational sentence/s.
-                <|im_end|>
-                <|im_start|>assistant
-                """
+            prompt = self.build_prompt(json_data)
 
             return self.generate_response(prompt)
 
         except Exception as e:
             return f"Error analyzing JSON file: {str(e)}"
+
+    def stream_decode(self, json_data, max_new_tokens: int = 2048) -> Iterator[str]:  # NOQA E501
+        """Streaming counterpart of decode_response."""
+        return self.stream_response(
+            self.build_prompt(json_data), max_new_tokens=max_new_tokens)
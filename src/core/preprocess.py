@@ -30,7 +30,7 @@ def preprocess_for_model(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Labe
     for col in cat_cols:
         if col in out.columns:
             le = LabelEncoder()
-            out[col] = out[col].fillna('Unknown').astype(str)
+            out[col] = out[col].astype(object).fillna('Unknown').astype(str)
             out[col + '_le'] = le.fit_transform(out[col])
             encoders[col] = le
 
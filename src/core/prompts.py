@@ -0,0 +1,20 @@
+# Fixed start of every decode_response prompt; its KV cache is computed
+# once and reused so each request only pre-fills its own record.
+SYSTEM_PREFIX = """<|im_start|>system
+                You are an json to sentence converter.
+                <|im_end|> <|im_start|>user
+                Convert this 
+                """
+
+
+def build_prompt(json_data) -> str:
+    """Chat prompt asking the model to verbalize `json_data`.
+
+    Kept free of torch/transformers imports so API workers can build
+    prompts for a remote inference worker.
+    """
+    return SYSTEM_PREFIX + f"""{json_data}
+                into conversational sentence/s.
+                <|im_end|>
+                <|im_start|>assistant
+                """
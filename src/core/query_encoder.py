@@ -0,0 +1,148 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import numpy as np
+
+
+def normalize_query(text: str) -> str:
+    """Cache key for a query: case-folded, whitespace collapsed.
+
+    MiniLM is an uncased model, so case never changes the embedding.
+    """
+    return " ".join(text.casefold().split())
+
+
+class QueryEncoder:
+    """LRU-cached, micro-batched encoder for short query strings.
+
+    Repeated queries are answered from an LRU of embeddings. Misses are
+    queued for a single worker thread that waits up to `window_ms` for
+    more requests and encodes them together, so concurrent requests
+    cost one `encode_batch` call instead of one each. Identical queries
+    already in flight share one result.
+
+    Args:
+        encode_batch: function mapping a list of texts to a 2-D array
+        max_size: LRU capacity (number of cached queries)
+        window_ms: how long the worker waits to fill a batch
+        max_batch: largest batch handed to `encode_batch`
+    """
+
+    def __init__(self, encode_batch: Callable[[List[str]], np.ndarray], max_size: int = 1024, window_ms: float = 5.0, max_batch: int = 32): # NOQA E501
+        self.encode_batch = encode_batch
+        self.max_size = max_size
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+
+    # -----------------------------
+    # Cache
+    # -----------------------------
+    def _get_cached(self, key: str) -> Optional[np.ndarray]:
+        vec = self._cache.get(key)
+        if vec is not None:
+            self._cache.move_to_end(key)
+        return vec
+
+    def _put(self, key: str, vec: np.ndarray):
+        self._cache[key] = vec
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._cache),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "batches": self.batches,
+        }
+
+    # -----------------------------
+    # Encode
+    # -----------------------------
+    def submit(self, text: str) -> Future:
+        """Return a future for the embedding of `text`."""
+        key = normalize_query(text)
+        with self._lock:
+            vec = self._get_cached(key)
+            if vec is not None:
+                self.hits += 1
+                fut = Future()
+                fut.set_result(vec)
+                return fut
+            self.misses += 1
+            fut = self._inflight.get(key)
+            if fut is not None:
+                return fut
+            fut = self._inflight[key] = Future()
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="query-encoder", daemon=True)
+                self._worker.start()
+        self._queue.put(key)
+        return fut
+
+    def encode(self, text: str, timeout: Optional[float] = None) -> np.ndarray: # NOQA E501
+        """Blocking embedding of one query (read-only array)."""
+        return self.submit(text).result(timeout)
+
+    async def aencode(self, text: str) -> np.ndarray:
+        """Awaitable embedding of one query (read-only array)."""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _collect(self) -> List[str]:
+        keys = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(keys) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                keys.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return keys
+
+    def _run(self):
+        while True:
+            keys = self._collect()
+            try:
+                vecs = np.asarray(self.encode_batch(keys))
+            except BaseException as e:
+                with self._lock:
+                    futures = [self._inflight.pop(k) for k in keys]
+                for fut in futures:
+                    fut.set_exception(e)
+                continue
+
+            self.batches += 1
+            with self._lock:
+                futures = []
+                for key, vec in zip(keys, vecs):
+                    vec = vec.copy()
+                    # Cached vectors are shared between callers
+                    vec.flags.writeable = False
+                    self._put(key, vec)
+                    futures.append((self._inflight.pop(key), vec))
+            for fut, vec in futures:
+                fut.set_result(vec)
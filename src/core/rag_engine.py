@@ -1,88 +1,365 @@
 import os
 import json
-import torch
-from sentence_transformers import SentenceTransformer, util
+import hashlib
+import tempfile
+from pathlib import Path
+import numpy as np
+from sentence_transformers import SentenceTransformer
+from src.core.bm25 import BM25Index
+from src.core.chunker import build_passages, iter_batches
+from src.core.query_encoder import QueryEncoder
+from src.core.vector_index import index_signature, make_index
+
+# Default: project_root/rag_cache (independent of the working directory)
+CACHE_DIR = Path(__file__).resolve().parents[2] / "rag_cache"
+
+
+def doc_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def atomic_write(path: Path, write):
+    """Write via a temp file in the same directory, then os.replace()."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuse ranked id lists: score(d) = sum over lists of 1 / (k + rank).
+
+    Returns:
+        (ids, scores) sorted by fused score, best first
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, i in enumerate(ranking):
+            fused[i] = fused.get(i, 0.0) + 1.0 / (k + rank + 1)
+    ids = sorted(fused, key=lambda i: (-fused[i], i))
+    return np.array(ids, dtype=int), np.array(
+        [fused[i] for i in ids], dtype=np.float32)
+
+
+def _lookup(ids, keys, values):
+    """values[keys == id] for each id, NaN where absent."""
+    found = dict(zip(np.asarray(keys).tolist(), np.asarray(values).tolist()))
+    return [found.get(i, np.nan) for i in np.asarray(ids).tolist()]
 
 
 class RAGEngine:
-    def __init__(self, cache_dir="rag_cache"):
+    RETRIEVAL_MODES = ("dense", "sparse", "hybrid")
+
+    def __init__(self, cache_dir=None, model_name="all-MiniLM-L6-v2", dtype="float32", model=None, index="exact", index_params=None, max_words=120, overlap=20, batch_size=256, query_cache_size=1024, retrieval="hybrid", candidates=200, prune_above=50000, rrf_k=60, prebuilt_dir=None): # NOQA E501
         self.df = None
         self.corpus = []
+        self.passages = None
+        self.passage_rows = None
+        self.max_words = max_words
+        self.overlap = overlap
+        self.batch_size = batch_size
         self.embeddings = None
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
-        self.cache_dir = cache_dir
+        self.embeddings_file = None
+        self.embeddings_dir = None
+        # Vector index: "exact" (baseline), "ivf" or "ivfpq" (CPU ANN)
+        self.index_kind = index
+        self.index_params = dict(index_params or {})
+        self.vector_index = None
+        # Retrieval: "dense", "sparse" (BM25) or "hybrid" (RRF of both)
+        if retrieval not in self.RETRIEVAL_MODES:
+            raise ValueError(
+                f"Unknown retrieval '{retrieval}'. "
+                f"Valid: {', '.join(self.RETRIEVAL_MODES)}")
+        self.retrieval = retrieval
+        self.bm25 = None
+        self.candidates = candidates
+        self.prune_above = prune_above
+        self.rrf_k = rrf_k
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.model = model or SentenceTransformer(model_name)
+        # Query embeddings: LRU-cached and micro-batched across requests
+        self.query_encoder = QueryEncoder(
+            self._encode, max_size=query_cache_size)
+
+        # One cache directory per model, so switching models never
+        # reuses incompatible vectors
+        safe_model = model_name.replace("/", "__")
+        self.cache_dir = Path(cache_dir or CACHE_DIR) / safe_model
+        # Read-only cache laid out like cache_dir (e.g. an artifact
+        # bundle's rag/): used when it matches, never written to
+        self.prebuilt_dir = (
+            Path(prebuilt_dir) / safe_model if prebuilt_dir else None)
 
         # Create directory if missing
         os.makedirs(self.cache_dir, exist_ok=True)
 
         # Cache file paths
-        self.corpus_file = os.path.join(cache_dir, "corpus.json")
-        self.emb_file = os.path.join(cache_dir, "embeddings.pt")
+        self.corpus_file = self.cache_dir / "corpus.json"
+        self.manifest_file = self.cache_dir / "manifest.json"
 
     # -------------------------------------------------------
     # 1. LOAD DATA
     # -------------------------------------------------------
     def load_data(self, df):
-        self.df = df
-        self.corpus = []
+        """Build the passage corpus (see chunker.build_passages).
 
-        text_columns = [
-            "name", "district", "type", "built_by", "era",
-            "key_events", "notes", "water_availability",
-            "trek_difficulty", "description"
-        ]
-
-        for _, row in df.iterrows():
-            parts = [str(row.get(col, "")) for col in text_columns]
-            combined = " | ".join(parts)
-            self.corpus.append(combined)
+        `self.corpus` holds passage texts; `self.passages` keeps their
+        row / field / chunk provenance.
+        """
+        self.df = df
+        self.passages = build_passages(
+            df, max_words=self.max_words, overlap=self.overlap)
+        self.corpus = self.passages["text"].tolist()
+        self.passage_rows = self.passages["row"].to_numpy()
+        self.bm25 = BM25Index().build(self.corpus)
 
-        # Save corpus locally for future reuse
-        with open(self.corpus_file, "w") as f:
-            json.dump(self.corpus, f)
+        # Save corpus locally for future reuse (skipped when unchanged)
+        data = json.dumps(self.corpus).encode("utf-8")
+        try:
+            unchanged = self.corpus_file.read_bytes() == data
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            atomic_write(self.corpus_file, lambda f: f.write(data))
 
-        print(f"RAGEngine: Corpus created with {len(self.corpus)} entries.")
+        print(f"RAGEngine: Corpus created with {len(self.corpus)} passages "
+              f"from {len(df)} forts.")
         return self
 
     # -------------------------------------------------------
     # 2. BUILD OR LOAD INDEX
     # -------------------------------------------------------
-    def build_index(self):
-        # Try loading cached embeddings
-        if os.path.exists(self.emb_file):
+    def _read_manifest(self, validate=True, directory=None):
+        directory = directory or self.cache_dir
+        try:
+            with open(directory / self.manifest_file.name) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not validate:
+            return manifest
+        if (manifest.get("model") != self.model_name
+                or manifest.get("dtype") != self.dtype.name):
+            return None
+        if not (directory / manifest["file"]).exists():
+            return None
+        return manifest
+
+    def _load_embeddings(self, directory: Path, name: str):
+        self.embeddings_dir = directory
+        self.embeddings_file = name
+        self.embeddings = np.load(directory / name, mmap_mode="r")
+        return self._build_vector_index()
+
+    def _encode(self, texts):
+        return np.asarray(self.model.encode(
+            texts,
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        ), dtype=self.dtype)
+
+    def _write_cache(self, keys, embeddings, old_file=None):
+        """Persist embeddings + manifest atomically.
+
+        The matrix goes to a content-named .npy and the manifest that
+        points at it is replaced last, so readers never see a torn
+        cache.
+        """
+        digest = hashlib.sha1("".join(keys).encode()).hexdigest()[:16]
+        name = f"embeddings-{digest}.npy"
+        atomic_write(self.cache_dir / name, lambda f: np.save(f, embeddings))
+
+        manifest = {
+            "model": self.model_name,
+            "dtype": self.dtype.name,
+            "dim": int(embeddings.shape[1]),
+            "file": name,
+            "keys": keys,
+        }
+        atomic_write(
+            self.manifest_file,
+            lambda f: f.write(json.dumps(manifest).encode("utf-8")))
+
+        if old_file and old_file != name:
+            try:
+                os.remove(self.cache_dir / old_file)
+            except OSError:
+                pass
+        return name
+
+    def build_index(self, use_cache=True):
+        """Embed the corpus, reusing cached vectors for unchanged docs.
+
+        Cache entries are keyed by a hash of each document's text under
+        the current model, so only new or edited rows are re-encoded.
+        The result is memory-mapped read-only, which lets every worker
+        process share one copy through the page cache.
+
+        Embeddings in `prebuilt_dir` are used as they are when they
+        cover exactly this corpus; anything else is encoded into
+        `cache_dir`.
+        """
+        keys = [doc_hash(doc) for doc in self.corpus]
+        if use_cache and self.prebuilt_dir is not None:
+            manifest = self._read_manifest(directory=self.prebuilt_dir)
+            if manifest and manifest["keys"] == keys:
+                print("RAGEngine: Loading prebuilt embeddings...")
+                return self._load_embeddings(
+                    self.prebuilt_dir, manifest["file"])
+
+        previous = self._read_manifest(validate=False)
+        manifest = self._read_manifest() if use_cache else None
+
+        if manifest and manifest["keys"] == keys:
             print("RAGEngine: Loading cached embeddings...")
-            self.embeddings = torch.load(self.emb_file)
-            print("RAGEngine: Embeddings loaded from cache.")
-            return self
+            return self._load_embeddings(self.cache_dir, manifest["file"])
 
-        # Else build embeddings fresh
-        print("RAGEngine: Building new embeddings...")
-        self.embeddings = self.model.encode(
-            self.corpus,
-            convert_to_tensor=True
-        )
+        cached = {}
+        old = None
+        if manifest:
+            old = np.load(self.cache_dir / manifest["file"], mmap_mode="r")
+            cached = {k: i for i, k in enumerate(manifest["keys"])}
 
-        # Save embeddings to disk
-        torch.save(self.embeddings, self.emb_file)
+        if not keys:
+            raise ValueError("Corpus is empty. Call load_data() first.")
+
+        missing = [i for i, k in enumerate(keys) if k not in cached]
+        print(f"RAGEngine: Embedding {len(missing)} new/changed of "
+              f"{len(keys)} documents...")
+
+        dim = old.shape[1] if old is not None else None
+        embeddings = None
+        hits = [i for i, k in enumerate(keys) if k in cached]
+
+        # Stream new passages through the encoder batch by batch
+        for batch in iter_batches(missing, self.batch_size):
+            vecs = self._encode([self.corpus[i] for i in batch])
+            if embeddings is None:
+                dim = vecs.shape[1]
+                embeddings = np.empty((len(keys), dim), dtype=self.dtype)
+            embeddings[batch] = vecs
+        if embeddings is None:
+            embeddings = np.empty((len(keys), dim), dtype=self.dtype)
+        if hits:
+            embeddings[hits] = old[[cached[keys[i]] for i in hits]]
+
+        name = self._write_cache(
+            keys, embeddings, old_file=previous and previous["file"])
         print("RAGEngine: Embeddings created and cached.")
+        return self._load_embeddings(self.cache_dir, name)
+
+    def _build_vector_index(self):
+        """Load or build the configured vector index over the embeddings.
 
+        Persistent (ANN) indexes are saved in cache_dir, named after the
+        embeddings file they were trained on, and reused while it is
+        unchanged (also from prebuilt_dir).
+        """
+        index = make_index(self.index_kind, **self.index_params)
+        if not index.persistent:
+            self.vector_index = index.build(self.embeddings)
+            return self
+
+        stem = Path(self.embeddings_file).stem
+        name = f"index-{index_signature(index)}-{stem}.npz"
+        path = self.cache_dir / name
+        if self.embeddings_dir == self.prebuilt_dir and (self.prebuilt_dir / name).exists(): # NOQA E501
+            path = self.prebuilt_dir / name
+        if path.exists():
+            print(f"RAGEngine: Loading {index.kind} index from cache...")
+            index.load(path, self.embeddings)
+        else:
+            print(f"RAGEngine: Building {index.kind} index...")
+            index.build(self.embeddings)
+            atomic_write(path, index.save)
+            # Indexes trained on older embeddings are never reused
+            for old in self.cache_dir.glob("index-*.npz"):
+                if not old.name.endswith(f"-{stem}.npz"):
+                    old.unlink(missing_ok=True)
+
+        self.vector_index = index
         return self
 
     # -------------------------------------------------------
     # 3. QUERY DOCUMENTS
     # -------------------------------------------------------
-    def query(self, user_query, k=5):
-        if self.embeddings is None:
+    def _dense_candidates(self, q_emb, sparse_idx, depth):
+        """Dense ranking, restricted to the sparse hits on big corpora."""
+        if len(self.corpus) > self.prune_above and len(sparse_idx):
+            cand = np.sort(sparse_idx)
+            scores = np.asarray(self.embeddings[cand], np.float32) @ q_emb
+            order = np.argsort(-scores, kind="stable")
+            return cand[order], scores[order]
+        return self.vector_index.search(q_emb, depth)
+
+    def query_passages(self, user_query, k=5, q_emb=None):
+        """Return the top-k passages with provenance and scores.
+
+        In hybrid mode the BM25 and dense top `candidates` are fused
+        with reciprocal rank fusion. Once the corpus exceeds
+        `prune_above` passages, dense scoring runs only on the BM25
+        candidates (falling back to the vector index when BM25 has no
+        hit), trading some recall for per-query CPU.
+
+        `q_emb` is the query's embedding when the caller already has it
+        (e.g. from `query_encoder.aencode`); otherwise it is encoded here.
+
+        Returns:
+            pd.DataFrame with row, field, chunk, text, score (fused, or
+            the single retriever's score) and the dense / bm25 scores
+        """
+        if self.vector_index is None:
             raise ValueError("Index not built. Call build_index().")
 
-        q_emb = self.model.encode(user_query, convert_to_tensor=True)
-        scores = util.pytorch_cos_sim(q_emb, self.embeddings)[0]
+        depth = max(k, self.candidates)
+        sparse_idx = sparse_scores = np.empty(0)
+        dense_idx = dense_scores = np.empty(0)
+
+        if self.retrieval != "dense":
+            sparse_idx, sparse_scores = self.bm25.search(user_query, depth)
+        if self.retrieval != "sparse":
+            # Embeddings are L2-normalized, so inner product == cosine
+            if q_emb is None:
+                q_emb = self.query_encoder.encode(user_query)
+            q_emb = np.asarray(q_emb, np.float32)
+            dense_idx, dense_scores = self._dense_candidates(
+                q_emb, sparse_idx, depth)
+
+        if self.retrieval == "dense":
+            idx, scores = dense_idx[:k], dense_scores[:k]
+        elif self.retrieval == "sparse":
+            idx, scores = sparse_idx[:k], sparse_scores[:k]
+        else:
+            idx, scores = reciprocal_rank_fusion(
+                [dense_idx, sparse_idx], k=self.rrf_k)
+            idx, scores = idx[:k], scores[:k]
+
+        out = self.passages.iloc[idx].copy()
+        out["score"] = scores
+        out["dense"] = _lookup(idx, dense_idx, dense_scores)
+        out["bm25"] = _lookup(idx, sparse_idx, sparse_scores)
+        return out
+
+    def query(self, user_query, k=5, oversample=4, q_emb=None):
+        """Return the k best-matching fort rows.
 
-        top_idx = torch.topk(scores, k).indices.tolist()
+        Passages are retrieved (k * oversample) and collapsed to their
+        fort, keeping each fort's best passage score. `q_emb` is as in
+        `query_passages`.
+        """
+        hits = self.query_passages(user_query, k * oversample, q_emb=q_emb)
+        top_idx = hits.drop_duplicates("row")["row"].head(k).tolist()
 
         # Return raw dataframe rows (no formatting)
         return [self.df.iloc[i].to_dict() for i in top_idx]
-    
 
     # -------------------------------------------------------
     # Extra: force rebuild (if needed)
@@ -90,9 +367,6 @@ class RAGEngine:
     def rebuild_index(self):
         """Manually rebuild all embeddings, ignoring cache."""
         print("RAGEngine: Force rebuilding embeddings...")
-        self.embeddings = self.model.encode(
-            self.corpus, convert_to_tensor=True
-        )
-        torch.save(self.embeddings, self.emb_file)
+        self.build_index(use_cache=False)
         print("RAGEngine: Rebuild complete.")
         return self
@@ -1,8 +1,274 @@
+import math
+from typing import Dict, List, Optional, Tuple
 from geopy.distance import geodesic
+import numpy as np
 import pandas as pd
+from sklearn.neighbors import BallTree
+from src.core import artifacts
+from src.core.cluster_engine import ClusterEngine
+from src.core.geo_utils import EARTH_RADIUS_KM
 
 
-def recommend_by_proximity(df: pd.DataFrame, lat: float, lon: float, k: int = 10) -> pd.DataFrame: # NOQA E501
+class ProximityEngine(artifacts.BundledEngine):
+    """Spatial index for nearest / radius / bounding-box fort lookups.
+
+    Coordinates are converted to radians once and indexed by a haversine
+    BallTree, so kNN and radius queries are sub-linear in the number of
+    forts. Bounding-box queries use a latitude-sorted array and
+    `np.searchsorted`. With `exact=True` only the returned candidates are
+    re-ranked by geodesic distance.
+
+    When built from a FortStore the index is rebuilt automatically
+    whenever the store generation changes.
+    """
+
+    # Extra haversine candidates re-ranked when exact=True
+    REFINE_FACTOR = 2
+    REFINE_MIN_EXTRA = 10
+    # Haversine vs. geodesic differ by < 0.5%; widen radius before refining
+    REFINE_RADIUS_SLACK = 1.01
+
+    ARTIFACT = "spatial"
+    PARAMS = ("leaf_size",)
+    STATE = ("positions", "lat", "lon", "lat_rad", "lon_rad", "cos_lat",
+             "tree", "lat_order", "lat_sorted")
+
+    def __init__(self, store=None, leaf_size: int = 40):
+        self.store = store
+        self.leaf_size = leaf_size
+        self.df = None
+        self.positions = None
+        self.lat = None
+        self.lon = None
+        self.lat_rad = None
+        self.lon_rad = None
+        self.cos_lat = None
+        self.tree = None
+        self.lat_order = None
+        self.lat_sorted = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ProximityEngine":
+        engine = cls()
+        engine._build(df)
+        return engine
+
+    def _build(self, df: pd.DataFrame):
+        lat = pd.to_numeric(df["latitude"], errors="coerce").to_numpy(float)
+        lon = pd.to_numeric(df["longitude"], errors="coerce").to_numpy(float)
+
+        # Rows without coordinates are never returned
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+        self.df = df
+        self.positions = np.flatnonzero(valid)
+        self.lat = lat[valid]
+        self.lon = lon[valid]
+        self.lat_rad = np.radians(self.lat)
+        self.lon_rad = np.radians(self.lon)
+        self.cos_lat = np.cos(self.lat_rad)
+
+        self.tree = BallTree(
+            np.column_stack([self.lat_rad, self.lon_rad]),
+            leaf_size=self.leaf_size,
+            metric="haversine",
+        )
+        self.lat_order = np.argsort(self.lat, kind="stable")
+        self.lat_sorted = self.lat[self.lat_order]
+
+    def _restored(self):
+        self.df = self.store.frame
+
+    def __len__(self) -> int:
+        self._ensure()
+        return len(self.positions)
+
+    @staticmethod
+    def _check_coords(lats, lons):
+        """Raise ValueError unless every coordinate is finite and in range
+        (BallTree fails on NaN and would quietly wrap 95°)."""
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        if not (np.isfinite(lats).all() and np.isfinite(lons).all()):
+            raise ValueError("lat/lon must be finite numbers")
+        if (np.abs(lats) > 90).any() or (np.abs(lons) > 180).any():
+            raise ValueError("lat must be within ±90 and lon within ±180")
+
+    def _geodesic(self, lat: float, lon: float, idx: np.ndarray) -> np.ndarray:
+        return np.array([
+            geodesic((lat, lon), (self.lat[i], self.lon[i])).km for i in idx
+        ])
+
+    @staticmethod
+    def _sorted(idx: np.ndarray, dist: np.ndarray, k=None):
+        # Ties broken by dataset order
+        order = np.lexsort((idx, dist))[:k]
+        return idx[order], dist[order]
+
+    # -----------------------------
+    # kNN
+    # -----------------------------
+    def nearest(self, lat: float, lon: float, k: int = 10, exact: bool = False) -> Tuple[np.ndarray, np.ndarray]: # NOQA E501
+        """Return (row positions, distances_km) of the k nearest forts.
+
+        Raises:
+            ValueError: for non-finite or out-of-range coordinates
+        """
+        self._check_coords(lat, lon)
+        self._ensure()
+        n = len(self.positions)
+        k = max(0, min(int(k), n))
+        if k == 0:
+            return np.empty(0, dtype=int), np.empty(0)
+
+        m = k
+        if exact:
+            m = min(n, max(k * self.REFINE_FACTOR, k + self.REFINE_MIN_EXTRA))
+
+        dist, cand = self.tree.query(
+            [[np.radians(lat), np.radians(lon)]], k=m)
+        cand = cand[0]
+        dist = dist[0] * EARTH_RADIUS_KM
+        if exact:
+            dist = self._geodesic(lat, lon, cand)
+
+        idx, dist = self._sorted(cand, dist, k)
+        return self.positions[idx], dist
+
+    def nearest_many(self, lats, lons, k: int = 10, exact: bool = False) -> List[Tuple[np.ndarray, np.ndarray]]: # NOQA E501
+        """kNN for many query points with a single BallTree query.
+
+        Returns:
+            list of (row positions, distances_km), one per query point
+
+        Raises:
+            ValueError: for non-finite or out-of-range coordinates
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        self._check_coords(lats, lons)
+        self._ensure()
+        n = len(self.positions)
+        k = max(0, min(int(k), n))
+        if k == 0 or len(lats) == 0:
+            return [(np.empty(0, dtype=int), np.empty(0)) for _ in lats]
+
+        m = k
+        if exact:
+            m = min(n, max(k * self.REFINE_FACTOR, k + self.REFINE_MIN_EXTRA))
+
+        dist, cand = self.tree.query(
+            np.column_stack([np.radians(lats), np.radians(lons)]), k=m)
+        dist = dist * EARTH_RADIUS_KM
+
+        out = []
+        for lat, lon, c, d in zip(lats, lons, cand, dist):
+            if exact:
+                d = self._geodesic(lat, lon, c)
+            idx, d = self._sorted(c, d, k)
+            out.append((self.positions[idx], d))
+        return out
+
+    # -----------------------------
+    # Radius
+    # -----------------------------
+    def within_radius(self, lat: float, lon: float, radius_km: float, exact: bool = False) -> Tuple[np.ndarray, np.ndarray]: # NOQA E501
+        """Return (row positions, distances_km) of forts within radius_km.
+
+        Raises:
+            ValueError: for non-finite coordinates or radius
+        """
+        self._check_coords(lat, lon)
+        if not np.isfinite(radius_km):
+            raise ValueError("radius_km must be a finite number")
+        self._ensure()
+        r = max(float(radius_km), 0.0)
+        if exact:
+            r *= self.REFINE_RADIUS_SLACK
+
+        cand, dist = self.tree.query_radius(
+            [[np.radians(lat), np.radians(lon)]],
+            r=r / EARTH_RADIUS_KM,
+            return_distance=True,
+        )
+        cand = cand[0]
+        dist = dist[0] * EARTH_RADIUS_KM
+        if exact and len(cand):
+            dist = self._geodesic(lat, lon, cand)
+            keep = dist <= radius_km
+            cand, dist = cand[keep], dist[keep]
+
+        idx, dist = self._sorted(cand, dist)
+        return self.positions[idx], dist
+
+    # -----------------------------
+    # Bounding box
+    # -----------------------------
+    def within_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray: # NOQA E501
+        """Return row positions of forts inside a lat/lon viewport.
+
+        A box with min_lon > max_lon is treated as crossing the antimeridian.
+        """
+        self._ensure()
+        lo = np.searchsorted(self.lat_sorted, min_lat, side="left")
+        hi = np.searchsorted(self.lat_sorted, max_lat, side="right")
+        idx = self.lat_order[lo:hi]
+
+        lon = self.lon[idx]
+        if min_lon <= max_lon:
+            keep = (lon >= min_lon) & (lon <= max_lon)
+        else:
+            keep = (lon >= min_lon) | (lon <= max_lon)
+        return self.positions[np.sort(idx[keep])]
+
+    # -----------------------------
+    # DataFrame helpers
+    # -----------------------------
+    def _frame(self, pos: np.ndarray, dist=None) -> pd.DataFrame:
+        out = self.df.iloc[pos].copy()
+        if dist is not None:
+            out["distance_km"] = dist
+        return out
+
+    def recommend(self, lat: float, lon: float, k: int = 10, exact: bool = False) -> pd.DataFrame: # NOQA E501
+        """Return the k nearest forts with a `distance_km` column."""
+        return self._frame(*self.nearest(lat, lon, k=k, exact=exact))
+
+    def recommend_many(self, lats, lons, k: int = 10, exact: bool = False) -> List[List[dict]]: # NOQA E501
+        """Return the k nearest fort records for each query point.
+
+        All result rows are sliced and serialized in one pass.
+        """
+        hits = self.nearest_many(lats, lons, k=k, exact=exact)
+        if not hits:
+            return []
+        pos = np.concatenate([p for p, _ in hits])
+        dist = np.concatenate([d for _, d in hits])
+        records = self._frame(pos, dist).to_dict(orient="records")
+
+        out, start = [], 0
+        for p, _ in hits:
+            out.append(records[start:start + len(p)])
+            start += len(p)
+        return out
+
+    def recommend_within(self, lat: float, lon: float, radius_km: float, k=None, exact: bool = False) -> pd.DataFrame: # NOQA E501
+        """Return forts within radius_km (optionally capped at k)."""
+        pos, dist = self.within_radius(lat, lon, radius_km, exact=exact)
+        if k is not None:
+            k = max(0, int(k))  # a negative k must not slice from the end
+        return self._frame(pos[:k], dist[:k])
+
+    def in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> pd.DataFrame: # NOQA E501
+        """Return forts inside a lat/lon bounding box."""
+        return self._frame(
+            self.within_bbox(min_lat, min_lon, max_lat, max_lon))
+
+
+# Index of the last frame passed to recommend_by_proximity
+_PROXIMITY_CACHE = {"df": None, "engine": None}
+
+
+def recommend_by_proximity(df: pd.DataFrame, lat: float, lon: float, k: int = 10, exact: bool = False) -> pd.DataFrame: # NOQA E501
     """Return k nearest forts to the given (lat, lon) location.
 
     Args:
@@ -10,54 +276,240 @@ def recommend_by_proximity(df: pd.DataFrame, lat: float, lon: float, k: int = 10
         lat (float): latitude of query location
         lon (float): longitude of query location
         k (int): number of results to return
+        exact (bool): re-rank the top candidates by geodesic distance
 
     Returns:
         pd.DataFrame: sorted by ascending distance_km
+
+    The spatial index is reused while the same frame object is passed
+    in, so df must not be modified in place between calls.
+    """
+    if _PROXIMITY_CACHE["df"] is not df:
+        _PROXIMITY_CACHE["engine"] = ProximityEngine.from_frame(df)
+        _PROXIMITY_CACHE["df"] = df
+    return _PROXIMITY_CACHE["engine"].recommend(lat, lon, k=k, exact=exact)
+
+
+class SimilarityEngine(artifacts.BundledEngine):
+    """Precomputed fort-to-fort similarity.
+
+    A feature matrix is built once per dataset generation:
+
+    - categorical codes for type, district and era (match = +weight)
+    - z-scored elevation, difficulty and trek time (-weight * |diff|)
+    - z-scored coordinates (-weight * euclidean distance)
+
+    Each fort's top-N neighbours under the default weights are
+    precomputed, so the common request is a lookup. Custom weights are
+    scored for the single requested fort in one vectorized pass, with
+    no rebuild.
     """
-    df_coords = df.copy()
 
-    def compute_distance(row):
-        try:
-            if pd.isna(row['latitude']) or pd.isna(row['longitude']):
-                return float('inf')
-            return geodesic((lat, lon), (row['latitude'], row['longitude'])).km
-        except Exception:
-            return float('inf')
+    CATEGORICAL = ("type", "district", "era")
+    NUMERIC = ("elevation_m", "difficulty_num", "trek_time_hours")
+    DEFAULT_WEIGHTS = {
+        "type": 1.0,
+        "elevation_m": 0.5,
+        "difficulty_num": 0.25,
+        "trek_time_hours": 0.25,
+        "district": 0.25,
+        "era": 0.25,
+        "location": 0.5,
+    }
+
+    ARTIFACT = "similarity"
+    PARAMS = ("weights", "top_n")
+    STATE = ("codes", "z", "loc", "neighbours", "neighbour_scores")
+
+    def __init__(self, store=None, weights=None, top_n: int = 50, chunk_size: int = 512): # NOQA E501
+        self.store = store
+        self.weights = self.resolve_weights(weights)
+        self.top_n = top_n
+        self.chunk_size = chunk_size
+        self.df = None
+        self.codes = {}
+        self.z = {}
+        self.loc = None
+        self.index = {}
+        self.neighbours = None
+        self.neighbour_scores = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **kwargs) -> "SimilarityEngine":
+        engine = cls(**kwargs)
+        engine._build(df)
+        return engine
+
+    @classmethod
+    def resolve_weights(cls, weights=None) -> Dict[str, float]:
+        """Merge user weights over the defaults.
+
+        Raises:
+            ValueError: for unknown feature names, or weights that are
+                negative or not finite
+        """
+        merged = dict(cls.DEFAULT_WEIGHTS)
+        for name, w in (weights or {}).items():
+            if name not in merged:
+                raise ValueError(
+                    f"Unknown similarity feature '{name}'. "
+                    f"Valid: {', '.join(merged)}")
+            w = float(w)
+            if not math.isfinite(w) or w < 0:
+                raise ValueError(
+                    f"Weight for '{name}' must be a finite number >= 0")
+            merged[name] = w
+        return merged
+
+    @staticmethod
+    def _zscore(values) -> np.ndarray:
+        v = pd.to_numeric(values, errors="coerce").to_numpy(float)
+        if np.isnan(v).all():
+            return np.zeros_like(v)
+        v = np.where(np.isnan(v), np.nanmedian(v), v)
+        std = v.std()
+        return (v - v.mean()) / (std if std > 0 else 1.0)
+
+    def _build(self, df: pd.DataFrame):
+        self.df = df
+        self.codes = {
+            c: pd.factorize(df[c].astype(str).str.strip().str.lower())[0]
+            for c in self.CATEGORICAL if c in df.columns
+        }
+
+        numeric = {
+            "elevation_m": df.get("elevation_m"),
+            "trek_time_hours": df.get("trek_time_hours"),
+            "difficulty_num": df["trek_difficulty"].apply(
+                ClusterEngine.map_difficulty)
+            if "trek_difficulty" in df.columns else None,
+        }
+        self.z = {
+            f: self._zscore(v) for f, v in numeric.items() if v is not None
+        }
+        self.loc = np.column_stack([
+            self._zscore(df["latitude"]), self._zscore(df["longitude"])
+        ])
+        if self.store is None:
+            self.index = {
+                int(fid): pos
+                for pos, fid in enumerate(df["fort_id"].to_numpy())
+            }
+        self.neighbours, self.neighbour_scores = self._top_n(self.weights)
+
+    def _restored(self):
+        self.df = self.store.frame
 
-    df_coords['distance_km'] = df_coords.apply(compute_distance, axis=1)
-    return df_coords.sort_values('distance_km').head(k)
+    def scores(self, rows, weights: Dict[str, float]) -> np.ndarray:
+        """Similarity of each fort in `rows` to every fort.
 
+        Returns:
+            np.ndarray of shape (len(rows), n_forts); self-matches are -inf
+        """
+        rows = np.asarray(rows)
+        n = len(self.df)
+        S = np.zeros((len(rows), n))
 
-def recommend_similar(df: pd.DataFrame, fort_id: int, k: int = 5) -> pd.DataFrame: # NOQA E501
+        for c, codes in self.codes.items():
+            w = weights.get(c, 0.0)
+            if w:
+                S += w * (codes[rows, None] == codes[None, :])
+
+        for f, z in self.z.items():
+            w = weights.get(f, 0.0)
+            if w:
+                S -= w * np.abs(z[rows, None] - z[None, :])
+
+        w = weights.get("location", 0.0)
+        if w:
+            dlat = self.loc[rows, None, 0] - self.loc[None, :, 0]
+            dlon = self.loc[rows, None, 1] - self.loc[None, :, 1]
+            S -= w * np.sqrt(dlat * dlat + dlon * dlon)
+
+        S[np.arange(len(rows)), rows] = -np.inf
+        return S
+
+    @staticmethod
+    def _rank(S: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Row-wise top-k (highest score first, ties by dataset order)."""
+        n = S.shape[1]
+        k = min(k, n)
+        if k <= 0:
+            return (np.empty((S.shape[0], 0), dtype=int),
+                    np.empty((S.shape[0], 0)))
+        if k < n:
+            cand = np.argpartition(-S, k - 1, axis=1)[:, :k]
+        else:
+            cand = np.tile(np.arange(n), (S.shape[0], 1))
+        cand_scores = np.take_along_axis(S, cand, axis=1)
+
+        order = np.lexsort((cand, -cand_scores), axis=-1)
+        return (
+            np.take_along_axis(cand, order, axis=1),
+            np.take_along_axis(cand_scores, order, axis=1),
+        )
+
+    def _top_n(self, weights) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(self.df)
+        # Exclude self, which is always ranked last (-inf)
+        k = min(self.top_n, max(n - 1, 0))
+        idx = np.empty((n, k), dtype=int)
+        sc = np.empty((n, k))
+        if k == 0:
+            return idx, sc  # nothing precomputed (top_n=0)
+        for start in range(0, n, self.chunk_size):
+            rows = np.arange(start, min(start + self.chunk_size, n))
+            idx[rows], sc[rows] = self._rank(self.scores(rows, weights), k)
+        return idx, sc
+
+    def similar(self, fort_id: int, k: int = 5, weights=None) -> Optional[Tuple[np.ndarray, np.ndarray]]: # NOQA E501
+        """Return (row positions, scores) of the k most similar forts.
+
+        Returns None if fort_id is unknown.
+        """
+        self._ensure()
+        if self.store is not None:
+            pos = self.store.position(fort_id)
+        else:
+            pos = self.index.get(int(fort_id))
+        if pos is None:
+            return None
+        k = max(0, min(int(k), len(self.df) - 1))
+
+        w = self.resolve_weights(weights) if weights else self.weights
+        if w == self.weights and k <= self.neighbours.shape[1]:
+            return self.neighbours[pos, :k], self.neighbour_scores[pos, :k]
+
+        idx, sc = self._rank(self.scores([pos], w), k)
+        return idx[0], sc[0]
+
+    def recommend(self, fort_id: int, k: int = 5, weights=None) -> pd.DataFrame: # NOQA E501
+        """Return the k most similar forts with a `score` column.
+
+        An empty DataFrame is returned if fort_id is unknown.
+        """
+        hit = self.similar(fort_id, k=k, weights=weights)
+        if hit is None:
+            return pd.DataFrame()
+        out = self.df.iloc[hit[0]].copy()
+        out["score"] = hit[1]
+        return out
+
+
+def recommend_similar(df: pd.DataFrame, fort_id: int, k: int = 5, weights=None) -> pd.DataFrame: # NOQA E501
     """Recommend similar forts to the given fort_id.
 
-    Similarity heuristic:
-        - Same type = +1
-        - Elevation closeness improves score
+    See SimilarityEngine for the features and default weights.
 
     Args:
         df (pd.DataFrame): fort dataset
         fort_id (int): fort to find similar forts for
         k (int): number of results
+        weights (dict): optional per-feature weight overrides
 
     Returns:
-        pd.DataFrame: top-k similar forts
+        pd.DataFrame: top-k similar forts (excluding fort_id itself)
     """
-    base = df[df['fort_id'] == fort_id]
-    if base.empty:
-        return pd.DataFrame()
-
-    base = base.iloc[0]
-    df2 = df.copy()
-
-    # Type similarity
-    df2['type_score'] = (df2['type'] == base['type']).astype(int)
-
-    # Elevation difference (smaller is better)
-    base_elev = base['elevation_m'] if pd.notna(base['elevation_m']) else 0
-    df2['elev_diff'] = (df2['elevation_m'].fillna(0) - base_elev).abs()
-
-    # Combined score
-    df2['score'] = df2['type_score'] - 0.001 * df2['elev_diff']
-
-    return df2.sort_values('score', ascending=False).head(k)
+    # top_n=0: no neighbour table, only the requested fort is scored
+    engine = SimilarityEngine.from_frame(df, top_n=0)
+    return engine.recommend(fort_id, k=k, weights=weights)
@@ -0,0 +1,144 @@
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from src.core import artifacts
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text) -> List[str]:
+    """Lowercase and split on anything that is not a letter or digit."""
+    return TOKEN_RE.findall(str(text).lower())
+
+
+class TextIndex(artifacts.BundledEngine):
+    """Inverted keyword index over the fort text columns.
+
+    Each token maps to {row position: weight}, where weight is the sum of
+    the field weights it occurs in (a name hit outranks a notes hit).
+    Query tokens match index terms in three ways:
+
+    - exact token
+    - prefix, via bisect over the sorted vocabulary (type-ahead)
+    - infix, via a trigram -> term index (e.g. "gad" in "rajgad")
+
+    A search is the intersection of the per-token candidate sets, ranked
+    by summed weight. The index is rebuilt when the store generation
+    changes.
+    """
+
+    FIELD_WEIGHTS = {
+        "name": 5.0,
+        "alternate_names": 4.0,
+        "district": 2.0,
+        "taluka": 2.0,
+        "key_events": 1.0,
+        "notes": 1.0,
+    }
+    EXACT, PREFIX, INFIX = 1.0, 0.7, 0.4
+    NGRAM = 3
+
+    ARTIFACT = "text_index"
+    PARAMS = ("field_weights",)
+    STATE = ("n_docs", "postings", "vocab", "ngrams")
+
+    def __init__(self, store=None, field_weights: Optional[Dict[str, float]] = None): # NOQA E501
+        self.store = store
+        self.field_weights = field_weights or dict(self.FIELD_WEIGHTS)
+        self.n_docs = 0
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.vocab: List[str] = []
+        self.ngrams: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **kwargs) -> "TextIndex":
+        index = cls(**kwargs)
+        index._build(df)
+        return index
+
+    def _build(self, df: pd.DataFrame):
+        postings: Dict[str, Dict[int, float]] = {}
+        for field, weight in self.field_weights.items():
+            if field not in df.columns:
+                continue
+            for pos, text in enumerate(df[field].tolist()):
+                for tok in tokenize(text):
+                    docs = postings.setdefault(tok, {})
+                    docs[pos] = docs.get(pos, 0.0) + weight
+
+        ngrams: Dict[str, Set[str]] = {}
+        for term in postings:
+            for i in range(len(term) - self.NGRAM + 1):
+                ngrams.setdefault(term[i:i + self.NGRAM], set()).add(term)
+
+        self.n_docs = len(df)
+        self.postings = postings
+        self.vocab = sorted(postings)
+        self.ngrams = ngrams
+
+    def _prefix_terms(self, tok: str) -> List[str]:
+        out = []
+        i = bisect_left(self.vocab, tok)
+        while i < len(self.vocab) and self.vocab[i].startswith(tok):
+            out.append(self.vocab[i])
+            i += 1
+        return out
+
+    def _infix_terms(self, tok: str) -> Set[str]:
+        if len(tok) < self.NGRAM:
+            return set()
+        terms = None
+        for i in range(len(tok) - self.NGRAM + 1):
+            found = self.ngrams.get(tok[i:i + self.NGRAM], set())
+            terms = found if terms is None else terms & found
+            if not terms:
+                return set()
+        return {t for t in terms if tok in t}
+
+    def _match(self, tok: str) -> Dict[int, float]:
+        """Score every document matching one query token."""
+        scores: Dict[int, float] = {}
+        seen = set()
+
+        def add(term, quality):
+            seen.add(term)
+            for pos, w in self.postings[term].items():
+                scores[pos] = max(scores.get(pos, 0.0), w * quality)
+
+        if tok in self.postings:
+            add(tok, self.EXACT)
+        for term in self._prefix_terms(tok):
+            if term not in seen:
+                add(term, self.PREFIX)
+        for term in self._infix_terms(tok):
+            if term not in seen:
+                add(term, self.INFIX)
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = None) -> np.ndarray:
+        """Return row positions matching every query token, best first.
+
+        Ties are broken by dataset order. A query with no tokens
+        matches nothing.
+        """
+        self._ensure()
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return np.empty(0, dtype=int)
+
+        # Rarest tokens first keeps the running intersection small
+        matches = sorted((self._match(t) for t in tokens), key=len)
+        candidates = set(matches[0])
+        for m in matches[1:]:
+            candidates &= m.keys()
+            if not candidates:
+                return np.empty(0, dtype=int)
+
+        pos = np.fromiter(candidates, dtype=int, count=len(candidates))
+        score = np.array([sum(m[p] for m in matches) for p in pos])
+        order = np.lexsort((pos, -score))
+        return pos[order][:limit]
@@ -0,0 +1,228 @@
+import json
+from typing import Optional, Tuple
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=int)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class ExactIndex:
+    """Brute-force inner product over L2-normalized vectors (cosine).
+
+    The recall baseline; nothing to persist besides the vectors.
+    """
+
+    kind = "exact"
+    persistent = False
+
+    def __init__(self):
+        self.vectors = None
+
+    def params(self) -> dict:
+        return {}
+
+    def build(self, vectors: np.ndarray) -> "ExactIndex":
+        self.vectors = vectors
+        return self
+
+    def search(self, query: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]: # NOQA E501
+        """Return (row indices, scores) of the k best matches."""
+        scores = self.vectors @ query.astype(self.vectors.dtype)
+        top = _top_k(scores, k)
+        return top, scores[top].astype(np.float32)
+
+
+class IVFIndex:
+    """Inverted-file ANN index with optional product quantization.
+
+    Vectors are clustered into `n_lists` cells by k-means; a query
+    scores only the `n_probe` closest cells. With `pq_m > 0` every
+    vector is also compressed to `pq_m` one-byte codes, candidates are
+    ranked via per-query lookup tables (IVF-PQ), and the best `rerank`
+    are re-scored exactly against the full vectors.
+
+    Knobs (recall vs latency):
+        n_lists: more cells = smaller cells = faster, lower recall
+        n_probe: more probed cells = higher recall, slower (per query)
+        pq_m:    sub-quantizers; 0 disables PQ (exact scoring in cells)
+        rerank:  exact re-scoring depth after PQ ranking
+    """
+
+    kind = "ivf"
+    persistent = True
+    PQ_BITS = 8
+
+    def __init__(self, n_lists: Optional[int] = None, n_probe: int = 8, pq_m: int = 0, rerank: int = 256, seed: int = 0): # NOQA E501
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.pq_m = pq_m
+        self.rerank = rerank
+        self.seed = seed
+        self.vectors = None
+        self.centroids = None
+        self.offsets = None
+        self.order = None
+        self.codebooks = None
+        self.codes = None
+
+    def params(self) -> dict:
+        """Build-time parameters (n_probe/rerank are query-time only)."""
+        return {"n_lists": self.n_lists, "pq_m": self.pq_m, "seed": self.seed}
+
+    # -----------------------------
+    # Build
+    # -----------------------------
+    # k-means is trained on at most this many points per centroid
+    TRAIN_PER_CENTROID = 64
+
+    def _kmeans(self, X: np.ndarray, k: int) -> np.ndarray:
+        limit = k * self.TRAIN_PER_CENTROID
+        if len(X) > limit:
+            rng = np.random.default_rng(self.seed)
+            X = X[np.sort(rng.choice(len(X), limit, replace=False))]
+        km = MiniBatchKMeans(
+            n_clusters=k, random_state=self.seed, n_init=1,
+            batch_size=min(4096, len(X)))
+        km.fit(X)
+        return km.cluster_centers_.astype(np.float32)
+
+    def _assign(self, X: np.ndarray, chunk: int = 65536) -> np.ndarray:
+        out = np.empty(len(X), dtype=np.int32)
+        for s in range(0, len(X), chunk):
+            out[s:s + chunk] = np.argmax(
+                np.asarray(X[s:s + chunk], np.float32) @ self.centroids.T,
+                axis=1)
+        return out
+
+    def build(self, vectors: np.ndarray) -> "IVFIndex":
+        X = np.asarray(vectors, dtype=np.float32)
+        n, d = X.shape
+        if self.n_lists is None:
+            self.n_lists = max(1, int(4 * np.sqrt(n)))
+        self.n_lists = min(self.n_lists, n)
+
+        # Spherical k-means: unit-length centroids for inner-product search
+        C = self._kmeans(X, self.n_lists)
+        C /= np.linalg.norm(C, axis=1, keepdims=True) + 1e-12
+        self.centroids = C
+
+        assign = self._assign(X)
+        self.order = np.argsort(assign, kind="stable").astype(np.int64)
+        self.offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(assign, minlength=self.n_lists))]
+        ).astype(np.int64)
+
+        if self.pq_m:
+            if d % self.pq_m:
+                raise ValueError(f"pq_m={self.pq_m} must divide dim={d}")
+            ksub = min(2 ** self.PQ_BITS, n)
+            sub = d // self.pq_m
+            self.codebooks = np.stack([
+                self._kmeans(X[:, j * sub:(j + 1) * sub], ksub)
+                for j in range(self.pq_m)
+            ])
+            self.codes = self._encode_pq(X)
+
+        self.vectors = vectors
+        return self
+
+    def _encode_pq(self, X: np.ndarray) -> np.ndarray:
+        m, ksub, sub = self.codebooks.shape
+        codes = np.empty((len(X), m), dtype=np.uint8)
+        for j in range(m):
+            x = X[:, j * sub:(j + 1) * sub]
+            cb = self.codebooks[j]
+            # argmin ||x - c||^2 == argmax (x.c - |c|^2 / 2)
+            codes[:, j] = np.argmax(
+                x @ cb.T - 0.5 * (cb ** 2).sum(axis=1), axis=1)
+        return codes
+
+    # -----------------------------
+    # Search
+    # -----------------------------
+    def search(self, query: np.ndarray, k: int = 5, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]: # NOQA E501
+        """Return (row indices, scores) of the (approximate) k best."""
+        q = np.asarray(query, dtype=np.float32)
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+
+        cells = _top_k(self.centroids @ q, n_probe)
+        cand = np.concatenate([
+            self.order[self.offsets[c]:self.offsets[c + 1]] for c in cells
+        ])
+        if len(cand) == 0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=np.float32)
+
+        if self.codes is not None:
+            m, _, sub = self.codebooks.shape
+            lut = np.einsum(
+                "jkd,jd->jk", self.codebooks, q.reshape(m, sub))
+            approx = lut[np.arange(m), self.codes[cand]].sum(axis=1)
+            if self.vectors is None:
+                top = _top_k(approx, k)
+                return cand[top], approx[top]
+            cand = cand[_top_k(approx, max(k, self.rerank))]
+
+        cand = np.sort(cand)
+        scores = np.asarray(self.vectors[cand], np.float32) @ q
+        top = _top_k(scores, k)
+        return cand[top], scores[top]
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, f):
+        arrays = {
+            "meta": np.array(json.dumps({
+                "kind": self.kind, "params": self.params()})),
+            "centroids": self.centroids,
+            "offsets": self.offsets,
+            "order": self.order,
+        }
+        if self.codes is not None:
+            arrays["codebooks"] = self.codebooks
+            arrays["codes"] = self.codes
+        np.savez(f, **arrays)
+
+    def load(self, path, vectors: Optional[np.ndarray] = None) -> "IVFIndex":
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(str(z["meta"]))
+            if meta["kind"] != self.kind:
+                raise ValueError(f"{path} is a {meta['kind']} index")
+            for name, value in meta["params"].items():
+                setattr(self, name, value)
+            self.centroids = z["centroids"]
+            self.offsets = z["offsets"]
+            self.order = z["order"]
+            self.codebooks = z["codebooks"] if "codebooks" in z else None
+            self.codes = z["codes"] if "codes" in z else None
+        self.vectors = vectors
+        return self
+
+
+INDEX_TYPES = {
+    "exact": ExactIndex,
+    "ivf": IVFIndex,
+    "ivfpq": lambda **kw: IVFIndex(**{"pq_m": 8, **kw}),
+}
+
+
+def make_index(kind: str = "exact", **params):
+    """Create an unbuilt vector index by name ('exact', 'ivf', 'ivfpq')."""
+    if kind not in INDEX_TYPES:
+        raise ValueError(
+            f"Unknown vector index '{kind}'. Valid: {', '.join(INDEX_TYPES)}")
+    return INDEX_TYPES[kind](**params)
+
+
+def index_signature(index) -> str:
+    """Short, filename-safe id of an index type + build params."""
+    params = "-".join(f"{k}{v}" for k, v in sorted(index.params().items()))
+    return f"{index.kind}-{params}" if params else index.kind
@@ -1,3 +1,4 @@
+import json
 import requests
 
 API_BASE = "http://localhost:8030"
@@ -31,6 +32,9 @@ class APIClient:
     def get_forts(self, params=None):
         return self._get("/forts", params=params, expect_list=True)
 
+    def get_facets(self, params=None):
+        return self._get("/forts/facets", params=params)
+
     def get_fort(self, fort_id):
         return self._get(f"/forts/{fort_id}")
 
@@ -51,15 +55,50 @@ class APIClient:
     def get_clusters(self):
         return self._get("/clusters")
 
-    def get_clustered_forts(self):
-        return self._get("/clusters/data", expect_list=True)
+    def get_clustered_forts(self, fields=None):
+        params = {"fields": ",".join(fields)} if fields else None
+        return self._get("/clusters/data", params=params, expect_list=True)
 
-    def rag_query(self, query: str):
-        return self._get(
+    def rag_query(self, query: str, mode: str = "auto"):
+        """Whole answer in one response (used by sandbox_search.py).
+
+        Returns the answer text, or "" on errors.
+        """
+        answer = self._get(
             "/search/semantic_search",
-            params={"q": query},
-            expect_list=True,
+            params={"q": query, "mode": mode},
         )
+        return answer if isinstance(answer, str) else ""
+
+    def stream_rag_answer(self, query: str, mode: str = "auto", stop=None):
+        """Yield (event, data) pairs from the SSE answer stream.
+
+        Connection errors surface as a final ("error", message) pair.
+        Setting `stop` (a threading.Event) ends the stream and closes
+        the connection at the next line, which withdraws the request.
+        """
+        url = f"{self.base}/search/semantic_search/stream"
+        try:
+            with requests.get(
+                url,
+                params={"q": query, "mode": mode},
+                stream=True,
+                timeout=(10, TIMEOUT),
+            ) as r:
+                r.raise_for_status()
+                event = "message"
+                for line in r.iter_lines(decode_unicode=True):
+                    if stop is not None and stop.is_set():
+                        return
+                    if line.startswith("event:"):
+                        event = line[6:].strip()
+                    elif line.startswith("data:"):
+                        yield event, json.loads(line[5:].strip())
+                        event = "message"
+
+        except Exception as e:
+            print(f"[API ERROR] STREAM {url} q={query} -> {e}")
+            yield "error", str(e)
 
 
 # Global instance used across the app
@@ -1,4 +1,7 @@
 import json
+import threading
+import time
+import uuid
 from dash import html, Input, Output, State, ALL, callback_context
 import dash
 import pandas as pd
@@ -19,20 +22,21 @@ from src.frontend.api_client import api
     Input("main-tabs", "active_tab"),
 )
 def load_filters(_):
-    forts = api.get_forts()
-    if not forts:
+    facets = api.get_facets().get("facets")
+    if not facets:
         return [], [], [], []
 
-    districts = sorted({f.get("district") or "Unknown" for f in forts})
-    types = sorted({f.get("type") or "Unknown" for f in forts})
-    difficulties = sorted({f.get("trek_difficulty") or "Unknown" for f in forts})  # NOQA E501
-    seasons = sorted({f.get("best_season") or "Unknown" for f in forts})
+    def options(facet):
+        return [
+            {"label": f"{v} ({n})", "value": v}
+            for v, n in facets.get(facet, {}).items()
+        ]
 
     return (
-        [{"label": d, "value": d} for d in districts],
-        [{"label": t, "value": t} for t in types],
-        [{"label": d, "value": d} for d in difficulties],
-        [{"label": s, "value": s} for s in seasons],
+        options("district"),
+        options("type"),
+        options("difficulty"),
+        options("season"),
     )
 
 
@@ -225,6 +229,13 @@ def load_similar(fort_id):
 # =========================================================
 # 7. Cluster Analysis Callback
 # =========================================================
+# Only the columns the cluster charts and profile table use
+CLUSTER_FIELDS = [
+    "name", "district", "type", "latitude", "longitude",
+    "elevation_m", "trek_time_hours", "difficulty_num", "cluster",
+]
+
+
 # Robust Cluster Analysis callback (drop-in replacement)
 @app.dash.callback(
     Output("ca-total-clusters", "children"),
@@ -245,7 +256,7 @@ def update_cluster_analysis(active_tab):
 
     # Fetch cluster counts and clustered forts
     clusters = api.get_clusters() or {}
-    points = api.get_clustered_forts() or []
+    points = api.get_clustered_forts(fields=CLUSTER_FIELDS) or []
 
     # Defensive: ensure clusters is dict-like
     if not isinstance(clusters, dict):
@@ -504,36 +515,109 @@ def update_cluster_analysis(active_tab):
 # ==================================================
 # 8. Q&A (RAG Query)
 # ==================================================
+# Answers being streamed from the API, keyed by stream id. Filled by a
+# reader thread and rendered by the qa-poll interval. An entry is
+# evicted when its answer was shown, when the same tab asks again, or
+# when nothing polled it for QA_STREAM_TTL seconds (tab closed);
+# eviction also stops its reader.
+QA_STREAMS = {}
+QA_LOCK = threading.Lock()
+QA_STREAM_TTL = 30.0
+
+
+def _evict_stream(stream_id):
+    """Drop a stream and stop its reader (call with QA_LOCK held)."""
+    state = QA_STREAMS.pop(stream_id, None)
+    if state is not None:
+        state["stop"].set()
+
+
+def _sweep_streams():
+    """Evict streams nobody polled recently (call with QA_LOCK held)."""
+    cutoff = time.monotonic() - QA_STREAM_TTL
+    for stream_id in [k for k, s in QA_STREAMS.items() if s["seen"] < cutoff]: # NOQA E501
+        _evict_stream(stream_id)
+
+
+def _read_answer_stream(stream_id, query, stop):
+    for event, data in api.stream_rag_answer(query, stop=stop):
+        with QA_LOCK:
+            state = QA_STREAMS.get(stream_id)
+            if state is None:
+                return
+            if event == "token":
+                state["text"] += data
+            elif event == "error":
+                state["error"] = data
+            elif event == "done":
+                break
+    with QA_LOCK:
+        if stream_id in QA_STREAMS:
+            QA_STREAMS[stream_id]["done"] = True
+
+
+def _render_answer(state):
+    children = [html.P(state["text"] or "Thinking...", className="mb-1")]
+    if state["error"]:
+        children.append(html.P(f"Error: {state['error']}", className="text-danger")) # NOQA E501
+    return dbc.Card(dbc.CardBody(children), className="mb-3")
+
+
 @app.dash.callback(
     Output("qa-output", "children"),
+    Output("qa-stream-id", "data"),
+    Output("qa-poll", "disabled"),
     Input("qa-btn", "n_clicks"),
     State("qa-input", "value"),
+    State("qa-stream-id", "data"),
 )
-def qa_callback(n, query):
+def qa_callback(n, query, previous_id):
     if not n:
         raise dash.exceptions.PreventUpdate
 
     if not query:
-        return "Please enter a question."
+        return "Please enter a question.", None, True
+
+    stop = threading.Event()
+    with QA_LOCK:
+        _sweep_streams()
+        # A new question abandons the previous stream
+        _evict_stream(previous_id)
+        stream_id = uuid.uuid4().hex
+        state = QA_STREAMS[stream_id] = {
+            "text": "", "error": None, "done": False,
+            "seen": time.monotonic(), "stop": stop,
+        }
+        shown = _render_answer(state)
+
+    threading.Thread(
+        target=_read_answer_stream, args=(stream_id, query, stop),
+        daemon=True,
+    ).start()
+    return shown, stream_id, False
 
-    answers = api.rag_query(query)
-    if not answers:
-        return "No results found."
 
-    cards = []
-    for a in answers:
-        cards.append(
-            dbc.Card(
-                dbc.CardBody(
-                    [
-                        html.H5(a.get("name", "-"), className="fw-bold"),
-                        html.P(a.get("notes", "No notes available")),
-                    ]
-                ),
-                className="mb-3",
-            )
-        )
-    return cards
+@app.dash.callback(
+    Output("qa-output", "children", allow_duplicate=True),
+    Output("qa-poll", "disabled", allow_duplicate=True),
+    Input("qa-poll", "n_intervals"),
+    State("qa-stream-id", "data"),
+    prevent_initial_call=True,
+)
+def qa_poll(_, stream_id):
+    with QA_LOCK:
+        _sweep_streams()
+        state = QA_STREAMS.get(stream_id)
+        if state is None:
+            return dash.no_update, True
+        state["seen"] = time.monotonic()
+        state = dict(state)
+        if state["done"]:
+            _evict_stream(stream_id)
+
+    if state["done"] and not state["text"] and not state["error"]:
+        return "No results found.", True
+    return _render_answer(state), state["done"]
 
 
 # ==================================================
@@ -169,6 +169,11 @@ def create_tabs():
                         "Search", id="qa-btn", color="primary", className="mb-3"
                     ),
                     html.Div(id="qa-output", className="text-muted"),
+                    # Streamed answers: poll the buffer until "done"
+                    dcc.Store(id="qa-stream-id"),
+                    dcc.Interval(
+                        id="qa-poll", interval=250, disabled=True
+                    ),
                 ],
             ),
         ],
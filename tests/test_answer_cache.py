@@ -0,0 +1,32 @@
+import numpy as np
+
+from src.core.answer_cache import AnswerCache
+
+
+def test_exact_similar_scope_and_persistence(tmp_path):
+    """Both cache levels hit; a new scope invalidates; SQLite reloads."""
+    path = str(tmp_path / "answers.db")
+    cache = AnswerCache(threshold=0.9, path=path)
+    emb = np.array([1.0, 0.0, 0.0])
+    cache.put("Why is Raigad famous?", emb, [7], "Capital.", "gen1", "tok64")
+
+    assert cache.get_exact("why is raigad  FAMOUS", "gen1", "tok64") == "Capital." # NOQA E501
+    assert cache.get_exact("why is raigad famous", "gen1", "tok32") is None
+
+    close = np.array([0.95, 0.1, 0.0])
+    assert cache.get_similar(close, [7], "gen1", "tok64") == "Capital."
+    assert cache.get_similar(close, [8], "gen1", "tok64") is None
+    assert cache.get_similar([0.0, 1.0, 0.0], [7], "gen1", "tok64") is None
+
+    reloaded = AnswerCache(threshold=0.9, path=path)
+    assert reloaded.get_exact("Why is Raigad famous", "gen1", "tok64") == "Capital." # NOQA E501
+    assert reloaded.get_similar(close, [7], "gen1", "tok64") == "Capital."
+
+    # Dataset generation changed: old answers are gone, also on disk
+    assert reloaded.get_exact("Why is Raigad famous", "gen2", "tok64") is None
+    assert AnswerCache(path=path).get_exact(
+        "Why is Raigad famous", "gen1", "tok64") is None
+
+    expiring = AnswerCache(ttl=0)
+    expiring.put("q", None, [1], "a", "gen1")
+    assert expiring.get_exact("q", "gen1") is None
@@ -0,0 +1,41 @@
+from src.core.answer_renderer import detect_intent, render_answer, route
+
+ROW = {
+    "name": "Rajgad",
+    "district": "Pune",
+    "taluka": "Velhe",
+    "trek_difficulty": "Hard",
+    "trek_time_hours": 3.0,
+    "best_season": "Monsoon; Winter",
+    "water_availability": "Information Not Available",
+}
+
+
+def test_router_and_templates():
+    """Lookups take the template path; open questions go to the LLM."""
+    assert route("Where is Rajgad?") == ("fast", "location")
+    assert route("how long is the Rajgad trek") == ("fast", "trek_time")
+    assert route("Why was Rajgad the capital?")[0] == "llm"
+    assert route("Why was Rajgad the capital?", mode="fast")[0] == "fast"
+
+    assert render_answer(ROW, "location") == \
+        "Rajgad is in Velhe taluka, Pune district of Maharashtra."
+    assert render_answer(ROW, "season") == \
+        "The best time to visit Rajgad is Monsoon or Winter."
+    assert render_answer(ROW, "trek_time") == \
+        "The trek to Rajgad takes about 3 hour(s) and is rated hard."
+    assert render_answer(ROW, "water").startswith(
+        "Water availability of Rajgad is not recorded.")
+
+
+def test_router_matches_whole_words():
+    """Keywords inside longer words do not trigger their intent."""
+    assert detect_intent("Which campaigns started from Raigad?") == "overview" # NOQA E501
+    assert detect_intent("Is Rajgad hardly visited in winter?") == "season"
+    assert detect_intent("Can we camp near Rajgad?") == "stay"
+    assert detect_intent("Which forts see the most battles?") == "history"
+
+    assert route("Who was the last ruler of Raigad?")[0] == "llm"
+    assert route("What happened at Pratapgad in 1659?")[0] == "llm"
+    assert route("Tell me the history of Sinhagad")[0] == "llm"
+    assert route("Who built Raigad?") == ("fast", "history")
@@ -23,4 +23,154 @@ def test_list_forts():
     assert isinstance(data, list)
     if len(data) > 0:
         assert "name" in data[0], "Each fort record should contain a name field"
-        assert "district" in data[0], "Each fort record should contain a district field"
\ No newline at end of file
+        assert "district" in data[0], "Each fort record should contain a district field"
+
+
+def test_nearby_batch_matches_single():
+    """Batch nearby should return the same forts as one-by-one lookups."""
+    points = [{"lat": 18.52, "lon": 73.85}, {"lat": 19.0, "lon": 72.8}]
+    response = client.post(
+        "/recommend/nearby/batch", json={"points": points, "k": 3})
+    assert response.status_code == 200
+    batch = response.json()
+    assert len(batch) == len(points)
+    for point, entry in zip(points, batch):
+        single = client.get(
+            "/recommend/nearby", params={**point, "k": 3}).json()
+        assert [f["fort_id"] for f in entry["results"]] == \
+            [f["fort_id"] for f in single]
+
+
+def test_facet_filters_and_counts():
+    """Facet filters should apply server-side and match the facet counts."""
+    facets = client.get("/forts/facets").json()["facets"]
+    assert "Jal Durg (Sea Fort)" in facets["type"]
+    expected = facets["type"]["Jal Durg (Sea Fort)"]
+
+    response = client.get(
+        "/forts", params={"type": "Jal Durg (Sea Fort)", "limit": 1000})
+    data = response.json()
+    assert len(data) == expected
+    assert all(f["type"] == "Jal Durg (Sea Fort)" for f in data)
+
+
+def test_pagination_cursor_and_fields():
+    """Cursor paging should continue where the previous page stopped."""
+    first = client.get("/forts", params={"limit": 5, "fields": "fort_id,name"})
+    assert first.status_code == 200
+    assert int(first.headers["X-Total-Count"]) > 5
+    assert set(first.json()[0]) == {"fort_id", "name"}
+
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get("/forts", params={"limit": 5, "cursor": cursor})
+    by_offset = client.get("/forts", params={"limit": 5, "offset": 5})
+    assert second.json() == by_offset.json()
+
+
+def test_etag_not_modified():
+    """A repeated request with If-None-Match should get an empty 304."""
+    first = client.get("/forts", params={"limit": 3})
+    etag = first.headers["ETag"]
+    again = client.get(
+        "/forts", params={"limit": 3}, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.headers["X-Total-Count"] == first.headers["X-Total-Count"]
+
+
+def test_health_endpoints():
+    """Core endpoints are ready without waiting for the heavy engines."""
+    assert client.get("/health/live").status_code == 200
+    ready = client.get("/health/ready")
+    assert ready.status_code == 200
+    assert set(ready.json()["engines"]) >= {"rag", "llm"}
+
+
+def test_semantic_search_stream_fast_path():
+    """Template answers stream as meta / token / done SSE events."""
+    from src.api.routers import search
+    from src.core import lazy_engine
+
+    class FakeEncoder:
+        async def aencode(self, q):
+            return None
+
+    class FakeRAG:
+        query_encoder = FakeEncoder()
+
+        def query(self, q, k=1, q_emb=None):
+            return [{"name": "Rajgad", "district": "Pune", "taluka": "Velhe"}]
+
+    rag = search.RAG
+    saved = rag.state, rag._instance
+    rag.state, rag._instance = lazy_engine.READY, FakeRAG()
+    try:
+        response = client.get(
+            "/search/semantic_search/stream", params={"q": "Where is Rajgad?"})
+    finally:
+        rag.state, rag._instance = saved
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["x-answer-mode"] == "fast"
+    events = [line.split(": ", 1)[1] for line in response.text.splitlines()
+              if line.startswith("event: ")]
+    assert events == ["meta", "token", "done"]
+    assert "Velhe taluka, Pune district" in response.text
+
+
+def test_semantic_search_stream_timeout_is_not_cached():
+    """A stream cut off by the deadline reports an error and is not cached."""
+    import numpy as np
+    from src.api.routers import search
+    from src.core import lazy_engine
+    from src.core.generation_scheduler import GenerationTimeout
+
+    class FakeEncoder:
+        async def aencode(self, q):
+            return np.ones(4, dtype=np.float32)
+
+    class FakeRAG:
+        query_encoder = FakeEncoder()
+
+        def query(self, q, k=1, q_emb=None):
+            return [{"fort_id": 1, "name": "Rajgad"}]
+
+    class FakeDecoder:
+        def build_prompt(self, result):
+            return "prompt"
+
+    class FakeLLM:
+        decoder = FakeDecoder()
+
+        def astream(self, prompt, max_new_tokens=None):
+            async def pieces():
+                yield "Rajgad "
+                raise GenerationTimeout("no answer before the deadline")
+            return pieces()
+
+    q = "Tell me a story about Rajgad"
+    saved = [(e, e.state, e._instance) for e in (search.RAG, search.ANALYZER)]
+    search.RAG.state, search.RAG._instance = lazy_engine.READY, FakeRAG()
+    search.ANALYZER.state = lazy_engine.READY
+    search.ANALYZER._instance = FakeLLM()
+    try:
+        response = client.get(
+            "/search/semantic_search/stream", params={"q": q, "mode": "llm"})
+    finally:
+        for engine, state, instance in saved:
+            engine.state, engine._instance = state, instance
+
+    events = [line.split(": ", 1)[1] for line in response.text.splitlines()
+              if line.startswith("event: ")]
+    assert events == ["meta", "token", "error", "done"]
+    scope, variant = search.answer_scope(None)
+    assert search.ANSWER_CACHE.get_exact(q, scope, variant) is None
+
+
+def test_cluster_rebuild_is_single_worker_only(monkeypatch):
+    """Rebuilding would diverge across worker processes, so it is refused."""
+    from src.api.routers import clustering
+
+    monkeypatch.setattr(clustering, "MULTI_WORKER", True)
+    assert client.post("/clusters/rebuild/4").status_code == 409
@@ -0,0 +1,68 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+from src.build import build_bundle
+from src.core.artifacts import Bundle
+from src.core.cluster_engine import ClusterEngine
+from src.core.data_loader import DATA_PATH
+from src.core.fort_store import FortStore
+from src.core.recommender import SimilarityEngine
+from src.core.text_index import TextIndex
+
+
+@pytest.fixture
+def csv(tmp_path):
+    path = tmp_path / "forts.csv"
+    pd.read_csv(DATA_PATH).head(60).to_csv(path, index=False)
+    return path
+
+
+def test_bundle_restores_engines_without_rebuilding(csv, tmp_path):
+    """Engines load prebuilt state from the bundle and answer the same."""
+    out = tmp_path / "artifacts"
+    bundle = build_bundle(csv, out, embeddings=False)
+    assert build_bundle(csv, out, embeddings=False).id == bundle.id
+    assert bundle.verify() == []
+
+    store = FortStore(csv, artifacts=out).load()
+    fresh = FortStore(csv, artifacts=False).load()
+    assert store.bundle.id == bundle.id and fresh.bundle is None
+    pd.testing.assert_frame_equal(store.frame, fresh.frame)
+
+    def no_build(df):
+        raise AssertionError("rebuilt instead of restored")
+
+    text, similar = TextIndex(store), SimilarityEngine(store)
+    text._build = similar._build = no_build
+    fort_id = int(fresh.frame["fort_id"].iloc[5])
+    assert list(text.search("gad")) == list(TextIndex(fresh).search("gad"))
+    assert similar.recommend(fort_id, k=5)["fort_id"].tolist() == \
+        SimilarityEngine(fresh).recommend(fort_id, k=5)["fort_id"].tolist()
+    assert ClusterEngine(store=store).get_cluster_counts() == \
+        ClusterEngine(store=fresh).get_cluster_counts()
+
+    # A different cluster count is not in the bundle: computed instead
+    assert ClusterEngine(n_clusters=3, store=store).get_cluster_counts() == \
+        ClusterEngine(n_clusters=3, store=fresh).get_cluster_counts()
+
+
+def test_stale_or_tampered_bundle(csv, tmp_path):
+    """Editing the CSV or losing the frame bypasses the bundle; verify()
+    flags changed files."""
+    out = tmp_path / "artifacts"
+    bundle = build_bundle(csv, out, embeddings=False)
+
+    (bundle.path / "similarity.neighbours.npy").write_bytes(b"corrupt")
+    assert bundle.verify() == ["similarity.neighbours.npy"]
+
+    # Without a readable frame the store parses the CSV instead
+    shutil.rmtree(bundle.path / "dataset.cols")
+    store = FortStore(csv, artifacts=out).load()
+    assert store.bundle is None and len(store.frame) == 60
+
+    with open(csv, "a") as f:
+        f.write("\n")
+    assert Bundle.open(out, source=csv) is None
+    assert FortStore(csv, artifacts=out).load().bundle is None
@@ -0,0 +1,18 @@
+from src.core.bm25 import BM25Index
+from src.core.rag_engine import reciprocal_rank_fusion
+
+
+def test_bm25_ranks_rare_terms_and_fusion():
+    """Rare exact terms win in BM25; RRF rewards agreement."""
+    index = BM25Index().build([
+        "Rajgad fort near Pune",
+        "Ajobagad also known as Ajoba",
+        "Sea fort near Alibag fort",
+    ])
+    idx, scores = index.search("ajoba fort", k=3)
+    assert idx[0] == 1
+    assert list(scores) == sorted(scores, reverse=True)
+    assert len(index.search("unknown words", k=3)[0]) == 0
+
+    ids, fused = reciprocal_rank_fusion([[2, 0, 1], [0, 1]])
+    assert ids.tolist() == [0, 1, 2]
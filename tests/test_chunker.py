@@ -0,0 +1,26 @@
+import pandas as pd
+
+from src.core.chunker import build_passages
+
+
+def test_passages_keep_provenance_and_overlap():
+    """Long fields are windowed; placeholders produce no passage."""
+    df = pd.DataFrame({
+        "name": ["Alpha", "Beta"],
+        "district": ["Pune", "Information Not Available"],
+        "key_events": [" ".join(f"w{i}" for i in range(250)), ""],
+        "notes": ["short note", "Information Not Available"],
+    })
+    passages = build_passages(df, max_words=100, overlap=20)
+
+    alpha = passages[passages["row"] == 0]
+    assert alpha["field"].tolist()[0] == "summary"
+    assert "District: Pune" in alpha["text"].iloc[0]
+
+    events = alpha[alpha["field"] == "key_events"]
+    assert events["chunk"].tolist() == [0, 1, 2]
+    assert events["text"].iloc[1].startswith("Alpha — key events: w80 ")
+
+    beta = passages[passages["row"] == 1]
+    assert beta["field"].tolist() == ["summary"]
+    assert beta["text"].iloc[0] == "Beta."
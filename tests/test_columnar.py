@@ -0,0 +1,74 @@
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core import data_loader
+from src.core.columnar import columnar_path, load_columnar
+from src.core.data_loader import (
+    DATA_PATH,
+    load_forts,
+    parse_forts_csv,
+    save_forts_columnar,
+)
+
+
+def test_columnar_copy_matches_csv(tmp_path):
+    """The columnar copy loads the same data, typed and memory-mapped."""
+    csv = tmp_path / "forts.csv"
+    pd.read_csv(DATA_PATH).head(80).to_csv(csv, index=False)
+
+    parsed = parse_forts_csv(csv)
+    pd.testing.assert_frame_equal(load_forts(csv), parsed)
+    assert not columnar_path(csv).exists()  # loading never writes
+
+    save_forts_columnar(csv)
+    df = load_forts(csv, columnar=True)
+    assert isinstance(df["district"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["fort_id"].to_numpy().base, np.memmap)
+    assert not df["fort_id"].to_numpy().flags.writeable
+
+    as_object = df.astype({c: object for c in df.columns
+                           if isinstance(df[c].dtype, pd.CategoricalDtype)})
+    pd.testing.assert_frame_equal(as_object, parsed)
+    assert df.to_dict(orient="records") == parsed.to_dict(orient="records")
+    pd.testing.assert_frame_equal(load_forts(columnar_path(csv)), df)
+
+    # Editing the CSV makes the copy stale; loads fall back to the CSV
+    with open(csv, "a") as f:
+        f.write("\n")
+    assert load_columnar(columnar_path(csv), source_sha256="0" * 64) is None
+    fallback = load_forts(csv, columnar=True)
+    assert not isinstance(fallback["fort_id"].to_numpy().base, np.memmap)
+    pd.testing.assert_frame_equal(fallback, df)
+
+
+def _save_and_load_dtypes(csv):
+    save_forts_columnar(csv)
+    return {c: str(t) for c, t in load_forts(csv, columnar=True).dtypes.items()} # NOQA E501
+
+
+def test_concurrent_and_failed_writes(tmp_path, monkeypatch):
+    """Racing builds agree on dtypes; without a copy the dtypes match."""
+    csv = tmp_path / "forts.csv"
+    pd.read_csv(DATA_PATH).head(80).to_csv(csv, index=False)
+
+    ctx = multiprocessing.get_context("fork")
+    with ctx.Pool(4) as pool:
+        dtypes = pool.map(_save_and_load_dtypes, [csv] * 8)
+    assert all(d == dtypes[0] for d in dtypes)
+    assert dtypes[0]["district"] == "category"
+    expected = load_forts(csv, columnar=True)
+
+    def read_only(*args, **kwargs):
+        raise PermissionError("read-only data directory")
+
+    other = tmp_path / "other.csv"
+    other.write_bytes(csv.read_bytes())
+    monkeypatch.setattr(data_loader, "save_columnar", read_only)
+    with pytest.raises(PermissionError):
+        save_forts_columnar(other)
+    fallback = load_forts(other, columnar=True)
+    assert not columnar_path(other).exists()
+    pd.testing.assert_frame_equal(fallback, expected)
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from src.api.executors import BoundedExecutor
+
+
+def test_pools_are_isolated_and_bounded():
+    """A saturated pool rejects with 503 while another pool keeps serving."""
+    release = threading.Event()
+    inference = BoundedExecutor("inference", max_workers=1, max_pending=2)
+    data = BoundedExecutor("data", max_workers=2, max_pending=8)
+
+    async def scenario():
+        slow = [
+            asyncio.ensure_future(inference.run(release.wait, 5))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        assert inference.stats()["pending"] == 2
+
+        with pytest.raises(HTTPException) as exc:
+            await inference.run(sum, [1, 2])
+        assert exc.value.status_code == 503
+
+        # Catalogue work is not stuck behind inference
+        assert await asyncio.wait_for(data.run(sum, [1, 2, 3]), 1) == 6
+
+        release.set()
+        assert await asyncio.gather(*slow) == [True, True]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        inference.shutdown()
+        data.shutdown()
+
+    assert inference.stats()["rejected"] == 1
+    assert inference.stats()["pending"] == 0
+    assert data.stats()["completed"] == 1
@@ -0,0 +1,53 @@
+from src.core.fort_store import FortStore, get_store
+
+
+def test_store_is_shared():
+    """get_store() should hand out a single, already-loaded instance."""
+    store = get_store()
+    assert store is get_store()
+    assert store.generation >= 1
+    assert len(store) > 0
+
+
+def test_reload_bumps_generation():
+    """Reloading should bump the generation so caches can invalidate."""
+    store = FortStore().load()
+    gen = store.generation
+    store.reload()
+    assert store.generation == gen + 1
+
+
+def test_sha256_identifies_the_dataset(tmp_path):
+    """The content hash is the same across stores and follows CSV edits."""
+    csv = tmp_path / "forts.csv"
+    csv.write_bytes(FortStore().path.read_bytes())
+    first, second = FortStore(csv).load(), FortStore(csv).load()
+    assert first.generation == second.generation == 1
+    assert first.sha256 == second.sha256
+
+    with open(csv, "a") as f:
+        f.write("\n")
+    assert first.reload().sha256 != second.sha256
+
+
+def test_columns_are_read_only():
+    """Column arrays are shared and must not be writable."""
+    store = FortStore().load()
+    lat = store.numeric("latitude")
+    assert not lat.flags.writeable
+    assert store.numeric("latitude") is lat
+
+
+def test_id_and_name_indexes():
+    """fort_id and (alternate) name lookups should hit the right row."""
+    store = get_store()
+    df = store.frame
+    fort_id = int(df["fort_id"].iloc[10])
+    assert store.position(fort_id) == 10
+    assert store.record(fort_id)["name"] == df["name"].iloc[10]
+    assert store.position(-1) is None
+
+    assert 10 in store.positions_by_name(df["name"].iloc[10].upper())
+    alt = df[df["alternate_names"].str.contains(";")].iloc[0]
+    second = alt["alternate_names"].split(";")[1]
+    assert store.position(alt["fort_id"]) in store.positions_by_name(second)
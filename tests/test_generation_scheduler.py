@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from src.core.generation_scheduler import (
+    GenerationScheduler,
+    GenerationTimeout,
+    SchedulerFull,
+)
+
+
+class StubDecoder:
+    """Echoes prompts; each call takes `delay` seconds unless stopped."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+
+    def generate_batch(self, prompts, max_new_tokens, should_stop=None):
+        self.batches.append(list(prompts))
+        end = time.monotonic() + self.delay
+        while time.monotonic() < end:
+            if should_stop and should_stop():
+                break
+            time.sleep(0.01)
+        return [f"{p}:{n}" for p, n in zip(prompts, max_new_tokens)]
+
+    def stream_response(self, prompt, max_new_tokens=None, timeout=None):
+        for i in range(max_new_tokens):
+            time.sleep(self.delay)
+            yield f"t{i} "
+
+
+def test_batching_caps_and_backpressure():
+    """Concurrent prompts share a batch; caps, queue bound and deadlines
+    hold."""
+    decoder = StubDecoder(delay=0.05)
+    scheduler = GenerationScheduler(
+        decoder, max_queue=8, max_batch=4, batch_window_ms=50,
+        max_new_tokens=64)
+
+    out = {}
+    threads = [
+        threading.Thread(target=lambda i=i: out.update(
+            {i: scheduler.generate(f"p{i}", max_new_tokens=100)}))
+        for i in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert out == {i: f"p{i}:64" for i in range(4)}
+    assert max(len(b) for b in decoder.batches) > 1
+    assert scheduler.metrics()["completed"] == 4
+
+    slow = GenerationScheduler(StubDecoder(delay=5), max_queue=1)
+    with pytest.raises(GenerationTimeout):
+        slow.generate("expires", timeout=0.2)
+
+    running = slow.submit("running")
+    while slow.metrics()["queue_depth"] or not slow.running:
+        time.sleep(0.01)
+    queued = slow.submit("queued")
+    with pytest.raises(SchedulerFull):
+        slow.submit("rejected")
+    assert slow.metrics()["rejected"] == 1
+    assert slow.metrics()["timeouts"] == 1
+    running.cancel()
+    queued.cancel()
+
+
+def test_expired_stream_is_not_a_result():
+    """A stream cut off by its deadline raises instead of ending early."""
+    scheduler = GenerationScheduler(StubDecoder(delay=0.05))
+    pieces = []
+    with pytest.raises(GenerationTimeout):
+        for piece in scheduler.stream("p", max_new_tokens=100, timeout=0.3):
+            pieces.append(piece)
+    assert 0 < len(pieces) < 100
+    while scheduler.running:
+        time.sleep(0.01)
+    assert scheduler.metrics()["completed"] == 0
+    assert scheduler.metrics()["timeouts"] == 1
+
+
+def test_held_stream_counts_against_max_queue():
+    """A stream held back while a batch runs still occupies the queue."""
+    scheduler = GenerationScheduler(
+        StubDecoder(delay=5), max_queue=2, batch_window_ms=500)
+    running = scheduler.submit("running")
+    held = scheduler.stream("held", max_new_tokens=1)
+    while not scheduler.running:
+        time.sleep(0.01)
+    assert scheduler.metrics()["queue_depth"] == 1
+    queued = scheduler.submit("queued")
+    with pytest.raises(SchedulerFull):
+        scheduler.submit("rejected")
+    running.cancel()
+    queued.cancel()
+    held.close()
@@ -0,0 +1,142 @@
+import asyncio
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.core.generation_scheduler import GenerationScheduler, SchedulerFull
+from src.core.inference_service import (
+    InferenceClient,
+    InferenceServer,
+    RemoteRAG,
+)
+from src.core.lazy_engine import EngineUnavailable, LazyEngine
+
+KEY = b"test-key"
+
+
+class StubEncoder:
+    def encode(self, text, timeout=None):
+        return np.full(3, len(text), dtype=np.float32)
+
+
+class StubRAG:
+    query_encoder = StubEncoder()
+
+    def query(self, q, k=5, q_emb=None):
+        return [{"fort_id": i, "name": f"{q}-{i}"} for i in range(k)]
+
+
+class StubDecoder:
+    def generate_batch(self, prompts, max_new_tokens, should_stop=None):
+        return [p.upper() for p in prompts]
+
+    def stream_response(self, prompt, max_new_tokens=None, timeout=None):
+        yield from prompt.split()
+
+
+class FullScheduler:
+    def stream(self, prompt, max_new_tokens=None, timeout=None):
+        raise SchedulerFull("generation queue is full")
+
+
+class SlowScheduler:
+    def stream(self, prompt, max_new_tokens=None, timeout=None):
+        time.sleep(0.3)  # busy worker: the stream is accepted late
+        return (piece for piece in [prompt])
+
+
+def test_remote_engines_over_socket(tmp_path):
+    """Retrieval, generation, streaming and errors cross the socket."""
+    llm = GenerationScheduler(StubDecoder(), max_queue=4)
+    engines = {
+        "rag": LazyEngine("rag", StubRAG),
+        "llm": LazyEngine("llm", lambda: llm),
+        "broken": LazyEngine("broken", lambda: 1 / 0),
+    }
+    for engine in engines.values():
+        engine.load()
+    address = str(tmp_path / "inference.sock")
+    InferenceServer(address, engines, KEY).start()
+    client = InferenceClient(address, KEY)
+
+    rag = client.engine("rag")
+    assert rag.query("raigad", 2)[1] == {"fort_id": 1, "name": "raigad-1"}
+    assert rag.query_encoder.encode("abcd").tolist() == [4.0, 4.0, 4.0]
+    embedding = asyncio.run(rag.query_encoder.aencode("ab"))
+    assert embedding.tolist() == [2.0, 2.0, 2.0]
+
+    remote = client.engine("llm")
+    assert remote.generate("hello") == "HELLO"
+    assert remote.decoder.build_prompt("{}").count("{}") == 1
+
+    async def scenario():
+        text = await remote.agenerate("fort")
+        pieces = [p async for p in await remote.astream("one two three")]
+        return text, pieces
+
+    assert asyncio.run(scenario()) == ("FORT", ["one", "two", "three"])
+    assert remote.metrics()["completed"] == 3
+
+    with pytest.raises(RuntimeError, match="ZeroDivisionError"):
+        client.wait_ready("broken")
+    engines["llm"] = engines["broken"]
+    with pytest.raises(EngineUnavailable, match="failed"):
+        remote.generate("later")
+
+    engines["llm"] = LazyEngine("llm", FullScheduler)
+    engines["llm"].load()
+    with pytest.raises(SchedulerFull):
+        asyncio.run(remote.astream("queued"))
+
+
+def test_remote_stream_handshake_does_not_block_the_loop(tmp_path):
+    """Other requests keep running while a stream waits to be accepted."""
+    engines = {"llm": LazyEngine("llm", SlowScheduler)}
+    engines["llm"].load()
+    address = str(tmp_path / "inference.sock")
+    InferenceServer(address, engines, KEY).start()
+    remote = InferenceClient(address, KEY).engine("llm")
+
+    async def scenario():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.02)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        pieces = await remote.astream("slow")
+        ticker.cancel()
+        return ticks, [p async for p in pieces]
+
+    ticks, pieces = asyncio.run(scenario())
+    assert pieces == ["slow"] and ticks >= 5
+
+
+def test_socket_requires_key_and_private_directory(tmp_path):
+    """Peers without the key are refused; a shared directory is rejected."""
+    engines = {"rag": LazyEngine("rag", StubRAG)}
+    address = str(tmp_path / "inference.sock")
+    InferenceServer(address, engines, KEY).start()
+    with pytest.raises(EngineUnavailable, match="AuthenticationError"):
+        InferenceClient(address, b"wrong-key").status()
+    assert InferenceClient(address, KEY).status()["rag"]["state"] == "pending"
+
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    os.chmod(shared, 0o777)
+    server = InferenceServer(str(shared / "inference.sock"), engines, KEY)
+    with pytest.raises(PermissionError):
+        server.serve_forever()
+
+
+def test_unreachable_worker_is_engine_unavailable(tmp_path):
+    """A dead inference worker surfaces as EngineUnavailable (503)."""
+    client = InferenceClient(str(tmp_path / "missing.sock"), KEY)
+    with pytest.raises(EngineUnavailable) as info:
+        RemoteRAG(client).query("raigad")
+    assert info.value.state == "unreachable"
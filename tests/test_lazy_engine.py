@@ -0,0 +1,29 @@
+import time
+
+import pytest
+
+from src.core import lazy_engine
+from src.core.lazy_engine import EngineUnavailable, LazyEngine
+
+
+def test_failed_engine_is_retried_after_backoff():
+    """A failed load is retried by get() once its backoff has passed."""
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("model download failed")
+        return "model"
+
+    engine = LazyEngine("flaky", factory)
+    engine.load()
+    assert engine.state == lazy_engine.FAILED
+
+    with pytest.raises(EngineUnavailable, match="failed"):
+        engine.get()  # still inside the backoff
+    assert len(attempts) == 1
+
+    engine.retry_at = time.monotonic()
+    assert engine.get(wait=None) == "model"
+    assert len(attempts) == 2 and engine.failures == 0
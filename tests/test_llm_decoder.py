@@ -0,0 +1,27 @@
+import pytest
+import torch
+
+from src.core.llm_decoder import LLM_Decoder
+
+
+class StubTokenizer:
+    eos_token_id = 0
+
+    def __call__(self, prompt, **kwargs):
+        return {"input_ids": torch.ones((1, 3), dtype=torch.long)}
+
+
+class BrokenModel:
+    def generate(self, **kwargs):
+        raise RuntimeError("out of memory")
+
+
+def test_stream_response_raises_generate_errors():
+    """A failing generate ends the stream with its error instead of hanging."""
+    decoder = LLM_Decoder.__new__(LLM_Decoder)
+    decoder.tokenizer, decoder.model = StubTokenizer(), BrokenModel()
+    decoder.device, decoder.max_length = "cpu", 4096
+    decoder.prefix_ids = decoder.prefix_cache = None
+
+    with pytest.raises(RuntimeError, match="out of memory"):
+        list(decoder.stream_response("prompt", max_new_tokens=8, timeout=5))
@@ -0,0 +1,37 @@
+import threading
+
+import numpy as np
+
+from src.core.query_encoder import QueryEncoder
+
+
+def test_cache_and_micro_batching():
+    """Concurrent misses share one batch; repeats hit the LRU."""
+    batches = []
+
+    def encode_batch(texts):
+        batches.append(list(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+    enc = QueryEncoder(encode_batch, max_size=2, window_ms=50)
+    queries = ["sea forts", "Sea  Forts", "hill forts", "easy treks"]
+    out = [None] * len(queries)
+
+    def run(i):
+        out[i] = enc.encode(queries[i], timeout=5)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(batches) == 1
+    assert sorted(batches[0]) == ["easy treks", "hill forts", "sea forts"]
+    assert np.array_equal(out[0], out[1])
+
+    # LRU of size 2: touching "a" keeps it, "b" is evicted by "c"
+    for q in ["a", "b", "a", "c", "a"]:
+        enc.encode(q)
+    assert batches[1:] == [["a"], ["b"], ["c"]]
+    assert enc.stats()["size"] == 2
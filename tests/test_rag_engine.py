@@ -0,0 +1,118 @@
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.core.data_loader import DATA_PATH
+from src.core.rag_engine import RAGEngine
+
+
+class StubModel:
+    """Deterministic unit vectors from a hash of each text."""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts, **kwargs):
+        self.encoded += len(texts)
+        seeds = [int(hashlib.sha1(t.encode()).hexdigest()[:8], 16)
+                 for t in texts]
+        X = np.stack([np.random.default_rng(s).standard_normal(16)
+                      for s in seeds])
+        return X / np.linalg.norm(X, axis=1, keepdims=True)
+
+
+def forts(n=40):
+    return pd.read_csv(DATA_PATH).head(n)
+
+
+def snapshot(path):
+    return {p.relative_to(path): p.read_bytes()
+            for p in sorted(path.rglob("*")) if p.is_file()}
+
+
+def test_prebuilt_dir_is_never_written(tmp_path):
+    """Mismatches with the prebuilt cache go to the writable cache."""
+    prebuilt = tmp_path / "bundle-rag"
+    model = StubModel()
+    RAGEngine(cache_dir=prebuilt, model=model, index="ivf") \
+        .load_data(forts()).build_index()
+    before = snapshot(prebuilt)
+
+    def engine(df, index):
+        return RAGEngine(
+            cache_dir=tmp_path / "cache", prebuilt_dir=prebuilt,
+            model=model, index=index).load_data(df).build_index()
+
+    model.encoded = 0
+    rag = engine(forts(), "ivf")
+    assert model.encoded == 0 and rag.embeddings_dir.parent == prebuilt
+    assert rag.query("Raigad", 3)
+
+    engine(forts(), "ivfpq")  # another index kind: built in the cache
+    assert list((tmp_path / "cache").rglob("index-*.npz"))
+    engine(forts(30), "ivf")  # other passages: encoded into the cache
+    assert model.encoded > 0
+    assert snapshot(prebuilt) == before
+
+
+def test_incremental_cache_reencodes_only_changed_rows(tmp_path, monkeypatch):
+    """Edited / added rows are encoded; unchanged and removed ones are not."""
+    from src.core import rag_engine
+
+    model = StubModel()
+
+    def build(df, **kwargs):
+        return RAGEngine(cache_dir=tmp_path, model=model, **kwargs) \
+            .load_data(df).build_index()
+
+    df = forts()
+    rag = build(df)
+    assert model.encoded == len(rag.corpus)
+    first = set(rag.corpus)
+
+    model.encoded = 0
+    build(df)
+    assert model.encoded == 0
+
+    writes = []
+    atomic_write = rag_engine.atomic_write
+    monkeypatch.setattr(rag_engine, "atomic_write", lambda path, write: (
+        writes.append(path.name), atomic_write(path, write)))
+
+    edited = pd.concat([df.iloc[1:], forts(41).tail(1)], ignore_index=True)
+    edited.loc[0, "notes"] = "Rebuilt in 1670 after a long siege."
+    old_file = rag.embeddings_file
+    model.encoded = 0
+    rag = build(edited)
+    assert model.encoded == len(set(rag.corpus) - first) > 0
+    assert model.encoded < len(rag.corpus) // 4
+    assert writes[-1] == "manifest.json"
+    assert not (rag.cache_dir / old_file).exists()
+    assert [p.name for p in rag.cache_dir.glob("embeddings-*.npy")] == \
+        [rag.embeddings_file]
+
+    fresh = StubModel().encode(rag.corpus).astype(np.float32)
+    assert np.allclose(rag.embeddings, fresh)
+
+
+def test_cache_with_other_model_or_dtype_is_rejected(tmp_path):
+    """A manifest for another model or dtype is never reused."""
+    model = StubModel()
+    rag = RAGEngine(cache_dir=tmp_path, model=model) \
+        .load_data(forts()).build_index()
+    n = len(rag.corpus)
+
+    model.encoded = 0
+    RAGEngine(cache_dir=tmp_path, model=model, dtype="float16") \
+        .load_data(forts()).build_index()
+    assert model.encoded == n
+
+    manifest = json.loads(rag.manifest_file.read_text())
+    manifest["model"] = "other-model"
+    rag.manifest_file.write_text(json.dumps(manifest))
+    model.encoded = 0
+    RAGEngine(cache_dir=tmp_path, model=model) \
+        .load_data(forts()).build_index()
+    assert model.encoded == n
@@ -0,0 +1,98 @@
+from geopy.distance import geodesic
+import pytest
+from src.core import recommender
+from src.core.fort_store import get_store
+from src.core.recommender import (
+    ProximityEngine,
+    SimilarityEngine,
+    recommend_by_proximity,
+    recommend_similar,
+)
+from src.core.geo_utils import haversine_km
+
+
+def test_nearby_matches_geodesic_order():
+    """Vectorized nearest search should rank like a full geodesic scan."""
+    df = get_store().frame
+    lat, lon = 18.52, 73.85
+    dist = df.apply(
+        lambda r: geodesic((lat, lon), (r["latitude"], r["longitude"])).km,
+        axis=1,
+    )
+    expected = df.assign(d=dist).sort_values("d", kind="stable").head(10)
+
+    result = ProximityEngine(get_store()).recommend(lat, lon, k=10, exact=True)
+    assert list(result["fort_id"]) == list(expected["fort_id"])
+    assert result["distance_km"].is_monotonic_increasing
+
+    # The helper keeps one index per frame instead of rebuilding it
+    first = recommend_by_proximity(df, lat, lon, k=10, exact=True)
+    again = recommend_by_proximity(df, 19.0, 72.8, k=3)
+    assert list(first["fort_id"]) == list(expected["fort_id"])
+    assert len(again) == 3
+    assert recommender._PROXIMITY_CACHE["df"] is df
+
+
+def test_radius_and_bbox_queries():
+    """Radius and bounding-box lookups should agree with a brute-force scan."""
+    store = get_store()
+    engine = ProximityEngine(store)
+    df = store.frame
+
+    pos, dist = engine.within_radius(18.52, 73.85, 50)
+    brute = [haversine_km(18.52, 73.85, la, lo)
+             for la, lo in zip(df["latitude"], df["longitude"])]
+    assert len(pos) == sum(d is not None and d <= 50 for d in brute)
+    assert (dist <= 50).all()
+
+    box = engine.within_bbox(18.0, 73.0, 19.0, 74.0)
+    lat, lon = df["latitude"], df["longitude"]
+    mask = lat.between(18.0, 19.0) & lon.between(73.0, 74.0)
+    expected = mask.to_numpy().nonzero()[0]
+    assert sorted(box.tolist()) == sorted(expected.tolist())
+
+
+def test_nearby_rejects_bad_coordinates_and_negative_k():
+    """Non-finite or out-of-range points fail fast; k < 0 returns nothing."""
+    engine = ProximityEngine(get_store())
+    for lat, lon in [(float("nan"), 73.85), (95.0, 73.85), (18.5, float("inf"))]: # NOQA E501
+        with pytest.raises(ValueError):
+            engine.nearest(lat, lon)
+    with pytest.raises(ValueError):
+        engine.nearest_many([18.5, float("nan")], [73.85, 73.85])
+    assert engine.recommend_within(18.52, 73.85, 20, k=-2).empty
+
+
+def test_similar_lookup_and_custom_weights():
+    """Precomputed neighbours should match an on-the-fly scoring pass."""
+    engine = SimilarityEngine(get_store())
+    default = engine.recommend(1, k=5)
+    assert len(default) == 5
+    assert 1 not in default["fort_id"].tolist()
+    assert default["score"].is_monotonic_decreasing
+
+    fresh = SimilarityEngine(get_store(), top_n=0).recommend(1, k=5)
+    assert default["fort_id"].tolist() == fresh["fort_id"].tolist()
+
+    only_type = engine.recommend(
+        1, k=5, weights={n: 0 for n in engine.DEFAULT_WEIGHTS} | {"type": 1})
+    base_type = get_store().frame.set_index("fort_id").loc[1, "type"]
+    assert (only_type["type"] == base_type).all()
+    assert engine.recommend(-1).empty
+    for bad in (float("nan"), float("inf"), -1):
+        with pytest.raises(ValueError):
+            engine.recommend(1, weights={"type": bad})
+
+
+def test_recommend_similar_scores_only_the_requested_fort(monkeypatch):
+    """The one-off wrapper skips the neighbour table and scores one row."""
+    calls = []
+    scores = SimilarityEngine.scores
+    monkeypatch.setattr(SimilarityEngine, "scores", lambda self, rows, w: (
+        calls.append(len(rows)) or scores(self, rows, w)))
+
+    result = recommend_similar(get_store().frame, 1, k=5)
+    assert calls == [1]
+    monkeypatch.undo()
+    expected = SimilarityEngine(get_store()).recommend(1, k=5)
+    assert result["fort_id"].tolist() == expected["fort_id"].tolist()
@@ -0,0 +1,19 @@
+from src.core.fort_store import get_store
+from src.core.text_index import TextIndex
+
+
+def test_keyword_prefix_and_infix_matches():
+    """Words, prefixes and infixes should all match, name hits first."""
+    df = get_store().frame
+    index = TextIndex(get_store())
+
+    names = df["name"].iloc[index.search("sinhagad")].tolist()
+    assert names[0] == "Sinhagad"
+
+    # Type-ahead prefix and infix ("gad" inside "...gad")
+    assert len(index.search("sinh")) >= 1
+    assert set(index.search("sinhagad")) <= set(index.search("gad"))
+
+    # Alternate names are searchable
+    assert len(index.search("fort victoria")) >= 1
+    assert len(index.search("!!")) == 0
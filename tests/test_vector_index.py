@@ -0,0 +1,51 @@
+import numpy as np
+from src.core.vector_index import make_index
+
+
+def unit_vectors(n=2000, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n, dim)).astype(np.float32)
+    return X / np.linalg.norm(X, axis=1, keepdims=True)
+
+
+def test_ivf_recall_against_exact():
+    """Probing every cell must reproduce the exact top-k."""
+    X = unit_vectors()
+    exact = make_index("exact").build(X)
+    for kind in ("ivf", "ivfpq"):
+        ivf = make_index(kind, n_lists=16).build(X)
+        for q in X[:20]:
+            assert set(ivf.search(q, 5, n_probe=16)[0]) == \
+                set(exact.search(q, 5)[0])
+
+
+def test_ivf_save_load_roundtrip(tmp_path):
+    """A persisted index should answer queries identically."""
+    X = unit_vectors()
+    ivf = make_index("ivfpq", n_lists=16, pq_m=4).build(X)
+    path = tmp_path / "index.npz"
+    with open(path, "wb") as f:
+        ivf.save(f)
+
+    loaded = make_index("ivfpq").load(path, X)
+    assert loaded.n_lists == 16 and loaded.pq_m == 4
+    q = X[0]
+    assert (loaded.search(q, 5)[0] == ivf.search(q, 5)[0]).all()
+
+
+def test_ivfpq_codes_only_search(tmp_path):
+    """Without raw vectors, IVF-PQ ranks by the PQ approximation."""
+    X = unit_vectors()
+    ivf = make_index("ivfpq", n_lists=16, pq_m=8, rerank=20).build(X)
+    path = tmp_path / "index.npz"
+    with open(path, "wb") as f:
+        ivf.save(f)
+
+    loaded = make_index("ivfpq").load(path, vectors=None)
+    exact = make_index("exact").build(X)
+    hits = 0
+    for q in X[:20]:
+        rows, scores = loaded.search(q, 5, n_probe=16)
+        assert len(rows) == 5 and (np.diff(scores) <= 0).all()
+        hits += len(set(rows) & set(exact.search(q, 5)[0]))
+    assert hits >= 50  # recall@5 of at least 0.5